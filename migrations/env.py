@@ -0,0 +1,86 @@
+"""
+Alembic environment for DelegateAI
+
+Run from the repository root:
+    alembic upgrade head
+
+The app applies migrations itself on startup (see src/api/migrations.py)
+and hands its own connection in through config.attributes.
+"""
+import os
+import sys
+
+from alembic import context
+from dotenv import load_dotenv
+from sqlalchemy import create_engine
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.api.database import db  # noqa: E402
+
+load_dotenv()
+
+config = context.config
+target_metadata = db.metadata
+
+
+def database_url():
+    return config.get_main_option('sqlalchemy.url') or os.getenv('DATABASE_URL', 'sqlite:///delegate-ai.db')
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    """
+    Leave the search index out of autogenerate
+
+    search_segments is an FTS5 virtual table on SQLite (plus its shadow
+    tables) and carries a tsvector on Postgres; migration 0006 creates it
+    by hand and it has no model, so autogenerate would try to drop it.
+    """
+    if type_ == 'table' and name.startswith('search_segments'):
+        return False
+    if type_ == 'index' and name.startswith('ix_search_segments'):
+        return False
+    return True
+
+
+def run_migrations_offline():
+    """Emit SQL to stdout instead of running it (alembic upgrade head --sql)"""
+    context.configure(
+        url=database_url(),
+        target_metadata=target_metadata,
+        literal_binds=True,
+        render_as_batch=True,
+        include_object=include_object
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_with_connection(connection):
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        # SQLite can't ALTER most things; batch mode rebuilds the table
+        render_as_batch=connection.dialect.name == 'sqlite',
+        include_object=include_object
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online():
+    connection = config.attributes.get('connection')
+    if connection is not None:
+        run_with_connection(connection)
+        return
+
+    engine = create_engine(database_url())
+    with engine.connect() as connection:
+        run_with_connection(connection)
+    engine.dispose()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,62 @@
+"""Initial schema: meetings, constituents, issues
+
+The tables as db.create_all() first built them, before migrations existed.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'meetings',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('zoom_link', sa.String(500), nullable=False),
+        sa.Column('meeting_name', sa.String(200)),
+        sa.Column('rep_name', sa.String(100)),
+        sa.Column('status', sa.String(50)),
+        sa.Column('error_message', sa.Text()),
+        sa.Column('transcript', sa.Text()),
+        sa.Column('analysis', sa.Text()),
+        sa.Column('audio_file_path', sa.String(500)),
+        sa.Column('duration_seconds', sa.Integer()),
+        sa.Column('created_at', sa.DateTime()),
+        sa.Column('completed_at', sa.DateTime()),
+    )
+    op.create_table(
+        'constituents',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('name', sa.String(100)),
+        sa.Column('email', sa.String(200)),
+        sa.Column('department', sa.String(100)),
+        sa.Column('role', sa.String(100)),
+        sa.Column('created_at', sa.DateTime()),
+    )
+    op.create_table(
+        'issues',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('title', sa.String(200), nullable=False),
+        sa.Column('description', sa.Text()),
+        sa.Column('category', sa.String(100)),
+        sa.Column('priority', sa.String(50)),
+        sa.Column('mention_count', sa.Integer()),
+        sa.Column('sentiment', sa.String(50)),
+        sa.Column('meeting_id', sa.Integer(), sa.ForeignKey('meetings.id')),
+        sa.Column('created_at', sa.DateTime()),
+        sa.Column('updated_at', sa.DateTime()),
+    )
+
+
+def downgrade():
+    op.drop_table('issues')
+    op.drop_table('constituents')
+    op.drop_table('meetings')
@@ -0,0 +1,30 @@
+"""Pipeline columns on meetings: Recall.ai bot and batch analysis ids
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('meetings') as batch:
+        batch.add_column(sa.Column('bot_id', sa.String(100)))
+        batch.add_column(sa.Column('bot_status', sa.String(50)))
+        batch.add_column(sa.Column('analysis_batch_id', sa.String(100)))
+        batch.create_index('ix_meetings_bot_id', ['bot_id'])
+
+
+def downgrade():
+    with op.batch_alter_table('meetings') as batch:
+        batch.drop_index('ix_meetings_bot_id')
+        batch.drop_column('analysis_batch_id')
+        batch.drop_column('bot_status')
+        batch.drop_column('bot_id')
@@ -0,0 +1,40 @@
+"""Indexes for the status queue, meeting list and issue lookups
+
+- meetings (status, created_at): pending/active meetings by age
+- meetings (created_at, id): keyset-paginated meeting list
+- issues (meeting_id): replacing a meeting's issues
+- issues (category, created_at): issues by category over time
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+INDEXES = (
+    ('ix_meetings_status_created_at', 'meetings', ['status', 'created_at']),
+    ('ix_meetings_created_at_id', 'meetings', ['created_at', 'id']),
+    ('ix_issues_meeting_id', 'issues', ['meeting_id']),
+    ('ix_issues_category_created_at', 'issues', ['category', 'created_at']),
+)
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    for name, table, columns in INDEXES:
+        # Databases built by create_all() may already have some of these
+        existing = {index['name'] for index in inspector.get_indexes(table)}
+        if name not in existing:
+            op.create_index(name, table, columns)
+
+
+def downgrade():
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
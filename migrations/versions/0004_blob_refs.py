@@ -0,0 +1,34 @@
+"""Blob references for transcripts and analyses
+
+New transcripts and analyses are written to the blob store; the row keeps
+the ref and size. The inline transcript/analysis columns stay for rows
+written before this (see `python -m src.storage.maintenance --migrate-inline`).
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('meetings') as batch:
+        batch.add_column(sa.Column('transcript_ref', sa.String(64)))
+        batch.add_column(sa.Column('transcript_size', sa.Integer()))
+        batch.add_column(sa.Column('analysis_ref', sa.String(64)))
+        batch.add_column(sa.Column('analysis_size', sa.Integer()))
+
+
+def downgrade():
+    with op.batch_alter_table('meetings') as batch:
+        batch.drop_column('analysis_size')
+        batch.drop_column('analysis_ref')
+        batch.drop_column('transcript_size')
+        batch.drop_column('transcript_ref')
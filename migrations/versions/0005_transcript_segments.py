@@ -0,0 +1,26 @@
+"""Structured transcript segments blob reference
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('meetings') as batch:
+        batch.add_column(sa.Column('segments_ref', sa.String(64)))
+        batch.add_column(sa.Column('segments_size', sa.Integer()))
+
+
+def downgrade():
+    with op.batch_alter_table('meetings') as batch:
+        batch.drop_column('segments_size')
+        batch.drop_column('segments_ref')
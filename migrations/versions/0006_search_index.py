@@ -0,0 +1,45 @@
+"""Full-text search table (see src/search/index.py)
+
+SQLite gets an FTS5 virtual table, Postgres a table with a generated
+tsvector column and a GIN index. Other databases get no search table.
+Existing meetings are indexed with `python -m src.search.index --rebuild`.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        op.execute(
+            "CREATE VIRTUAL TABLE search_segments USING fts5("
+            "body, meeting_id UNINDEXED, kind UNINDEXED, speaker UNINDEXED, "
+            "start_s UNINDEXED, end_s UNINDEXED, tokenize = 'porter unicode61')"
+        )
+    elif dialect == 'postgresql':
+        op.execute(
+            "CREATE TABLE search_segments ("
+            "id BIGINT PRIMARY KEY, "
+            "meeting_id INTEGER NOT NULL, "
+            "kind VARCHAR(20) NOT NULL, "
+            "speaker VARCHAR(100), "
+            "start_s DOUBLE PRECISION, "
+            "end_s DOUBLE PRECISION, "
+            "body TEXT NOT NULL, "
+            "tsv TSVECTOR GENERATED ALWAYS AS (to_tsvector('english', body)) STORED)"
+        )
+        op.execute("CREATE INDEX ix_search_segments_tsv ON search_segments USING GIN (tsv)")
+
+
+def downgrade():
+    if op.get_bind().dialect.name in ('sqlite', 'postgresql'):
+        op.execute("DROP TABLE search_segments")
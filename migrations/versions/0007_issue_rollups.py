@@ -0,0 +1,69 @@
+"""Issue clusters and weekly rollups (see src/analysis/aggregation.py)
+
+Existing issues are clustered with `python -m src.analysis.aggregation --rebuild`.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0007'
+down_revision = '0006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'issue_clusters',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('title', sa.String(200), nullable=False),
+        sa.Column('match_key', sa.String(200), nullable=False),
+        sa.Column('category', sa.String(100)),
+        sa.Column('priority', sa.String(50)),
+        sa.Column('mention_count', sa.Integer()),
+        sa.Column('meeting_count', sa.Integer()),
+        sa.Column('first_seen_at', sa.DateTime()),
+        sa.Column('last_seen_at', sa.DateTime()),
+    )
+    op.create_index('ix_issue_clusters_category', 'issue_clusters', ['category'])
+
+    op.create_table(
+        'issue_rollups',
+        sa.Column('week_start', sa.Date(), primary_key=True),
+        sa.Column('cluster_id', sa.Integer(), sa.ForeignKey('issue_clusters.id'), primary_key=True),
+        sa.Column('category', sa.String(100)),
+        sa.Column('mention_count', sa.Integer(), nullable=False),
+        sa.Column('meeting_count', sa.Integer(), nullable=False),
+        sa.Column('high_priority_count', sa.Integer(), nullable=False),
+        sa.Column('negative_count', sa.Integer(), nullable=False),
+    )
+    op.create_index('ix_issue_rollups_category_week', 'issue_rollups', ['category', 'week_start'])
+
+    op.create_table(
+        'category_rollups',
+        sa.Column('week_start', sa.Date(), primary_key=True),
+        sa.Column('category', sa.String(100), primary_key=True),
+        sa.Column('mention_count', sa.Integer(), nullable=False),
+        sa.Column('meeting_count', sa.Integer(), nullable=False),
+    )
+
+    with op.batch_alter_table('issues') as batch:
+        batch.add_column(sa.Column('cluster_id', sa.Integer()))
+        batch.create_foreign_key('fk_issues_cluster_id', 'issue_clusters', ['cluster_id'], ['id'])
+        batch.create_index('ix_issues_cluster_id', ['cluster_id'])
+
+
+def downgrade():
+    with op.batch_alter_table('issues') as batch:
+        batch.drop_index('ix_issues_cluster_id')
+        batch.drop_constraint('fk_issues_cluster_id', type_='foreignkey')
+        batch.drop_column('cluster_id')
+    op.drop_table('category_rollups')
+    op.drop_index('ix_issue_rollups_category_week', table_name='issue_rollups')
+    op.drop_table('issue_rollups')
+    op.drop_index('ix_issue_clusters_category', table_name='issue_clusters')
+    op.drop_table('issue_clusters')
@@ -0,0 +1,46 @@
+"""Live transcript segments and rolling analysis windows (see src/analysis/live.py)
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0008'
+down_revision = '0007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'live_segments',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('meeting_id', sa.Integer(), sa.ForeignKey('meetings.id'), nullable=False),
+        sa.Column('start_s', sa.Float(), nullable=False),
+        sa.Column('end_s', sa.Float(), nullable=False),
+        sa.Column('speaker', sa.String(100)),
+        sa.Column('text', sa.Text(), nullable=False),
+        sa.Column('created_at', sa.DateTime()),
+    )
+    op.create_index('ix_live_segments_meeting_id_id', 'live_segments', ['meeting_id', 'id'])
+
+    op.create_table(
+        'live_windows',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('meeting_id', sa.Integer(), sa.ForeignKey('meetings.id'), nullable=False),
+        sa.Column('last_segment_id', sa.Integer(), nullable=False),
+        sa.Column('tokens', sa.Integer(), nullable=False),
+        sa.Column('result', sa.Text(), nullable=False),
+        sa.Column('created_at', sa.DateTime()),
+    )
+    op.create_index('ix_live_windows_meeting_id', 'live_windows', ['meeting_id'])
+
+
+def downgrade():
+    op.drop_index('ix_live_windows_meeting_id', table_name='live_windows')
+    op.drop_table('live_windows')
+    op.drop_index('ix_live_segments_meeting_id_id', table_name='live_segments')
+    op.drop_table('live_segments')
@@ -0,0 +1,29 @@
+"""Scheduled bot dispatch: meetings.join_at (see src/jobs/scheduler.py)
+
+- meetings.join_at: when the bot should be in the call (naive UTC)
+- meetings (status, join_at): scheduled meetings reloaded on startup
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0009'
+down_revision = '0008'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('meetings') as batch:
+        batch.add_column(sa.Column('join_at', sa.DateTime()))
+    op.create_index('ix_meetings_status_join_at', 'meetings', ['status', 'join_at'])
+
+
+def downgrade():
+    op.drop_index('ix_meetings_status_join_at', table_name='meetings')
+    with op.batch_alter_table('meetings') as batch:
+        batch.drop_column('join_at')
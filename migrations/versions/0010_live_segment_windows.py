@@ -0,0 +1,57 @@
+"""Live segments claimed by analysis windows, and deduped per delivery (see src/analysis/live.py)
+
+- live_segments.window_id: the window that analyzed the segment (None until claimed)
+- live_segments.delivery_key: unique per meeting, so a redelivered utterance is dropped
+- live_windows.result: None while the window is being analyzed
+
+Existing segments are assigned to the first window whose last_segment_id
+covers them.
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0010'
+down_revision = '0009'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('live_segments') as batch:
+        batch.add_column(sa.Column('delivery_key', sa.String(200)))
+        batch.add_column(sa.Column('window_id', sa.Integer()))
+        batch.create_foreign_key('fk_live_segments_window_id', 'live_windows', ['window_id'], ['id'])
+        batch.create_index('ix_live_segments_meeting_id_window_id', ['meeting_id', 'window_id'])
+        batch.create_index('uq_live_segments_meeting_id_delivery_key', ['meeting_id', 'delivery_key'], unique=True)
+
+    op.execute("""
+        UPDATE live_segments SET window_id = (
+            SELECT MIN(live_windows.id) FROM live_windows
+            WHERE live_windows.meeting_id = live_segments.meeting_id
+              AND live_windows.last_segment_id >= live_segments.id
+        )
+    """)
+
+    with op.batch_alter_table('live_windows') as batch:
+        batch.alter_column('result', existing_type=sa.Text(), nullable=True)
+
+
+def downgrade():
+    # Windows still being analyzed have no result to keep
+    op.execute("UPDATE live_segments SET window_id = NULL WHERE window_id IN "
+               "(SELECT id FROM live_windows WHERE result IS NULL)")
+    op.execute("DELETE FROM live_windows WHERE result IS NULL")
+    with op.batch_alter_table('live_windows') as batch:
+        batch.alter_column('result', existing_type=sa.Text(), nullable=False)
+
+    with op.batch_alter_table('live_segments') as batch:
+        batch.drop_index('uq_live_segments_meeting_id_delivery_key')
+        batch.drop_index('ix_live_segments_meeting_id_window_id')
+        batch.drop_constraint('fk_live_segments_window_id', type_='foreignkey')
+        batch.drop_column('window_id')
+        batch.drop_column('delivery_key')
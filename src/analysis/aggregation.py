@@ -0,0 +1,438 @@
+"""
+Issue Aggregation
+Groups the same issue across meetings and keeps weekly rollups current
+
+Each meeting's issues are matched to IssueClusters by fuzzy title similarity
+(difflib) within the same category. Near-identical issues in one meeting
+become a single Issue row whose mention_count says how many were merged.
+
+The rollups are updated incrementally as analyses are saved. A meeting's
+previous contribution is subtracted and the new one added, so re-analyzing
+a meeting never double counts. The trending view reads only the rollups,
+never the analysis JSON.
+
+Tables:
+    issue_clusters:   one row per distinct issue, with running totals
+    issue_rollups:    mentions per cluster per week
+    category_rollups: mentions per category per week
+
+Usage:
+    python -m src.analysis.aggregation --rebuild    # re-cluster every stored issue
+"""
+import argparse
+import os
+import re
+import threading
+from datetime import datetime, timedelta
+from difflib import SequenceMatcher
+
+from src.analysis.schema import IssueItem
+from src.api.database import db, Meeting, Issue, IssueCluster, IssueRollup, CategoryRollup
+
+DEFAULT_MATCH_THRESHOLD = 0.8
+
+PRIORITY_RANK = {'low': 0, 'medium': 1, 'high': 2}
+
+STOPWORDS = frozenset((
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'in', 'into',
+    'is', 'it', 'lack', 'more', 'need', 'needs', 'not', 'of', 'on', 'or', 'over',
+    'the', 'their', 'to', 'too', 'with', 'without',
+))
+
+
+def match_key(title):
+    """Normalized title: lowercase words, no stopwords, plural s dropped"""
+    words = []
+    for word in re.findall(r'\w+', (title or '').lower()):
+        if word in STOPWORDS:
+            continue
+        if len(word) > 3 and word.endswith('s') and not word.endswith('ss'):
+            word = word[:-1]
+        words.append(word)
+    return ' '.join(words)[:200]
+
+
+def similarity(a, b, floor=0.0):
+    """
+    0-1 similarity of two match keys, ignoring word order
+
+    Pairs that can't reach floor (by difflib's cheap upper bound) score 0.
+    """
+    if a == b:
+        return 1.0
+    if not a or not b:
+        return 0.0
+    in_order = SequenceMatcher(None, a, b)
+    if in_order.quick_ratio() < floor:
+        return 0.0
+    by_word = SequenceMatcher(None, ' '.join(sorted(a.split())), ' '.join(sorted(b.split())))
+    return max(in_order.ratio(), by_word.ratio())
+
+
+def week_start(moment=None):
+    """Monday of the week a datetime falls in"""
+    day = (moment or datetime.utcnow()).date()
+    return day - timedelta(days=day.weekday())
+
+
+class ClusterIndex:
+    """
+    Match keys of every cluster in memory, looked up by (category, word)
+
+    Only clusters sharing a word with the new title are scored. The index
+    is reloaded whole when the clusters' generation (row count and highest
+    id) changes: another process added clusters, possibly committing them
+    out of id order, or --rebuild replaced them all.
+    """
+
+    def __init__(self):
+        self.keys = {}
+        self.by_word = {}
+        self.generation = None
+
+    def add(self, cluster_id, category, key):
+        self.keys[cluster_id] = (category, key)
+        for word in set(key.split()):
+            self.by_word.setdefault((category, word), set()).add(cluster_id)
+
+    def created(self, cluster_id, category, key):
+        """Index a cluster this process just inserted, without a reload"""
+        self.add(cluster_id, category, key)
+        if self.generation is not None:
+            count, last_id = self.generation
+            self.generation = (count + 1, max(last_id or 0, cluster_id))
+
+    def refresh(self, session):
+        generation = tuple(session.query(
+            db.func.count(IssueCluster.id), db.func.max(IssueCluster.id)
+        ).one())
+        if generation == self.generation:
+            return
+        self.keys, self.by_word = {}, {}
+        for cluster_id, category, key in session.query(
+            IssueCluster.id, IssueCluster.category, IssueCluster.match_key
+        ):
+            self.add(cluster_id, category, key)
+        self.generation = generation
+
+    def invalidate(self):
+        """Reload on the next refresh (an indexed entry no longer matches its row)"""
+        self.generation = None
+
+    def matches(self, category, key, threshold):
+        """Cluster ids scoring at least threshold, best first"""
+        candidates = set()
+        for word in set(key.split()):
+            candidates.update(self.by_word.get((category, word), ()))
+        scored = [(similarity(key, self.keys[cluster_id][1], threshold), cluster_id) for cluster_id in candidates]
+        return [cluster_id for score, cluster_id in sorted(scored, reverse=True) if score >= threshold]
+
+
+class IssueAggregator:
+    """Clusters a meeting's issues and applies its contribution to the rollups"""
+
+    def __init__(self, threshold=None):
+        self.threshold = threshold or float(os.getenv('ISSUE_MATCH_THRESHOLD', DEFAULT_MATCH_THRESHOLD))
+        self.index = ClusterIndex()
+        self._lock = threading.Lock()
+
+    def replace(self, session, meeting, issues):
+        """
+        Replace the meeting's Issue rows and update clusters and rollups (no commit)
+
+        Args:
+            session: SQLAlchemy session
+            meeting: Meeting the issues came from
+            issues: List of IssueItem
+        """
+        previous = session.query(Issue).filter_by(meeting_id=meeting.id).all()
+        self._apply(session, meeting, previous, -1)
+        # Through the session, so the identity map doesn't keep the deleted rows
+        for row in previous:
+            session.delete(row)
+        session.flush()
+
+        seen_at = meeting.created_at or datetime.utcnow()
+        groups, unclustered = {}, []
+        for issue in issues:
+            cluster = self._cluster_for(session, issue, seen_at)
+            if cluster is None:
+                unclustered.append([issue])
+            else:
+                groups.setdefault(cluster.id, []).append(issue)
+
+        rows = [self._issue_row(meeting, group, cluster_id) for cluster_id, group in groups.items()]
+        rows += [self._issue_row(meeting, group, None) for group in unclustered]
+        session.add_all(rows)
+        self._apply(session, meeting, rows, 1)
+        return rows
+
+    def _cluster_for(self, session, issue, seen_at):
+        """The cluster an issue belongs to, created if nothing matches"""
+        key = match_key(issue.title)
+        if not key:
+            return None
+        category = issue.category or 'other'
+
+        with self._lock:
+            self.index.refresh(session)
+            for cluster_id in self.index.matches(category, key, self.threshold):
+                # None if another worker created it and hasn't committed yet
+                cluster = session.get(IssueCluster, cluster_id)
+                if cluster is None:
+                    continue
+                if (cluster.category, cluster.match_key) != self.index.keys[cluster_id]:
+                    # The id was reused for another issue (e.g. by --rebuild)
+                    self.index.invalidate()
+                    continue
+                if PRIORITY_RANK.get(issue.priority, 1) > PRIORITY_RANK.get(cluster.priority, 1):
+                    cluster.priority = issue.priority
+                if cluster.last_seen_at is None or seen_at > cluster.last_seen_at:
+                    cluster.last_seen_at = seen_at
+                return cluster
+
+            cluster = IssueCluster(
+                title=issue.title[:200],
+                match_key=key,
+                category=category,
+                priority=issue.priority,
+                mention_count=0,
+                meeting_count=0,
+                first_seen_at=seen_at,
+                last_seen_at=seen_at
+            )
+            session.add(cluster)
+            session.flush()
+            self.index.created(cluster.id, category, key)
+            return cluster
+
+    @staticmethod
+    def _issue_row(meeting, group, cluster_id):
+        """One Issue row for a group of near-identical issues from the same meeting"""
+        first = group[0]
+        priority = max((issue.priority for issue in group), key=lambda p: PRIORITY_RANK.get(p, 1))
+        negative = any(issue.sentiment == 'negative' for issue in group)
+        return Issue(
+            title=first.title[:200],
+            description=first.description,
+            category=first.category or 'other',
+            priority=priority,
+            sentiment='negative' if negative else first.sentiment,
+            mention_count=len(group),
+            meeting_id=meeting.id,
+            cluster_id=cluster_id
+        )
+
+    def _apply(self, session, meeting, rows, sign):
+        """Add (sign=1) or subtract (sign=-1) a meeting's Issue rows from the rollups"""
+        week = week_start(meeting.created_at)
+        categories = {}
+        for row in rows:
+            if row.cluster_id is None:
+                continue
+            mentions = (row.mention_count or 1) * sign
+            session.query(IssueCluster).filter_by(id=row.cluster_id).update({
+                IssueCluster.mention_count: IssueCluster.mention_count + mentions,
+                IssueCluster.meeting_count: IssueCluster.meeting_count + sign,
+            }, synchronize_session=False)
+            increment(session, IssueRollup, {'week_start': week, 'cluster_id': row.cluster_id}, {
+                'mention_count': mentions,
+                'meeting_count': sign,
+                'high_priority_count': sign if row.priority == 'high' else 0,
+                'negative_count': sign if row.sentiment == 'negative' else 0,
+            }, values={'category': row.category})
+            categories[row.category] = categories.get(row.category, 0) + mentions
+
+        for category, mentions in categories.items():
+            increment(session, CategoryRollup, {'week_start': week, 'category': category}, {
+                'mention_count': mentions,
+                'meeting_count': sign,
+            })
+
+    def reset(self):
+        with self._lock:
+            self.index = ClusterIndex()
+
+
+def increment(session, model, keys, deltas, values=None):
+    """
+    Add deltas to a rollup row's counters, inserting the row if missing
+
+    SQLite and Postgres do it in one INSERT ... ON CONFLICT DO UPDATE, so
+    concurrent workers can't both insert the same row.
+    """
+    table = model.__table__
+    row = dict(keys, **(values or {}), **deltas)
+    dialect = session.get_bind().dialect.name
+
+    if dialect in ('sqlite', 'postgresql'):
+        if dialect == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert
+        statement = insert(table).values(**row)
+        statement = statement.on_conflict_do_update(
+            index_elements=list(keys),
+            set_={name: table.c[name] + statement.excluded[name] for name in deltas}
+        )
+        session.execute(statement)
+        return
+
+    updated = session.query(model).filter_by(**keys).update(
+        {getattr(model, name): getattr(model, name) + delta for name, delta in deltas.items()},
+        synchronize_session=False
+    )
+    if not updated:
+        session.add(model(**row))
+
+
+def trending(session, weeks=4, category=None, limit=10, today=None):
+    """
+    Issues with the most mentions in the last `weeks` weeks
+
+    Each is compared with the `weeks` weeks before that. Reads only
+    issue_rollups and the returned clusters.
+
+    Returns:
+        List of dicts, most mentioned first
+    """
+    current_start = week_start(today) - timedelta(weeks=weeks - 1)
+    previous_start = current_start - timedelta(weeks=weeks)
+    in_window = IssueRollup.week_start >= current_start
+
+    current = db.func.sum(db.case((in_window, IssueRollup.mention_count), else_=0))
+    previous = db.func.sum(db.case((in_window, 0), else_=IssueRollup.mention_count))
+    meetings = db.func.sum(db.case((in_window, IssueRollup.meeting_count), else_=0))
+    high_priority = db.func.sum(db.case((in_window, IssueRollup.high_priority_count), else_=0))
+
+    query = session.query(
+        IssueRollup.cluster_id,
+        current.label('mentions'),
+        previous.label('previous_mentions'),
+        meetings.label('meetings'),
+        high_priority.label('high_priority')
+    ).filter(IssueRollup.week_start >= previous_start)
+    if category:
+        query = query.filter(IssueRollup.category == category)
+    rows = query.group_by(IssueRollup.cluster_id).having(current > 0).order_by(
+        current.desc(), (current - previous).desc(), IssueRollup.cluster_id
+    ).limit(limit).all()
+
+    clusters = {
+        cluster.id: cluster
+        for cluster in session.query(IssueCluster).filter(IssueCluster.id.in_([row.cluster_id for row in rows]))
+    } if rows else {}
+
+    results = []
+    for row in rows:
+        cluster = clusters[row.cluster_id]
+        mentions, previous_mentions = int(row.mentions), int(row.previous_mentions)
+        if not previous_mentions:
+            trend = 'new'
+        elif mentions > previous_mentions:
+            trend = 'up'
+        elif mentions < previous_mentions:
+            trend = 'down'
+        else:
+            trend = 'flat'
+        results.append({
+            'cluster_id': cluster.id,
+            'title': cluster.title,
+            'category': cluster.category,
+            'priority': cluster.priority,
+            'mentions': mentions,
+            'previous_mentions': previous_mentions,
+            'change': mentions - previous_mentions,
+            'trend': trend,
+            'meetings': int(row.meetings),
+            'high_priority_mentions': int(row.high_priority),
+            'total_mentions': cluster.mention_count,
+            'first_seen_at': cluster.first_seen_at.isoformat() if cluster.first_seen_at else None,
+            'last_seen_at': cluster.last_seen_at.isoformat() if cluster.last_seen_at else None,
+        })
+    return results
+
+
+def category_weeks(session, weeks=4, category=None, today=None):
+    """Mentions and meetings per category per week, oldest week first"""
+    query = session.query(CategoryRollup).filter(
+        CategoryRollup.week_start >= week_start(today) - timedelta(weeks=weeks - 1)
+    )
+    if category:
+        query = query.filter(CategoryRollup.category == category)
+    return [{
+        'week_start': rollup.week_start.isoformat(),
+        'category': rollup.category,
+        'mentions': rollup.mention_count,
+        'meetings': rollup.meeting_count,
+    } for rollup in query.order_by(CategoryRollup.week_start, CategoryRollup.category)]
+
+
+_aggregator = None
+_aggregator_lock = threading.Lock()
+
+
+def get_issue_aggregator():
+    """Process-wide IssueAggregator (shares one cluster index across workers)"""
+    global _aggregator
+    with _aggregator_lock:
+        if _aggregator is None:
+            _aggregator = IssueAggregator()
+        return _aggregator
+
+
+def rebuild(app):
+    """
+    Re-cluster every stored issue and recompute the rollups
+
+    Issue rows are rebuilt from the stored rows (a merged row counts for
+    its mention_count), so no analysis JSON is read.
+    """
+    aggregator = get_issue_aggregator()
+    with app.app_context():
+        db.session.query(Issue).update({Issue.cluster_id: None}, synchronize_session=False)
+        db.session.query(IssueRollup).delete(synchronize_session=False)
+        db.session.query(CategoryRollup).delete(synchronize_session=False)
+        db.session.query(IssueCluster).delete(synchronize_session=False)
+        db.session.commit()
+        aggregator.reset()
+
+        meeting_ids = [row[0] for row in db.session.query(Issue.meeting_id).filter(
+            Issue.meeting_id.isnot(None)
+        ).distinct().order_by(Issue.meeting_id)]
+        for count, meeting_id in enumerate(meeting_ids, start=1):
+            meeting = db.session.get(Meeting, meeting_id)
+            rows = db.session.query(Issue).filter_by(meeting_id=meeting_id).order_by(Issue.id).all()
+            issues = [
+                IssueItem(
+                    title=row.title,
+                    description=row.description or '',
+                    category=row.category or 'other',
+                    priority=row.priority or 'medium',
+                    sentiment=row.sentiment or 'neutral'
+                )
+                for row in rows for _ in range(row.mention_count or 1)
+            ]
+            aggregator.replace(db.session, meeting, issues)
+            db.session.commit()
+            db.session.expunge_all()
+            if count % 100 == 0:
+                print(f"📊 Aggregated {count} / {len(meeting_ids)} meetings")
+
+        clusters = db.session.query(IssueCluster).count()
+        db.session.remove()
+    print(f"✅ Rollups rebuilt: {len(meeting_ids)} meetings, {clusters} distinct issues")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Cross-meeting issue aggregation')
+    parser.add_argument('--rebuild', action='store_true', help='Re-cluster all issues and recompute rollups')
+    args = parser.parse_args()
+
+    os.environ['PIPELINE_WORKERS_ENABLED'] = 'false'
+    from src.api.app import app
+
+    if args.rebuild:
+        rebuild(app)
+    else:
+        parser.print_help()
@@ -0,0 +1,174 @@
+"""
+Analysis Cache
+In-memory memoization of Claude calls with request coalescing
+
+Results are keyed by a hash of (prompt, model, max_tokens) and kept in an
+LRU with a TTL. Identical requests that arrive while one is already in
+flight wait for that call instead of sending their own (single-flight).
+Every entry records what the original call cost, so hits can be reported
+as tokens, dollars and seconds saved. Token usage of every call actually
+sent, including prompt-cache reads and writes, is totalled as well.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+
+def request_key(prompt, model, max_tokens, **extra):
+    """Stable hash of everything that determines the model's answer"""
+    payload = json.dumps(
+        {'prompt': prompt, 'model': model, 'max_tokens': max_tokens, 'extra': extra},
+        sort_keys=True
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class CallRecord:
+    """Cost and latency of the call that produced a cache entry"""
+
+    def __init__(self, input_tokens=0, output_tokens=0, latency_seconds=0.0, cost_usd=0.0,
+                 cache_read_input_tokens=0, cache_creation_input_tokens=0):
+        self.input_tokens = input_tokens
+        self.output_tokens = output_tokens
+        self.latency_seconds = latency_seconds
+        self.cost_usd = cost_usd
+        self.cache_read_input_tokens = cache_read_input_tokens
+        self.cache_creation_input_tokens = cache_creation_input_tokens
+        self.hits = 0
+
+    def to_dict(self):
+        return {
+            'input_tokens': self.input_tokens,
+            'output_tokens': self.output_tokens,
+            'cache_read_input_tokens': self.cache_read_input_tokens,
+            'cache_creation_input_tokens': self.cache_creation_input_tokens,
+            'latency_seconds': round(self.latency_seconds, 3),
+            'cost_usd': round(self.cost_usd, 6),
+            'hits': self.hits,
+        }
+
+
+class _Entry:
+    def __init__(self, value, record, expires_at):
+        self.value = value
+        self.record = record
+        self.expires_at = expires_at
+
+
+class AnalysisCache:
+    """TTL + LRU cache with single-flight de-duplication"""
+
+    def __init__(self, max_entries=None, ttl_seconds=None):
+        self.max_entries = max_entries or int(os.getenv('ANALYSIS_CACHE_MAX_ENTRIES', 256))
+        self.ttl_seconds = ttl_seconds or int(os.getenv('ANALYSIS_CACHE_TTL_SECONDS', 24 * 3600))
+
+        self._entries = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.saved_cost_usd = 0.0
+        self.saved_seconds = 0.0
+
+        self.usage = {
+            'calls': 0,
+            'input_tokens': 0,
+            'output_tokens': 0,
+            'cache_read_input_tokens': 0,
+            'cache_creation_input_tokens': 0,
+        }
+
+    def get_or_compute(self, key, compute, keep=None):
+        """
+        Return the cached value for key, computing it at most once
+
+        Args:
+            key: Cache key (see request_key)
+            compute: Callable returning (value, CallRecord)
+            keep: Optional Callable(value) -> bool; values it rejects (e.g.
+                failures) go to concurrent callers but are not cached
+
+        Returns:
+            The value
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at > time.time():
+                self._entries.move_to_end(key)
+                self._record_hit(entry.record)
+                return entry.value
+            if entry is not None:
+                del self._entries[key]
+
+            future = self._inflight.get(key)
+            if future is not None:
+                self.coalesced += 1
+                leader = False
+            else:
+                future = Future()
+                self._inflight[key] = future
+                self.misses += 1
+                leader = True
+
+        if not leader:
+            return future.result()
+
+        try:
+            value, record = compute()
+        except Exception as e:
+            with self._lock:
+                del self._inflight[key]
+            future.set_exception(e)
+            raise
+
+        with self._lock:
+            if keep is None or keep(value):
+                self._entries[key] = _Entry(value, record, time.time() + self.ttl_seconds)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+            del self._inflight[key]
+        future.set_result(value)
+        return value
+
+    def _record_hit(self, record):
+        self.hits += 1
+        record.hits += 1
+        self.saved_cost_usd += record.cost_usd
+        self.saved_seconds += record.latency_seconds
+
+    def record_call(self, record):
+        """Add one model call's token usage to the running totals"""
+        with self._lock:
+            self.usage['calls'] += 1
+            self.usage['input_tokens'] += record.input_tokens
+            self.usage['output_tokens'] += record.output_tokens
+            self.usage['cache_read_input_tokens'] += record.cache_read_input_tokens
+            self.usage['cache_creation_input_tokens'] += record.cache_creation_input_tokens
+
+    def records(self):
+        """Per-entry cost/latency records, most recently used first"""
+        with self._lock:
+            return [
+                dict(entry.record.to_dict(), key=key)
+                for key, entry in reversed(self._entries.items())
+            ]
+
+    def stats(self):
+        """Cache counters and what the hits saved"""
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'coalesced': self.coalesced,
+                'saved_cost_usd': round(self.saved_cost_usd, 4),
+                'saved_seconds': round(self.saved_seconds, 1),
+                'usage': dict(self.usage),
+            }
@@ -4,160 +4,458 @@ Analyzes transcripts to extract insights, action items, and sentiment
 """
 import os
 import json
+import time
 from anthropic import Anthropic
 from dotenv import load_dotenv
 
-load_dotenv()
-
-
-class MeetingAnalyzer:
-    """Analyze meeting transcripts using Claude"""
+from src.analysis.analysis_cache import AnalysisCache, CallRecord, request_key
+from src.analysis.mapreduce import MapReduceAnalyzer, SCHEMA_KEYS, estimate_tokens
+from src.analysis.schema import MeetingAnalysis
+from src.analysis.streaming import SectionStreamParser
+from src.analysis.structured import StructuredTranscript
+from src.providers.client import get_client
 
-    def __init__(self):
-        api_key = os.getenv('ANTHROPIC_API_KEY')
-        if not api_key:
-            print("⚠️  Warning: ANTHROPIC_API_KEY not set")
-            self.client = None
-        else:
-            self.client = Anthropic(api_key=api_key)
-
-    def analyze_meeting(self, transcript, meeting_name="Meeting"):
-        """
-        Analyze a meeting transcript and extract insights
-
-        Args:
-            transcript: The meeting transcript text
-            meeting_name: Name of the meeting
+load_dotenv()
 
-        Returns:
-            JSON string with analysis results
-        """
-        if not self.client:
-            return self._demo_analysis()
+MODEL = "claude-sonnet-4-20250514"
 
-        prompt = f"""Analyze this meeting transcript and provide a comprehensive summary in JSON format.
+# USD per million tokens, used to report what cache hits save
+INPUT_COST_PER_MTOK = 3.0
+OUTPUT_COST_PER_MTOK = 15.0
+# Prompt-cache writes cost 1.25x the input rate, reads 0.1x
+CACHE_WRITE_COST_PER_MTOK = 3.75
+CACHE_READ_COST_PER_MTOK = 0.30
 
-Meeting: {meeting_name}
+# Sample analysis returned when no API key is configured
+DEMO_ANALYSIS = {
+    "executive_summary": "Meeting discussed critical graduate student concerns including mental health resources and housing affordability. Multiple departments reported 3-4 week wait times for counseling appointments. Students spending 60%+ of stipends on rent.",
+    "key_topics": [
+        {
+            "topic": "Mental Health Resources",
+            "description": "Students reporting 3-4 week wait times for counseling. Need for PhD-specific support.",
+            "time_spent": "High importance, mentioned by multiple speakers"
+        },
+        {
+            "topic": "Housing Affordability",
+            "description": "Cambridge rent consuming 60%+ of stipends. Students considering leaving MIT.",
+            "time_spent": "Medium-high importance"
+        }
+    ],
+    "issues_identified": [
+        {
+            "title": "Mental Health Counseling Wait Times",
+            "description": "Students waiting 3-4 weeks for appointments. PhD students need specialized support for research stress.",
+            "category": "mental_health",
+            "priority": "high",
+            "sentiment": "negative",
+            "mentioned_by": "Multiple students across departments"
+        },
+        {
+            "title": "Housing Cost Burden",
+            "description": "Rent taking 60%+ of student stipends, particularly affecting international students without family nearby.",
+            "category": "housing",
+            "priority": "high",
+            "sentiment": "negative",
+            "mentioned_by": "Graduate students"
+        }
+    ],
+    "action_items": [
+        {
+            "action": "Bring mental health wait times to GSC as urgent priority",
+            "priority": "high",
+            "owner": "Representative"
+        },
+        {
+            "action": "Request meeting with Mental Health Services director",
+            "priority": "high",
+            "owner": "Representative"
+        },
+        {
+            "action": "Compile housing cost data from students",
+            "priority": "medium",
+            "owner": "Representative"
+        }
+    ],
+    "notable_quotes": [
+        {
+            "quote": "Many students are waiting 3 to 4 weeks for counseling appointments.",
+            "speaker": "Speaker 2",
+            "context": "Highlighting urgent mental health resource gap"
+        },
+        {
+            "quote": "Many students are spending over 60% of their stipend on rent. It's becoming financially unsustainable.",
+            "speaker": "Speaker 2",
+            "context": "Housing affordability crisis"
+        }
+    ],
+    "sentiment_analysis": {
+        "overall": "negative",
+        "breakdown": {
+            "positive_percent": 10,
+            "neutral_percent": 25,
+            "negative_percent": 65
+        },
+        "explanation": "Predominantly negative sentiment reflecting serious concerns about mental health and housing. Students appreciate being heard but express frustration with current situation."
+    },
+    "recommendations": [
+        "Schedule emergency GSC meeting to address mental health resource shortage",
+        "Survey graduate students across all departments on mental health needs and wait times",
+        "Research peer institution models for mental health support and housing subsidies",
+        "Propose pilot housing subsidy program for graduate students",
+        "Create task force to address both issues with administration"
+    ],
+    "patterns": [
+        "Mental health concerns span multiple departments - suggests systemic university-wide issue",
+        "Housing concerns disproportionately affect international students",
+        "Students want action, not just discussion - emphasis on concrete solutions"
+    ]
+}
 
-Transcript:
-{transcript}
+# Fixed part of the analysis prompt, sent as a cacheable system block. It
+# must stay above the 1024-token minimum Anthropic caches, or the
+# cache_control marker is silently ignored.
+ANALYSIS_INSTRUCTIONS = """You analyze meeting transcripts for a student representative. Each request gives a meeting name and its transcript. Analyze the transcript and provide a comprehensive summary in JSON format.
 
 Please provide a JSON response with the following structure:
-{{
+{
     "executive_summary": "Brief 2-3 sentence summary of the meeting",
     "key_topics": [
-        {{
+        {
             "topic": "Topic name",
             "description": "What was discussed",
             "time_spent": "Approximate time or importance"
-        }}
+        }
     ],
     "issues_identified": [
-        {{
+        {
             "title": "Issue title",
             "description": "Detailed description",
             "category": "mental_health|housing|funding|academic|career|other",
             "priority": "high|medium|low",
             "sentiment": "positive|neutral|negative",
             "mentioned_by": "Who raised it"
-        }}
+        }
     ],
     "action_items": [
-        {{
+        {
             "action": "What needs to be done",
             "priority": "high|medium|low",
             "owner": "Who should do it (if mentioned)"
-        }}
+        }
     ],
     "notable_quotes": [
-        {{
+        {
             "quote": "The actual quote",
             "speaker": "Who said it",
             "context": "Why it's important"
-        }}
+        }
     ],
-    "sentiment_analysis": {{
+    "sentiment_analysis": {
         "overall": "positive|mixed|negative",
-        "breakdown": {{
+        "breakdown": {
             "positive_percent": 0,
             "neutral_percent": 0,
             "negative_percent": 0
-        }},
+        },
         "explanation": "Brief explanation of the sentiment"
-    }},
+    },
     "recommendations": [
         "Specific actionable recommendation for the representative"
     ],
     "patterns": [
         "Any patterns or trends observed"
     ]
-}}
+}
+
+How to fill in each section:
+
+executive_summary: what the meeting was about and what came out of it, for a reader who was not there. Name the main issues and any decisions.
+
+key_topics: the subjects that took up the meeting, most discussed first. time_spent says roughly how much of the meeting each took or how much weight it was given.
+
+issues_identified: one entry per distinct problem raised. If the same problem comes up several times, list it once. Titles are short (under ten words) and specific, so the same issue raised in another meeting gets a similar title: "Counseling appointment wait times", not "Mental health". Categories:
+- mental_health: counseling access and wait times, stress and burnout, advising relationships that affect wellbeing
+- housing: rent, graduate housing availability and quality, leases, commuting
+- funding: stipends, fellowships, summer and travel funding, tuition and fees, health insurance costs
+- academic: courses, qualifying exams, degree requirements, advising on research, lab and library resources
+- career: internships, job search support, industry and faculty placement, work authorization for jobs
+- other: anything that fits none of the above; don't force an issue into a category
+Priority:
+- high: affects many students, or their health, safety, finances or ability to stay enrolled, or needs action within weeks
+- medium: a real problem for a group of students that can wait for the normal governance cycle
+- low: an inconvenience, a suggestion, or something raised by one person without support from others
+Sentiment is how speakers felt about the issue, not whether the issue itself is good or bad news. mentioned_by names speakers or groups ("international students", "Speaker 3"), never guesses.
+
+action_items: only things someone agreed to do or was asked to do in the meeting. owner is the person or body named; use "Representative" when the representative took it on, and leave it empty when nobody was named.
+
+notable_quotes: at most five, copied verbatim from the transcript. Never paraphrase or merge quotes. context says why the quote matters.
+
+sentiment_analysis: the mood of the whole meeting. The three percentages add up to 100. overall is "mixed" when neither positive nor negative clearly dominates.
+
+recommendations: concrete next steps for the representative, each one something they could start this week. Don't restate the action items.
+
+patterns: observations that connect issues, such as a problem that spans departments or falls hardest on one group of students.
+
+If the transcript is short, off-topic or mostly inaudible, return empty lists and say so in the summary rather than inventing content.
+
+Example response for a meeting about counseling wait times and rent:
+""" + json.dumps(DEMO_ANALYSIS, indent=4) + """
 
 Provide only the JSON response, no additional text."""
 
-        try:
-            message = self.client.messages.create(
-                model="claude-sonnet-4-20250514",
-                max_tokens=4096,
-                messages=[
-                    {"role": "user", "content": prompt}
-                ]
-            )
 
-            # Extract JSON from response
-            response_text = message.content[0].text
+class MeetingAnalyzer:
+    """Analyze meeting transcripts using Claude"""
+
+    def __init__(self):
+        self.http = get_client()
+        self.cache = AnalysisCache()
+        self.map_reduce = MapReduceAnalyzer(self._complete)
+        self.map_reduce_threshold = int(os.getenv('ANALYSIS_MAP_REDUCE_TOKENS', 40000))
+        self.prompt_caching = os.getenv('ANALYSIS_PROMPT_CACHING', 'true').lower() == 'true'
+        api_key = os.getenv('ANTHROPIC_API_KEY')
+        if not api_key:
+            print("⚠️  Warning: ANTHROPIC_API_KEY not set")
+            self.client = None
+        else:
+            # Retries are handled by the shared provider client
+            self.client = Anthropic(api_key=api_key, max_retries=0)
+
+    def _call(self, prompt, max_tokens, system=None):
+        """
+        Send a single-turn prompt to Claude
+
+        Returns:
+            (response text, CallRecord)
+        """
+        started = time.monotonic()
+        params = {}
+        if system:
+            params['system'] = system
+        message = self.http.call(
+            'api.anthropic.com',
+            self.client.messages.create,
+            model=MODEL,
+            max_tokens=max_tokens,
+            messages=[
+                {"role": "user", "content": prompt}
+            ],
+            **params
+        )
+        record = self._record_usage(message.usage, time.monotonic() - started)
+        return message.content[0].text, record
+
+    def _record_usage(self, usage, latency_seconds):
+        """Build the CallRecord for one response and log its prompt-cache use"""
+        cache_read = getattr(usage, 'cache_read_input_tokens', None) or 0
+        cache_write = getattr(usage, 'cache_creation_input_tokens', None) or 0
+        record = CallRecord(
+            input_tokens=usage.input_tokens,
+            output_tokens=usage.output_tokens,
+            latency_seconds=latency_seconds,
+            cost_usd=(usage.input_tokens * INPUT_COST_PER_MTOK
+                      + cache_write * CACHE_WRITE_COST_PER_MTOK
+                      + cache_read * CACHE_READ_COST_PER_MTOK
+                      + usage.output_tokens * OUTPUT_COST_PER_MTOK) / 1_000_000,
+            cache_read_input_tokens=cache_read,
+            cache_creation_input_tokens=cache_write
+        )
+        self.cache.record_call(record)
+        if cache_read or cache_write:
+            print(f"🧠 Prompt cache: {cache_read} tokens read, {cache_write} written")
+        return record
+
+    def _complete(self, prompt, max_tokens):
+        """
+        Send a single-turn prompt to Claude and return the response text
+
+        Identical prompts are served from the analysis cache, and concurrent
+        identical requests share one in-flight call.
+        """
+        key = request_key(prompt, MODEL, max_tokens)
+        return self.cache.get_or_compute(key, lambda: self._call(prompt, max_tokens))
+
+    def _analysis_prompt(self, transcript, meeting_name):
+        """Meeting-specific part of the analysis prompt (see ANALYSIS_INSTRUCTIONS)"""
+        return f"""Meeting: {meeting_name}
+
+Transcript:
+{transcript}"""
+
+    def _system(self):
+        """
+        Analysis instructions as a system block
+
+        The block is identical on every call, so it is marked for prompt
+        caching; only the meeting and transcript that follow it are
+        processed from scratch. ANALYSIS_INSTRUCTIONS carries the full
+        rubric and an example so it is long enough to be cached.
+        """
+        block = {"type": "text", "text": ANALYSIS_INSTRUCTIONS}
+        if self.prompt_caching:
+            block["cache_control"] = {"type": "ephemeral"}
+        return [block]
+
+    def analyze(self, transcript, meeting_name="Meeting"):
+        """
+        Analyze a meeting transcript in a single model pass
+
+        The parsed result is cached, so analyze_meeting and extract_issues
+        on the same transcript share one call and one parse.
+
+        Args:
+            transcript: The meeting transcript text, or a StructuredTranscript
+            meeting_name: Name of the meeting
+
+        Returns:
+            MeetingAnalysis
+        """
+        if not self.client:
+            return MeetingAnalysis.from_dict(json.loads(self._demo_analysis()))
+
+        segments = transcript if isinstance(transcript, StructuredTranscript) else None
+        if segments is not None:
+            transcript = segments.to_text()
+
+        if estimate_tokens(transcript) > self.map_reduce_threshold:
+            # Too long for one prompt (or one 4096-token answer)
+            try:
+                analysis = MeetingAnalysis.from_dict(self.map_reduce.analyze(segments or transcript, meeting_name))
+                print("✅ Meeting analysis complete")
+                return analysis
+            except Exception as e:
+                print(f"❌ Analysis error: {e}")
+                return MeetingAnalysis.failed(str(e))
+
+        prompt = self._analysis_prompt(transcript, meeting_name)
+        system = self._system()
 
-            # Try to parse as JSON
-            analysis = json.loads(response_text)
+        def call_and_parse():
+            response_text, record = self._call(prompt, 4096, system)
+            try:
+                return MeetingAnalysis.from_dict(json.loads(response_text)), record
+            except json.JSONDecodeError:
+                # If response isn't valid JSON, wrap it
+                return MeetingAnalysis.failed(
+                    "Failed to parse structured analysis",
+                    executive_summary=response_text[:500]
+                ), record
 
+        try:
+            analysis = self.cache.get_or_compute(
+                request_key(prompt, MODEL, 4096, parsed=True, system=ANALYSIS_INSTRUCTIONS),
+                call_and_parse,
+                # An unparseable answer is retried on the next request
+                keep=lambda analysis: not analysis.error
+            )
             print("✅ Meeting analysis complete")
-            return json.dumps(analysis, indent=2)
-
-        except json.JSONDecodeError:
-            # If response isn't valid JSON, wrap it
-            return json.dumps({
-                "executive_summary": response_text[:500],
-                "error": "Failed to parse structured analysis"
-            })
+            return analysis
+
         except Exception as e:
             print(f"❌ Analysis error: {e}")
-            return json.dumps({"error": str(e)})
+            return MeetingAnalysis.failed(str(e))
 
-    def extract_issues(self, transcript):
-        """Extract just the issues from a transcript"""
-        if not self.client:
-            return []
+    def analyze_stream(self, transcript, meeting_name="Meeting", on_section=None, completed=None):
+        """
+        Analyze a meeting while streaming the response
 
-        prompt = f"""Extract all issues, concerns, or problems mentioned in this meeting transcript.
+        Each top-level section is handed to on_section as soon as its JSON
+        closes. Sections passed in as `completed` (from an earlier,
+        interrupted run) are not requested again; the model is asked only
+        for the missing ones.
 
-Transcript:
-{transcript}
+        Args:
+            transcript: The meeting transcript text, or a StructuredTranscript
+            meeting_name: Name of the meeting
+            on_section: Optional Callable(key, value, sections_so_far)
+            completed: Optional dict of sections already produced
 
-For each issue, provide:
-- Title (brief, 5-10 words)
-- Description (detailed)
-- Category (mental_health, housing, funding, academic, career, or other)
-- Priority (high, medium, low based on urgency and frequency)
-- Sentiment (how people feel about it)
+        Returns:
+            MeetingAnalysis
+        """
+        text = transcript.to_text() if isinstance(transcript, StructuredTranscript) else transcript
+        if not self.client or estimate_tokens(text) > self.map_reduce_threshold:
+            # Demo mode and map-reduce produce the whole analysis at once
+            analysis = self.analyze(transcript, meeting_name)
+            if on_section:
+                sections = {}
+                for key, value in analysis.to_dict().items():
+                    sections[key] = value
+                    on_section(key, value, dict(sections))
+            return analysis
 
-Return as JSON array."""
+        sections = dict(completed or {})
+        base_prompt = self._analysis_prompt(text, meeting_name)
+        system = self._system()
 
-        try:
-            message = self.client.messages.create(
-                model="claude-sonnet-4-20250514",
-                max_tokens=2048,
+        def stream():
+            missing = [key for key in SCHEMA_KEYS if key not in sections]
+            if not missing:
+                return
+            prompt = base_prompt
+            if sections:
+                prompt += (
+                    "\n\nThese sections were already produced and must not be repeated: "
+                    f"{', '.join(sections)}. Return a JSON object containing only these keys: "
+                    f"{', '.join(missing)}."
+                )
+
+            parser = SectionStreamParser()
+            started = time.monotonic()
+            with self.client.messages.stream(
+                model=MODEL,
+                max_tokens=4096,
+                system=system,
                 messages=[
                     {"role": "user", "content": prompt}
                 ]
-            )
-
-            issues = json.loads(message.content[0].text)
-            return issues
+            ) as response:
+                for text in response.text_stream:
+                    for key, value in parser.feed(text):
+                        sections[key] = value
+                        if on_section:
+                            on_section(key, value, dict(sections))
+                self._record_usage(response.get_final_message().usage, time.monotonic() - started)
 
+        try:
+            # A retry after a dropped stream resumes from the sections received
+            self.http.call('api.anthropic.com', stream)
         except Exception as e:
-            print(f"❌ Issue extraction error: {e}")
+            print(f"❌ Analysis error: {e}")
+            if not sections:
+                return MeetingAnalysis.failed(str(e))
+
+        analysis = MeetingAnalysis.from_dict(sections)
+        missing = [key for key in SCHEMA_KEYS if key not in sections]
+        if missing:
+            analysis.warning = f"Analysis incomplete; missing sections: {', '.join(missing)}"
+        print("✅ Meeting analysis complete")
+        return analysis
+
+    def analyze_meeting(self, transcript, meeting_name="Meeting"):
+        """
+        Analyze a meeting transcript and extract insights
+
+        Args:
+            transcript: The meeting transcript text
+            meeting_name: Name of the meeting
+
+        Returns:
+            JSON string with analysis results
+        """
+        return self.analyze(transcript, meeting_name).to_json()
+
+    def extract_issues(self, transcript, meeting_name="Meeting"):
+        """
+        Extract just the issues from a transcript
+
+        Served from the same analysis pass as analyze_meeting.
+        """
+        if not self.client:
             return []
 
+        return [issue.to_dict() for issue in self.analyze(transcript, meeting_name).issues]
+
     def _demo_analysis(self):
         """Return demo analysis for testing"""
         print("🤖 Demo Analyzer: Using sample analysis")
@@ -165,89 +463,7 @@ Return as JSON array."""
         print("   1. Add ANTHROPIC_API_KEY to .env")
         print("   2. Run again with real API key")
 
-        return json.dumps({
-            "executive_summary": "Meeting discussed critical graduate student concerns including mental health resources and housing affordability. Multiple departments reported 3-4 week wait times for counseling appointments. Students spending 60%+ of stipends on rent.",
-            "key_topics": [
-                {
-                    "topic": "Mental Health Resources",
-                    "description": "Students reporting 3-4 week wait times for counseling. Need for PhD-specific support.",
-                    "time_spent": "High importance, mentioned by multiple speakers"
-                },
-                {
-                    "topic": "Housing Affordability",
-                    "description": "Cambridge rent consuming 60%+ of stipends. Students considering leaving MIT.",
-                    "time_spent": "Medium-high importance"
-                }
-            ],
-            "issues_identified": [
-                {
-                    "title": "Mental Health Counseling Wait Times",
-                    "description": "Students waiting 3-4 weeks for appointments. PhD students need specialized support for research stress.",
-                    "category": "mental_health",
-                    "priority": "high",
-                    "sentiment": "negative",
-                    "mentioned_by": "Multiple students across departments"
-                },
-                {
-                    "title": "Housing Cost Burden",
-                    "description": "Rent taking 60%+ of student stipends, particularly affecting international students without family nearby.",
-                    "category": "housing",
-                    "priority": "high",
-                    "sentiment": "negative",
-                    "mentioned_by": "Graduate students"
-                }
-            ],
-            "action_items": [
-                {
-                    "action": "Bring mental health wait times to GSC as urgent priority",
-                    "priority": "high",
-                    "owner": "Representative"
-                },
-                {
-                    "action": "Request meeting with Mental Health Services director",
-                    "priority": "high",
-                    "owner": "Representative"
-                },
-                {
-                    "action": "Compile housing cost data from students",
-                    "priority": "medium",
-                    "owner": "Representative"
-                }
-            ],
-            "notable_quotes": [
-                {
-                    "quote": "Many students are waiting 3 to 4 weeks for counseling appointments.",
-                    "speaker": "Speaker 2",
-                    "context": "Highlighting urgent mental health resource gap"
-                },
-                {
-                    "quote": "Many students are spending over 60% of their stipend on rent. It's becoming financially unsustainable.",
-                    "speaker": "Speaker 2",
-                    "context": "Housing affordability crisis"
-                }
-            ],
-            "sentiment_analysis": {
-                "overall": "negative",
-                "breakdown": {
-                    "positive_percent": 10,
-                    "neutral_percent": 25,
-                    "negative_percent": 65
-                },
-                "explanation": "Predominantly negative sentiment reflecting serious concerns about mental health and housing. Students appreciate being heard but express frustration with current situation."
-            },
-            "recommendations": [
-                "Schedule emergency GSC meeting to address mental health resource shortage",
-                "Survey graduate students across all departments on mental health needs and wait times",
-                "Research peer institution models for mental health support and housing subsidies",
-                "Propose pilot housing subsidy program for graduate students",
-                "Create task force to address both issues with administration"
-            ],
-            "patterns": [
-                "Mental health concerns span multiple departments - suggests systemic university-wide issue",
-                "Housing concerns disproportionately affect international students",
-                "Students want action, not just discussion - emphasis on concrete solutions"
-            ]
-        }, indent=2)
+        return json.dumps(DEMO_ANALYSIS, indent=2)
 
 
 # Quick test function
@@ -0,0 +1,272 @@
+"""
+Batch Meeting Analysis
+Backfills analyses for many meetings with the Message Batches API
+
+Selects meetings that have a transcript but no analysis and submits them as
+one batch. Then it polls until the batch ends and writes the results back
+in bulk commits. Every meeting gets its own outcome: completed, or failed
+with the error from its batch result.
+
+Usage:
+    python -m src.analysis.batch --limit 500
+    python -m src.analysis.batch --resume        # collect batches already submitted
+
+Point ANTHROPIC_BASE_URL at `python -m src.analysis.fake_batches` to try it
+without the real API.
+"""
+import argparse
+import json
+import os
+import time
+from datetime import datetime
+
+from src.analysis.analyzer import MODEL
+from src.analysis.mapreduce import estimate_tokens
+from src.analysis.schema import MeetingAnalysis
+from src.api.database import db, Meeting
+from src.api.events import get_event_bus
+from src.jobs.pipeline import PROCESSING_STATUSES, save_analysis
+
+
+class BatchAnalyzer:
+    """Submit, poll and collect Message Batches analysis jobs"""
+
+    def __init__(self, app, analyzer, commit_size=None, poll_interval=None):
+        """
+        Args:
+            app: Flask app (for database access)
+            analyzer: MeetingAnalyzer providing the client and prompt
+            commit_size: Results written per database commit
+            poll_interval: Seconds between batch status checks
+        """
+        self.app = app
+        self.analyzer = analyzer
+        self.commit_size = commit_size or int(os.getenv('BATCH_COMMIT_SIZE', 100))
+        self.poll_interval = poll_interval or float(os.getenv('BATCH_POLL_INTERVAL', 30))
+
+    @property
+    def batches(self):
+        client = self.analyzer.client
+        if client is None:
+            raise Exception("ANTHROPIC_API_KEY not set")
+        # Older SDKs only expose batches under client.beta
+        return getattr(client.messages, 'batches', None) or client.beta.messages.batches
+
+    def pending_meetings(self, limit=None):
+        """Meetings with a transcript, no analysis, and nothing else working on them"""
+        query = Meeting.query.filter(
+            Meeting.has('transcript'),
+            db.not_(Meeting.has('analysis')),
+            # NOT IN is never true for NULL; legacy rows have no status
+            db.or_(Meeting.status.is_(None), Meeting.status.notin_(PROCESSING_STATUSES))
+        ).options(db.undefer(Meeting.transcript_inline)).order_by(Meeting.id)
+        if limit:
+            query = query.limit(limit)
+        return query.all()
+
+    def submit(self, limit=None):
+        """
+        Submit every pending meeting as a single batch
+
+        Returns:
+            (batch id or None, ids skipped as too long for one prompt)
+        """
+        with self.app.app_context():
+            requests, skipped = [], []
+            meetings = self.pending_meetings(limit)
+            for meeting in meetings:
+                if estimate_tokens(meeting.transcript) > self.analyzer.map_reduce_threshold:
+                    # Needs map-reduce; leave it for the regular pipeline
+                    skipped.append(meeting.id)
+                    continue
+                requests.append({
+                    'custom_id': f'meeting-{meeting.id}',
+                    'params': {
+                        'model': MODEL,
+                        'max_tokens': 4096,
+                        'system': self.analyzer._system(),
+                        'messages': [{
+                            'role': 'user',
+                            'content': self.analyzer._analysis_prompt(meeting.transcript, meeting.meeting_name)
+                        }]
+                    }
+                })
+
+            if not requests:
+                print("Nothing to analyze")
+                return None, skipped
+
+            batch = self.batches.create(requests=requests)
+
+            submitted = {r['custom_id'] for r in requests}
+            analyzing = []
+            for meeting in meetings:
+                if f'meeting-{meeting.id}' in submitted:
+                    meeting.status = 'analyzing'
+                    meeting.analysis_batch_id = batch.id
+                    analyzing.append(self._status_event(meeting))
+            db.session.commit()
+            self._publish(analyzing)
+            db.session.remove()
+
+        print(f"📦 Submitted batch {batch.id} with {len(requests)} meetings")
+        return batch.id, skipped
+
+    def wait(self, batch_id):
+        """Poll until the batch has ended"""
+        while True:
+            batch = self.batches.retrieve(batch_id)
+            if batch.processing_status == 'ended':
+                return batch
+            counts = batch.request_counts
+            print(f"⏳ Batch {batch_id}: {counts.processing} processing, {counts.succeeded} succeeded")
+            time.sleep(self.poll_interval)
+
+    def collect(self, batch_id):
+        """
+        Write an ended batch's results back to the meetings
+
+        Returns:
+            {'succeeded': [meeting ids], 'failed': {meeting id: error}}
+        """
+        summary = {'succeeded': [], 'failed': {}}
+
+        with self.app.app_context():
+            pending = []
+            for entry in self.batches.results(batch_id):
+                meeting_id = int(entry.custom_id.split('-', 1)[1])
+                meeting = db.session.get(Meeting, meeting_id)
+                if meeting is None:
+                    continue
+
+                applied, error = self._apply_result(meeting, batch_id, entry.result)
+                if not applied:
+                    # Picked up by the pipeline, or resubmitted, meanwhile
+                    continue
+                if error:
+                    summary['failed'][meeting_id] = error
+                else:
+                    summary['succeeded'].append(meeting_id)
+
+                pending.append(self._status_event(meeting))
+                if len(pending) >= self.commit_size:
+                    db.session.commit()
+                    self._publish(pending)
+                    pending = []
+
+            # Anything the batch never reported on (e.g. results expired)
+            missing = Meeting.query.filter_by(analysis_batch_id=batch_id, status='analyzing').all()
+            for meeting in missing:
+                meeting.status = 'failed'
+                meeting.error_message = f"No result in batch {batch_id}"
+                summary['failed'][meeting.id] = meeting.error_message
+                pending.append(self._status_event(meeting))
+
+            db.session.commit()
+            self._publish(pending)
+            db.session.remove()
+
+        print(f"✅ Batch {batch_id}: {len(summary['succeeded'])} analyzed, {len(summary['failed'])} failed")
+        return summary
+
+    def _apply_result(self, meeting, batch_id, result):
+        """
+        Store one batch result on its meeting
+
+        Only while the meeting is still 'analyzing' for this batch: the
+        status moves in one conditional UPDATE before anything is written.
+
+        Returns:
+            (applied, error string or None)
+        """
+        if result.type != 'succeeded':
+            error = f"Batch request {result.type}"
+            details = getattr(result, 'error', None)
+            if details is not None:
+                inner = getattr(details, 'error', details)
+                error += f": {getattr(inner, 'message', inner)}"
+            return self._claim(meeting, batch_id, 'failed', error_message=error), error
+
+        text = result.message.content[0].text
+        try:
+            analysis = MeetingAnalysis.from_dict(json.loads(text))
+        except json.JSONDecodeError:
+            analysis = MeetingAnalysis.failed(
+                "Failed to parse structured analysis",
+                executive_summary=text[:500]
+            )
+
+        if not self._claim(meeting, batch_id, 'completed', error_message=None, completed_at=datetime.utcnow()):
+            return False, None
+        save_analysis(meeting, analysis)
+        return True, None
+
+    @staticmethod
+    def _claim(meeting, batch_id, status, **values):
+        """Set the meeting's outcome if it still waits on this batch; True if it did"""
+        values['status'] = status
+        claimed = Meeting.query.filter_by(
+            id=meeting.id, status='analyzing', analysis_batch_id=batch_id
+        ).update({getattr(Meeting, name): value for name, value in values.items()}, synchronize_session=False)
+        if claimed:
+            # Keep the loaded row in step with what was written
+            for name, value in values.items():
+                setattr(meeting, name, value)
+        return bool(claimed)
+
+    @staticmethod
+    def _status_event(meeting):
+        """(meeting id, status event data), as the pipeline publishes it"""
+        data = {'status': meeting.status}
+        if meeting.status == 'failed':
+            data['error_message'] = meeting.error_message
+        return meeting.id, data
+
+    @staticmethod
+    def _publish(status_events):
+        """Send status events once the changes they describe are committed"""
+        events = get_event_bus()
+        for meeting_id, data in status_events:
+            events.publish(meeting_id, 'status', data)
+
+    def outstanding_batches(self):
+        """Batch ids with meetings still waiting on results"""
+        with self.app.app_context():
+            rows = db.session.query(Meeting.analysis_batch_id).filter(
+                Meeting.status == 'analyzing',
+                Meeting.analysis_batch_id.isnot(None)
+            ).distinct().all()
+            db.session.remove()
+        return [row[0] for row in rows]
+
+    def run(self, limit=None):
+        """Submit pending meetings, wait for the batch and collect it"""
+        batch_id, skipped = self.submit(limit)
+        if skipped:
+            print(f"⚠️  Skipped {len(skipped)} meetings too long for a single prompt")
+        if batch_id is None:
+            return {'succeeded': [], 'failed': {}, 'skipped': skipped}
+        self.wait(batch_id)
+        summary = self.collect(batch_id)
+        summary['skipped'] = skipped
+        return summary
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Backfill meeting analyses in one batch')
+    parser.add_argument('--limit', type=int, help='Maximum meetings to submit')
+    parser.add_argument('--resume', action='store_true',
+                        help='Collect batches submitted by an earlier run instead of submitting')
+    args = parser.parse_args()
+
+    # This process only talks to the batch API; leave queued jobs to the server
+    os.environ['PIPELINE_WORKERS_ENABLED'] = 'false'
+    from src.api.app import app, analyzer
+
+    batch_analyzer = BatchAnalyzer(app, analyzer)
+    if args.resume:
+        for batch_id in batch_analyzer.outstanding_batches():
+            batch_analyzer.wait(batch_id)
+            batch_analyzer.collect(batch_id)
+    else:
+        print(json.dumps(batch_analyzer.run(args.limit), indent=2))
@@ -0,0 +1,160 @@
+"""
+Chunked Transcription
+Splits long recordings on silence and transcribes the pieces in parallel
+
+Chunks overlap slightly so no word is cut at a boundary. Every chunk owns the
+"core" span between its two cut points; when stitching, a segment is kept
+only if its midpoint falls inside the core of the chunk that produced it,
+which drops the duplicates from the overlap.
+"""
+import os
+import re
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class ChunkedTranscriber:
+    """Parallel, silence-aligned transcription for long audio files"""
+
+    def __init__(self, transcribe_chunk, max_workers=None, chunk_seconds=600,
+                 overlap_seconds=2.0, search_seconds=30, min_silence_ms=500,
+                 silence_thresh_db=-40):
+        """
+        Args:
+            transcribe_chunk: Callable(path) returning a list of
+                {'start', 'end', 'text'} segments (seconds, chunk-relative)
+            max_workers: Chunks transcribed concurrently
+            chunk_seconds: Target chunk length
+            overlap_seconds: Audio shared by neighbouring chunks
+            search_seconds: How far either side of the target to look for silence
+            min_silence_ms: Shortest pause counted as a cut point
+            silence_thresh_db: Loudness below which audio counts as silence
+        """
+        self.transcribe_chunk = transcribe_chunk
+        self.max_workers = max_workers or int(os.getenv('TRANSCRIBE_CHUNK_WORKERS', 4))
+        self.chunk_ms = int(chunk_seconds * 1000)
+        self.overlap_ms = int(overlap_seconds * 1000)
+        self.search_ms = int(search_seconds * 1000)
+        self.min_silence_ms = min_silence_ms
+        self.silence_thresh_db = silence_thresh_db
+
+    def transcribe(self, audio_file_path, on_progress=None):
+        """
+        Transcribe a long audio file chunk by chunk
+
+        Args:
+            audio_file_path: Path to the audio file
+            on_progress: Optional Callable(done, total) after each chunk
+
+        Returns:
+            List of stitched {'start', 'end', 'text'} segments (absolute seconds)
+        """
+        from pydub import AudioSegment
+
+        # Decode straight to 16 kHz mono; plenty for speech and ~10x less memory
+        audio = AudioSegment.from_file(audio_file_path, parameters=['-ac', '1', '-ar', '16000'])
+        cuts = self.plan_cuts(audio)
+        total = len(cuts) - 1
+
+        print(f"🎙️  Transcribing {total} chunks with {self.max_workers} workers...")
+
+        done = [0]
+        lock = threading.Lock()
+
+        def run(index):
+            segments = self._transcribe_span(audio, cuts[index], cuts[index + 1])
+            with lock:
+                done[0] += 1
+                finished = done[0]
+            if on_progress:
+                on_progress(finished, total)
+            return segments
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            results = list(executor.map(run, range(total)))
+
+        return stitch_segments(results, cuts)
+
+    def plan_cuts(self, audio):
+        """
+        Choose cut points (ms) at pauses near every chunk_ms
+
+        Returns:
+            Sorted cut points, starting at 0 and ending at len(audio)
+        """
+        from pydub.silence import detect_silence
+
+        cuts = [0]
+        length = len(audio)
+        while length - cuts[-1] > self.chunk_ms + self.search_ms:
+            target = cuts[-1] + self.chunk_ms
+            window_start = target - self.search_ms
+            window = audio[window_start:target + self.search_ms]
+
+            silences = detect_silence(
+                window,
+                min_silence_len=self.min_silence_ms,
+                silence_thresh=self.silence_thresh_db,
+                seek_step=50
+            )
+            if silences:
+                # Cut in the middle of the longest pause in the window
+                start, end = max(silences, key=lambda s: s[1] - s[0])
+                cuts.append(window_start + (start + end) // 2)
+            else:
+                cuts.append(target)
+        cuts.append(length)
+        return cuts
+
+    def _transcribe_span(self, audio, core_start, core_end):
+        start = max(0, core_start - self.overlap_ms)
+        end = min(len(audio), core_end + self.overlap_ms)
+
+        fd, chunk_path = tempfile.mkstemp(suffix='.mp3')
+        os.close(fd)
+        try:
+            audio[start:end].export(chunk_path, format='mp3', bitrate='64k')
+            segments = self.transcribe_chunk(chunk_path)
+        finally:
+            os.remove(chunk_path)
+
+        offset = start / 1000
+        return [
+            {'start': s['start'] + offset, 'end': s['end'] + offset, 'text': s['text'].strip()}
+            for s in segments
+        ]
+
+
+def stitch_segments(chunk_segments, cuts):
+    """
+    Merge per-chunk segments into one timeline without overlap duplicates
+
+    Args:
+        chunk_segments: Segment lists, one per chunk, in absolute seconds
+        cuts: Cut points in ms (len(chunk_segments) + 1 entries)
+    """
+    stitched = []
+    last = len(chunk_segments) - 1
+    for index, segments in enumerate(chunk_segments):
+        core_start = cuts[index] / 1000
+        core_end = cuts[index + 1] / 1000 if index < last else float('inf')
+        for segment in segments:
+            midpoint = (segment['start'] + segment['end']) / 2
+            if not core_start <= midpoint < core_end:
+                continue
+            if stitched and _same_text(stitched[-1]['text'], segment['text']) \
+                    and segment['start'] < stitched[-1]['end']:
+                # Same words heard at both edges of a boundary
+                continue
+            stitched.append(segment)
+    return stitched
+
+
+def _normalize(text):
+    """Lowercased words only, for comparing text across chunk edges"""
+    return re.sub(r'\W+', ' ', text).strip().lower()
+
+
+def _same_text(a, b):
+    return _normalize(a) == _normalize(b)
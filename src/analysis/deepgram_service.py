@@ -0,0 +1,74 @@
+"""
+Deepgram Transcription Service
+One long-lived event loop and Deepgram client shared by every transcription
+
+The loop runs on a dedicated daemon thread. Async callers await
+transcribe_async(); sync callers (Flask handlers, pipeline workers) use
+transcribe(), which schedules onto the loop and blocks on the result, so
+many requests can be in flight on the one loop at once.
+"""
+import asyncio
+import threading
+
+
+class DeepgramService:
+    """Owns the event loop thread and persistent Deepgram client"""
+
+    def __init__(self, api_key):
+        from deepgram import Deepgram
+
+        self.client = Deepgram(api_key)
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._run_loop,
+            name='deepgram-loop',
+            daemon=True
+        )
+        self._thread.start()
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_forever()
+
+    async def transcribe_async(self, source, options):
+        """
+        Run a prerecorded transcription (must be awaited on the service loop)
+
+        Args:
+            source: {'buffer': file-like, 'mimetype': str} or {'url': str}
+            options: Deepgram request options
+
+        Returns:
+            Deepgram response dict
+        """
+        return await self.client.transcription.prerecorded(source, options)
+
+    def submit(self, source, options):
+        """Schedule a transcription from any thread; returns a concurrent Future"""
+        return asyncio.run_coroutine_threadsafe(
+            self.transcribe_async(source, options),
+            self._loop
+        )
+
+    def transcribe(self, source, options, timeout=None):
+        """Blocking transcription for sync callers"""
+        if threading.current_thread() is self._thread:
+            raise RuntimeError("Use transcribe_async() from inside the service loop")
+        return self.submit(source, options).result(timeout)
+
+    def close(self):
+        """Stop the loop thread"""
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+
+
+_services = {}
+_services_lock = threading.Lock()
+
+
+def get_deepgram_service(api_key):
+    """Process-wide DeepgramService for an API key"""
+    with _services_lock:
+        if api_key not in _services:
+            _services[api_key] = DeepgramService(api_key)
+        return _services[api_key]
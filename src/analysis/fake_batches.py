@@ -0,0 +1,167 @@
+"""
+Fake Message Batches Server
+Local stand-in for the Anthropic Message Batches endpoints
+
+Batches end after a configurable delay. Every request succeeds with the
+demo analysis, except every Nth one, which errors so partial-failure
+handling can be exercised.
+
+Usage:
+    python -m src.analysis.fake_batches --port 8766 --fail-every 5
+    ANTHROPIC_BASE_URL=http://localhost:8766 ANTHROPIC_API_KEY=fake python -m src.analysis.batch
+"""
+import argparse
+import json
+import re
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FakeBatchServer:
+    """In-memory Message Batches API served over HTTP"""
+
+    def __init__(self, host='127.0.0.1', port=8766, delay_seconds=2.0, fail_every=0):
+        self.delay_seconds = delay_seconds
+        self.fail_every = fail_every
+        self.batches = {}
+        self._lock = threading.Lock()
+
+        server = self
+
+        class Handler(_FakeBatchHandler):
+            fake = server
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.base_url = f'http://{host}:{self.httpd.server_port}'
+
+    def start(self):
+        """Serve in a background thread"""
+        thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+
+    def create(self, requests):
+        batch_id = f'msgbatch_{uuid.uuid4().hex}'
+        with self._lock:
+            self.batches[batch_id] = {
+                'requests': requests,
+                'created': time.time(),
+            }
+        return self.describe(batch_id)
+
+    def describe(self, batch_id):
+        batch = self.batches[batch_id]
+        created = datetime.fromtimestamp(batch['created'], tz=timezone.utc)
+        ended = time.time() - batch['created'] >= self.delay_seconds
+        total = len(batch['requests'])
+        failed = self._failed_count(total) if ended else 0
+        return {
+            'id': batch_id,
+            'type': 'message_batch',
+            'processing_status': 'ended' if ended else 'in_progress',
+            'request_counts': {
+                'processing': 0 if ended else total,
+                'succeeded': total - failed if ended else 0,
+                'errored': failed,
+                'canceled': 0,
+                'expired': 0,
+            },
+            'created_at': created.isoformat(),
+            'expires_at': (created + timedelta(days=1)).isoformat(),
+            'ended_at': (created + timedelta(seconds=self.delay_seconds)).isoformat() if ended else None,
+            'archived_at': None,
+            'cancel_initiated_at': None,
+            'results_url': f'{self.base_url}/v1/messages/batches/{batch_id}/results' if ended else None,
+        }
+
+    def _failed_count(self, total):
+        return total // self.fail_every if self.fail_every else 0
+
+    def results(self, batch_id):
+        """JSONL lines for an ended batch"""
+        from src.analysis.analyzer import DEMO_ANALYSIS
+
+        analysis_text = json.dumps(DEMO_ANALYSIS)
+        lines = []
+        for index, request in enumerate(self.batches[batch_id]['requests'], start=1):
+            if self.fail_every and index % self.fail_every == 0:
+                result = {
+                    'type': 'errored',
+                    'error': {'type': 'error', 'error': {'type': 'api_error', 'message': 'Simulated failure'}}
+                }
+            else:
+                result = {
+                    'type': 'succeeded',
+                    'message': {
+                        'id': f'msg_{uuid.uuid4().hex}',
+                        'type': 'message',
+                        'role': 'assistant',
+                        'model': request['params']['model'],
+                        'content': [{'type': 'text', 'text': analysis_text}],
+                        'stop_reason': 'end_turn',
+                        'stop_sequence': None,
+                        'usage': {'input_tokens': 1000, 'output_tokens': 500},
+                    }
+                }
+            lines.append(json.dumps({'custom_id': request['custom_id'], 'result': result}))
+        return '\n'.join(lines) + '\n'
+
+
+class _FakeBatchHandler(BaseHTTPRequestHandler):
+    fake = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body, content_type='application/json'):
+        data = body.encode() if isinstance(body, str) else json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        if self.path.split('?')[0].rstrip('/') != '/v1/messages/batches':
+            return self._send(404, {'type': 'error', 'error': {'type': 'not_found_error', 'message': 'Not found'}})
+        length = int(self.headers.get('Content-Length') or 0)
+        payload = json.loads(self.rfile.read(length) or b'{}')
+        self._send(200, self.fake.create(payload.get('requests', [])))
+
+    def do_GET(self):
+        path = self.path.split('?')[0]
+        match = re.fullmatch(r'/v1/messages/batches/([\w-]+)(/results)?', path)
+        if not match or match.group(1) not in self.fake.batches:
+            return self._send(404, {'type': 'error', 'error': {'type': 'not_found_error', 'message': 'Not found'}})
+
+        batch_id = match.group(1)
+        if match.group(2):
+            if self.fake.describe(batch_id)['processing_status'] != 'ended':
+                return self._send(400, {'type': 'error', 'error': {'type': 'invalid_request_error', 'message': 'Batch not ended'}})
+            return self._send(200, self.fake.results(batch_id), 'application/x-jsonl')
+        self._send(200, self.fake.describe(batch_id))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Run a fake Message Batches API')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8766)
+    parser.add_argument('--delay-seconds', type=float, default=2.0)
+    parser.add_argument('--fail-every', type=int, default=0,
+                        help='Make every Nth request in a batch error')
+    args = parser.parse_args()
+
+    fake = FakeBatchServer(
+        host=args.host,
+        port=args.port,
+        delay_seconds=args.delay_seconds,
+        fail_every=args.fail_every
+    )
+    print(f"🤖 Fake Message Batches API listening on {fake.base_url}")
+    fake.httpd.serve_forever()
@@ -0,0 +1,394 @@
+"""
+Live Meeting Analysis
+Ingests transcript segments during the call and analyzes them as they arrive
+
+In live mode the Recall.ai bot posts its real-time transcription to
+POST /api/webhooks/recall/transcript, or a local streamer posts segments to
+POST /api/meetings/<id>/live. Each segment is one insert into live_segments;
+nothing already stored is rewritten as the meeting grows. A segment's
+delivery key (its id, or speaker and timing) is unique per meeting, so a
+retried delivery is dropped.
+
+Every LIVE_ANALYSIS_INTERVAL_MINUTES the segments no window has claimed yet
+are analyzed on their own (the map step of mapreduce.py). A window claims
+its segments in the database before the model is called, so API and worker
+processes never analyze a segment twice, and one committed late is picked
+up by the next window. The merged
+issues and action items are written to Meeting.analysis, marked partial.
+When the call ends only the last few minutes and the short reduce call are
+left, so the full analysis is ready seconds after the bot leaves.
+"""
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from src.analysis.mapreduce import estimate_tokens
+from src.analysis.schema import MeetingAnalysis
+from src.analysis.structured import StructuredTranscript
+from src.api.database import db, Meeting, LiveSegment, LiveWindow
+from src.api.events import get_event_bus
+
+DEFAULT_INTERVAL_MINUTES = 5
+
+# How long finish() waits for a rolling refresh already in flight
+FINISH_WAIT_SECONDS = 120
+
+
+def live_transcript(meeting_id):
+    """StructuredTranscript of a meeting's live segments so far, or None if there are none"""
+    rows = db.session.query(
+        LiveSegment.start_s, LiveSegment.end_s, LiveSegment.text, LiveSegment.speaker
+    ).filter_by(meeting_id=meeting_id).order_by(LiveSegment.id).all()
+    if not rows:
+        return None
+    return StructuredTranscript.from_segments([
+        {'start': start, 'end': end, 'text': text, 'speaker': speaker}
+        for start, end, text, speaker in rows
+    ])
+
+
+def has_live_segments(meeting_id):
+    return db.session.query(LiveSegment.id).filter_by(meeting_id=meeting_id).first() is not None
+
+
+def parse_recall_transcript(data):
+    """
+    (bot_id, segment) from a Recall.ai real-time transcription event
+
+    The segment is None for partial results and empty utterances.
+    """
+    event = data.get('data') or data
+    bot_id = event.get('bot_id')
+    transcript = event.get('transcript') or {}
+    if transcript.get('is_final') is False:
+        return bot_id, None
+
+    words = transcript.get('words') or []
+    text = ' '.join((word.get('text') or '').strip() for word in words).strip()
+    if not text:
+        return bot_id, None
+    start = float(words[0].get('start_time') or 0.0)
+    return bot_id, {
+        'start': start,
+        'end': float(words[-1].get('end_time') or start),
+        'speaker': transcript.get('speaker'),
+        'text': text,
+    }
+
+
+def _segment_values(meeting_id, segment):
+    """
+    live_segments row for an incoming {'start', 'end', 'text', 'speaker', 'id'} dict
+
+    Raises:
+        ValueError: If the segment is malformed
+    """
+    if not isinstance(segment, dict) or not isinstance(segment.get('text'), str):
+        raise ValueError("Each segment needs a text string")
+    try:
+        start = float(segment.get('start') or 0.0)
+        end = float(segment.get('end') if segment.get('end') is not None else start)
+    except (TypeError, ValueError):
+        raise ValueError("start and end must be numbers")
+    speaker = segment.get('speaker')
+    speaker = str(speaker)[:100] if speaker is not None else None
+    # One speaker can't start two utterances at the same moment
+    key = segment.get('id') or f"{speaker or ''}@{start:.3f}-{max(end, start):.3f}"
+    return {
+        'meeting_id': meeting_id,
+        'start_s': start,
+        'end_s': max(end, start),
+        'speaker': speaker,
+        'text': segment['text'].strip(),
+        'delivery_key': str(key)[:200],
+        'created_at': datetime.utcnow(),
+    }
+
+
+def _insert_new(values):
+    """Insert a segment unless its delivery key is already stored; True if inserted"""
+    dialect = db.session.get_bind().dialect.name
+    if dialect in ('sqlite', 'postgresql'):
+        if dialect == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert
+        statement = insert(LiveSegment.__table__).values(**values).on_conflict_do_nothing(
+            index_elements=['meeting_id', 'delivery_key']
+        )
+        return db.session.execute(statement).rowcount > 0
+
+    exists = db.session.query(LiveSegment.id).filter_by(
+        meeting_id=values['meeting_id'], delivery_key=values['delivery_key']
+    ).first()
+    if exists:
+        return False
+    db.session.add(LiveSegment(**values))
+    return True
+
+
+class LiveAnalyzer:
+    """Rolling map-step analysis of live transcript segments"""
+
+    def __init__(self, app, analyzer, interval_minutes=None, workers=2):
+        """
+        Args:
+            app: Flask app (background refreshes run in its app context)
+            analyzer: MeetingAnalyzer whose map-reduce analyzer does the work
+            interval_minutes: Minutes between rolling refreshes of a meeting
+            workers: Meetings refreshed concurrently
+        """
+        self.app = app
+        self.analyzer = analyzer
+        if interval_minutes is None:
+            interval_minutes = float(os.getenv('LIVE_ANALYSIS_INTERVAL_MINUTES', DEFAULT_INTERVAL_MINUTES))
+        self.interval = interval_minutes * 60
+
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='live-analysis')
+        self._lock = threading.Lock()
+        self._due = {}  # meeting id -> monotonic time of its next refresh
+        self._running = set()
+
+    def append(self, meeting_id, segments):
+        """
+        Store segments received for a meeting (commits)
+
+        Starts a rolling refresh in the background when one is due.
+
+        Args:
+            meeting_id: Meeting id
+            segments: Dicts with start, end (seconds), text and optional speaker
+
+        Returns:
+            Number of segments stored (empty ones and redeliveries are dropped)
+
+        Raises:
+            ValueError: If a segment is malformed; nothing is stored
+        """
+        rows = [_segment_values(meeting_id, segment) for segment in segments]
+        rows = [row for row in rows if row['text']]
+        stored = [row for row in rows if _insert_new(row)]
+        if stored:
+            db.session.commit()
+            get_event_bus().publish(meeting_id, 'segments', {'segments': [
+                {'start': row['start_s'], 'end': row['end_s'], 'speaker': row['speaker'], 'text': row['text']}
+                for row in stored
+            ]})
+            self._schedule(meeting_id)
+        return len(stored)
+
+    def _schedule(self, meeting_id):
+        now = time.monotonic()
+        with self._lock:
+            # The first window is analyzed one interval after the first segment
+            due = self._due.setdefault(meeting_id, now + self.interval)
+            if now < due or meeting_id in self._running:
+                return
+            self._running.add(meeting_id)
+            self._due[meeting_id] = now + self.interval
+        self._executor.submit(self._refresh_in_background, meeting_id)
+
+    def _refresh_in_background(self, meeting_id):
+        try:
+            with self.app.app_context():
+                try:
+                    self.refresh(meeting_id)
+                finally:
+                    db.session.remove()
+        except Exception as e:
+            print(f"⚠️  Live analysis of meeting {meeting_id} failed: {e}")
+        finally:
+            with self._lock:
+                self._running.discard(meeting_id)
+
+    def refresh(self, meeting_id):
+        """
+        Analyze the segments received since the last window, and store the
+        merged partial analysis on the meeting (commits)
+
+        Returns:
+            Number of segments analyzed
+        """
+        if not self.analyzer.client:
+            # Demo mode: the whole analysis is produced when the call ends
+            return 0
+
+        meeting = db.session.get(Meeting, meeting_id)
+        analyzed = self._analyze_new(meeting)
+        if not analyzed:
+            return 0
+
+        partials, weights = self._windows(meeting_id)
+        sections = self.analyzer.map_reduce.merge(partials, weights)
+        sections['executive_summary'] = partials[-1].get('summary', '')
+        meeting.analysis = json.dumps(dict(sections, _partial=True, _live=True), indent=2)
+        db.session.commit()
+        get_event_bus().publish(meeting_id, 'analysis', dict(sections, _partial=True))
+        print(f"🎙️  Live analysis of meeting {meeting_id}: {analyzed} new segments, "
+              f"{len(sections['issues_identified'])} issues so far")
+        return analyzed
+
+    def finish(self, meeting):
+        """
+        Final analysis of a live meeting after the call (commits its windows)
+
+        Maps the segments since the last window, then merges every window
+        and makes the reduce call. If that fails, the whole transcript is
+        analyzed in the usual way.
+
+        Returns:
+            (StructuredTranscript, MeetingAnalysis), or None if the meeting
+            has no live segments
+        """
+        with self._lock:
+            # No more rolling refreshes from this process
+            self._due[meeting.id] = float('inf')
+        transcript = live_transcript(meeting.id)
+        if transcript is None:
+            return None
+        if not self.analyzer.client:
+            return transcript, self.analyzer.analyze(transcript, meeting.meeting_name)
+
+        try:
+            self._analyze_new(meeting)
+            if self._wait_idle(meeting.id):
+                # Segments of abandoned windows were released
+                self._analyze_new(meeting)
+            partials, weights = self._windows(meeting.id)
+            analysis = MeetingAnalysis.from_dict(
+                self.analyzer.map_reduce.combine(partials, weights, meeting.meeting_name or 'Meeting')
+            )
+        except Exception as e:
+            print(f"⚠️  Live analysis could not be finished ({e}); analyzing the full transcript")
+            analysis = self.analyzer.analyze(transcript, meeting.meeting_name)
+        return transcript, analysis
+
+    def discard(self, meeting_id):
+        """Delete a meeting's live segments and windows once its transcript is saved (no commit)"""
+        LiveSegment.query.filter_by(meeting_id=meeting_id).delete(synchronize_session=False)
+        LiveWindow.query.filter_by(meeting_id=meeting_id).delete(synchronize_session=False)
+        with self._lock:
+            self._due.pop(meeting_id, None)
+
+    def _analyze_new(self, meeting):
+        """
+        Map the segments no window has claimed into new LiveWindow rows (commits)
+
+        Returns:
+            Number of segments analyzed
+        """
+        map_reduce = self.analyzer.map_reduce
+        analyzed = 0
+        while True:
+            rows = LiveSegment.query.filter_by(meeting_id=meeting.id, window_id=None).order_by(LiveSegment.id).all()
+            if not rows:
+                return analyzed
+            window_id = self._claim(meeting.id, self._pack(rows, map_reduce.segment_tokens)[0])
+            if window_id is None:
+                continue  # another process claimed them first
+
+            window = LiveSegment.query.filter_by(window_id=window_id).order_by(LiveSegment.id).all()
+            text = '\n\n'.join(self._turn(row) for row in window)
+            position = (f"the part from minute {int(window[0].start_s // 60)} to minute "
+                        f"{int(window[-1].end_s // 60) + 1}")
+            try:
+                partial = map_reduce.map_segment(text, position, meeting.meeting_name or 'Meeting')
+            except Exception:
+                self._release([window_id])
+                raise
+            # No row if finish() gave up waiting and released the window
+            if LiveWindow.query.filter_by(id=window_id, result=None).update({
+                LiveWindow.tokens: estimate_tokens(text),
+                LiveWindow.result: json.dumps(partial),
+            }, synchronize_session=False):
+                analyzed += len(window)
+            db.session.commit()
+
+    @staticmethod
+    def _claim(meeting_id, rows):
+        """
+        New window claiming those of rows no other window has (commits)
+
+        Returns:
+            Window id, or None if every row was already claimed
+        """
+        window = LiveWindow(meeting_id=meeting_id, last_segment_id=rows[-1].id, tokens=0, result=None)
+        db.session.add(window)
+        db.session.flush()
+        claimed = LiveSegment.query.filter(
+            LiveSegment.id.in_([row.id for row in rows]),
+            LiveSegment.window_id.is_(None)
+        ).update({LiveSegment.window_id: window.id}, synchronize_session=False)
+        if not claimed:
+            db.session.rollback()
+            return None
+        db.session.commit()
+        return window.id
+
+    @staticmethod
+    def _release(window_ids):
+        """Drop unfinished windows and free their segments for the next window (commits)"""
+        LiveSegment.query.filter(LiveSegment.window_id.in_(window_ids)).update(
+            {LiveSegment.window_id: None}, synchronize_session=False
+        )
+        LiveWindow.query.filter(LiveWindow.id.in_(window_ids), LiveWindow.result.is_(None)).delete(
+            synchronize_session=False
+        )
+        db.session.commit()
+
+    def _windows(self, meeting_id):
+        windows = LiveWindow.query.filter(
+            LiveWindow.meeting_id == meeting_id,
+            LiveWindow.result.isnot(None)
+        ).order_by(LiveWindow.id).all()
+        return [json.loads(window.result) for window in windows], [window.tokens for window in windows]
+
+    @staticmethod
+    def _turn(row):
+        return f"{row.speaker}: {row.text}" if row.speaker else row.text
+
+    @classmethod
+    def _pack(cls, rows, max_tokens):
+        """Consecutive rows grouped into windows under max_tokens"""
+        windows, current, current_tokens = [], [], 0
+        for row in rows:
+            tokens = estimate_tokens(cls._turn(row))
+            if current and current_tokens + tokens > max_tokens:
+                windows.append(current)
+                current, current_tokens = [], 0
+            current.append(row)
+            current_tokens += tokens
+        if current:
+            windows.append(current)
+        return windows
+
+    def _wait_idle(self, meeting_id):
+        """
+        Wait for windows any process is still analyzing
+
+        Windows still unfinished after FINISH_WAIT_SECONDS belong to a
+        process that stopped; they are dropped and their segments freed.
+
+        Returns:
+            True if segments were freed
+        """
+        deadline = time.monotonic() + FINISH_WAIT_SECONDS
+        while True:
+            pending = [row[0] for row in db.session.query(LiveWindow.id).filter_by(
+                meeting_id=meeting_id, result=None
+            )]
+            # End the read so the next check sees other processes' commits
+            db.session.commit()
+            if not pending:
+                return False
+            if time.monotonic() >= deadline:
+                print(f"⚠️  Releasing {len(pending)} unfinished live windows of meeting {meeting_id}")
+                self._release(pending)
+                return True
+            time.sleep(0.2)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,230 @@
+"""
+Local Whisper Transcription
+Offline transcription with openai-whisper in a pool of warm worker processes
+
+Each worker process loads the model once, when it starts, and keeps it for
+every chunk it is given. Recordings are split on silence into
+LOCAL_WHISPER_CHUNK_SECONDS chunks (src/analysis/chunking.py). All meetings
+share one process-wide pool, so chunks from concurrent meetings queue
+together and every worker stays busy. Throughput is bounded by the CPU,
+not by a provider's rate limits or the network.
+
+Whisper inference is CPU-bound and holds the GIL, so it runs in processes;
+torch threads are divided between them.
+
+Usage:
+    python -m src.analysis.local_whisper --benchmark sample.wav --models tiny,base,small
+"""
+import argparse
+import importlib.util
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from src.analysis.chunking import ChunkedTranscriber
+
+DEFAULT_MODEL = 'base'
+DEFAULT_CHUNK_SECONDS = 120
+
+# How long warm_up() waits for the slowest worker to load its model
+WARM_UP_TIMEOUT = 600
+
+# Set by _load_model() in each worker process
+_model = None
+_ready = None
+
+
+def _load_model(model_name, device, threads, ready):
+    """Pool initializer: load the model once per worker process"""
+    global _model, _ready
+    import torch
+    import whisper
+
+    if threads:
+        torch.set_num_threads(threads)
+    _model = whisper.load_model(model_name, device=device)
+    _ready = ready
+
+
+def _transcribe_chunk(audio_file_path, language):
+    """Transcribe one file with the worker's model (runs in a worker process)"""
+    result = _model.transcribe(
+        audio_file_path,
+        language=language,
+        fp16=False,  # CPU inference
+        verbose=None
+    )
+    return [
+        {'start': float(segment['start']), 'end': float(segment['end']), 'text': segment['text'].strip()}
+        for segment in result.get('segments', [])
+    ]
+
+
+def _warm_up():
+    """
+    Wait at the barrier until every worker has a warm-up task
+
+    A worker holding one can't take another, so the tasks reach all
+    workers, each after its model has loaded.
+    """
+    _ready.wait(WARM_UP_TIMEOUT)
+    return os.getpid()
+
+
+class LocalWhisper:
+    """Process pool of warm Whisper models shared by every transcription"""
+
+    def __init__(self, model=None, workers=None, device=None, language=None, chunk_seconds=None):
+        """
+        Args:
+            model: Whisper model size (tiny, base, small, medium, large)
+            workers: Worker processes, each holding one copy of the model
+            device: torch device (default cpu)
+            language: Spoken language, or None to detect it per chunk
+            chunk_seconds: Target chunk length when splitting recordings
+        """
+        self.model = model or os.getenv('LOCAL_WHISPER_MODEL', DEFAULT_MODEL)
+        self.workers = workers or int(os.getenv('LOCAL_WHISPER_WORKERS', 2))
+        self.device = device or os.getenv('LOCAL_WHISPER_DEVICE', 'cpu')
+        self.language = language if language is not None else (os.getenv('LOCAL_WHISPER_LANGUAGE', 'en') or None)
+        self.chunk_seconds = chunk_seconds or int(os.getenv('LOCAL_WHISPER_CHUNK_SECONDS', DEFAULT_CHUNK_SECONDS))
+
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _pool(self):
+        with self._lock:
+            if self._executor is None:
+                # spawn: forking the multi-threaded API process is unsafe. The
+                # workers import only this module (see src/api/__main__.py).
+                context = multiprocessing.get_context('spawn')
+                # Split the cores between workers instead of letting each take them all
+                threads = max((os.cpu_count() or 1) // self.workers, 1)
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=context,
+                    initializer=_load_model,
+                    initargs=(self.model, self.device, threads, context.Barrier(self.workers))
+                )
+            return self._executor
+
+    def _run(self, fn, *args):
+        """Run a task in the pool; a broken pool is replaced for the next task"""
+        executor = self._pool()
+        try:
+            return executor.submit(fn, *args).result()
+        except BrokenProcessPool:
+            # A worker died, or a model failed to load
+            with self._lock:
+                if self._executor is executor:
+                    self._executor = None
+            executor.shutdown(wait=False)
+            raise
+
+    @property
+    def options(self):
+        """What the transcript depends on (for the transcript cache key)"""
+        return {'model': self.model, 'language': self.language}
+
+    def warm_up(self):
+        """
+        Start every worker and wait until each has loaded its model
+
+        Returns:
+            Worker pids
+        """
+        with ThreadPoolExecutor(max_workers=self.workers) as waiters:
+            return set(waiters.map(lambda _: self._run(_warm_up), range(self.workers)))
+
+    def transcribe_file(self, audio_file_path):
+        """Transcribe one file in a single worker; segments in seconds"""
+        return self._run(_transcribe_chunk, audio_file_path, self.language)
+
+    def transcribe_segments(self, audio_file_path):
+        """
+        Transcribe a recording, splitting long ones so workers share it
+
+        Returns:
+            List of {'start', 'end', 'text'} segments
+        """
+        engine = ChunkedTranscriber(
+            self.transcribe_file,
+            max_workers=self.workers,
+            chunk_seconds=self.chunk_seconds
+        )
+        return engine.transcribe(audio_file_path)
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+
+_engines = {}
+_engines_lock = threading.Lock()
+
+
+def get_local_whisper(model=None):
+    """Process-wide LocalWhisper pool for a model size"""
+    model = model or os.getenv('LOCAL_WHISPER_MODEL', DEFAULT_MODEL)
+    with _engines_lock:
+        if model not in _engines:
+            _engines[model] = LocalWhisper(model=model)
+        return _engines[model]
+
+
+def is_available():
+    """Whether openai-whisper is installed (without importing torch)"""
+    return importlib.util.find_spec('whisper') is not None
+
+
+def benchmark(audio_file_path, models, workers, meetings):
+    """
+    Transcribe `meetings` concurrent copies of a recording with each model
+
+    Prints model load time, wall time, and throughput as audio seconds per
+    wall second (the real-time factor).
+    """
+    from pydub.utils import mediainfo
+
+    duration = float(mediainfo(audio_file_path).get('duration', 0))
+    print(f"📊 {os.path.basename(audio_file_path)}: {duration / 60:.1f} min of audio, "
+          f"{meetings} concurrent meetings, {workers} workers, {os.cpu_count()} CPUs")
+
+    for model in models:
+        engine = LocalWhisper(model=model, workers=workers)
+        try:
+            started = time.monotonic()
+            engine.warm_up()
+            loaded = time.monotonic() - started
+
+            started = time.monotonic()
+            with ThreadPoolExecutor(max_workers=meetings) as executor:
+                results = list(executor.map(engine.transcribe_segments, [audio_file_path] * meetings))
+            elapsed = time.monotonic() - started
+        finally:
+            engine.shutdown()
+
+        audio_seconds = duration * meetings
+        words = sum(len(segment['text'].split()) for segment in results[0])
+        print(f"   {model:<8} load {loaded:5.1f}s  transcribe {elapsed:7.1f}s  "
+              f"{audio_seconds / elapsed:5.1f}x real time  ({words} words)")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Local Whisper transcription')
+    parser.add_argument('--benchmark', metavar='AUDIO', help='Measure throughput on this recording')
+    parser.add_argument('--models', default='tiny,base,small', help='Comma-separated model sizes')
+    parser.add_argument('--workers', type=int, default=int(os.getenv('LOCAL_WHISPER_WORKERS', 2)))
+    parser.add_argument('--meetings', type=int, default=2, help='Copies transcribed concurrently')
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark(args.benchmark, [m.strip() for m in args.models.split(',') if m.strip()],
+                  args.workers, args.meetings)
+    else:
+        parser.print_help()
@@ -0,0 +1,315 @@
+"""
+Map-Reduce Meeting Analysis
+Analyzes transcripts too long for a single prompt
+
+The transcript is split on speaker turns into token-budgeted segments. Every
+segment is analyzed concurrently (map). The partial issues, action items,
+quotes and topics are merged and de-duplicated locally. One short reduce
+call then writes the meeting-level summary, sentiment and recommendations
+into the same schema analyze_meeting returns. Latency is roughly the slowest
+segment plus the reduce call.
+"""
+import json
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+from src.analysis.schema import section_items
+from src.analysis.structured import StructuredTranscript
+
+# Rough chars-per-token for English transcripts
+CHARS_PER_TOKEN = 4
+
+# Top-level sections of the analyze_meeting output, in order
+SCHEMA_KEYS = (
+    'executive_summary',
+    'key_topics',
+    'issues_identified',
+    'action_items',
+    'notable_quotes',
+    'sentiment_analysis',
+    'recommendations',
+    'patterns',
+)
+
+PRIORITY_RANK = {'high': 3, 'medium': 2, 'low': 1}
+
+SEGMENT_PROMPT = """You are analyzing {position} of a long meeting transcript.
+
+Meeting: {meeting_name}
+
+Transcript segment:
+{segment}
+
+Provide a JSON response for this segment only, with the following structure:
+{{
+    "summary": "2-3 sentence summary of this segment",
+    "key_topics": [
+        {{"topic": "Topic name", "description": "What was discussed", "time_spent": "Approximate time or importance"}}
+    ],
+    "issues_identified": [
+        {{
+            "title": "Issue title",
+            "description": "Detailed description",
+            "category": "mental_health|housing|funding|academic|career|other",
+            "priority": "high|medium|low",
+            "sentiment": "positive|neutral|negative",
+            "mentioned_by": "Who raised it"
+        }}
+    ],
+    "action_items": [
+        {{"action": "What needs to be done", "priority": "high|medium|low", "owner": "Who should do it (if mentioned)"}}
+    ],
+    "notable_quotes": [
+        {{"quote": "The actual quote", "speaker": "Who said it", "context": "Why it's important"}}
+    ],
+    "sentiment": {{"positive_percent": 0, "neutral_percent": 0, "negative_percent": 0}}
+}}
+
+Provide only the JSON response, no additional text."""
+
+REDUCE_PROMPT = """These are summaries of consecutive parts of one long meeting, followed by the issues identified across the whole meeting.
+
+Meeting: {meeting_name}
+
+Segment summaries:
+{summaries}
+
+Issues identified:
+{issues}
+
+Overall sentiment breakdown: {breakdown}
+
+Provide a JSON response with the following structure:
+{{
+    "executive_summary": "Brief 2-3 sentence summary of the whole meeting",
+    "sentiment_analysis": {{
+        "overall": "positive|mixed|negative",
+        "explanation": "Brief explanation of the sentiment"
+    }},
+    "recommendations": [
+        "Specific actionable recommendation for the representative"
+    ],
+    "patterns": [
+        "Any patterns or trends observed"
+    ]
+}}
+
+Provide only the JSON response, no additional text."""
+
+
+def estimate_tokens(text):
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def parse_json_response(text):
+    """Parse a model's JSON answer, tolerating a ```json fence around it"""
+    text = text.strip()
+    fenced = re.match(r'^```(?:json)?\s*(.*?)\s*```$', text, re.DOTALL)
+    if fenced:
+        text = fenced.group(1)
+    return json.loads(text)
+
+
+def split_turns(transcript):
+    """
+    Split a transcript into speaker turns
+
+    Diarized transcripts separate turns with blank lines ("Speaker N: ...").
+    Plain transcripts with no paragraph breaks are split into sentences.
+    """
+    turns = [t.strip() for t in re.split(r'\n\s*\n', transcript) if t.strip()]
+    if len(turns) <= 1:
+        turns = [t.strip() for t in re.split(r'(?<=[.!?])\s+', transcript) if t.strip()]
+    return turns
+
+
+def pack_segments(turns, max_tokens):
+    """Greedily group consecutive turns into segments under max_tokens"""
+    segments = []
+    current, current_tokens = [], 0
+    for turn in turns:
+        tokens = estimate_tokens(turn)
+        if tokens > max_tokens:
+            # A single monologue over budget is split on sentences
+            pieces = re.split(r'(?<=[.!?])\s+', turn)
+            if len(pieces) > 1:
+                for segment in pack_segments(pieces, max_tokens):
+                    if current:
+                        segments.append('\n\n'.join(current))
+                        current, current_tokens = [], 0
+                    segments.append(segment)
+                continue
+        if current and current_tokens + tokens > max_tokens:
+            segments.append('\n\n'.join(current))
+            current, current_tokens = [], 0
+        current.append(turn)
+        current_tokens += tokens
+    if current:
+        segments.append('\n\n'.join(current))
+    return segments
+
+
+def _normalize(text):
+    return re.sub(r'\W+', ' ', str(text or '')).strip().lower()
+
+
+def _merge_unique(items, key_field, merge=None):
+    """De-duplicate dicts by a normalized text field, keeping first-seen order"""
+    merged = {}
+    for item in items:
+        key = _normalize(item.get(key_field))
+        if not key:
+            continue
+        if key in merged:
+            if merge:
+                merge(merged[key], item)
+        else:
+            merged[key] = dict(item)
+    return list(merged.values())
+
+
+def _merge_issue(existing, new):
+    if PRIORITY_RANK.get(new.get('priority'), 0) > PRIORITY_RANK.get(existing.get('priority'), 0):
+        existing['priority'] = new['priority']
+    speakers = [s for s in (existing.get('mentioned_by') or '').split('; ') if s]
+    if new.get('mentioned_by') and _normalize(new['mentioned_by']) not in map(_normalize, speakers):
+        existing['mentioned_by'] = '; '.join(speakers + [new['mentioned_by']])
+    if len(new.get('description') or '') > len(existing.get('description') or ''):
+        existing['description'] = new['description']
+
+
+class MapReduceAnalyzer:
+    """Hierarchical analysis over token-budgeted transcript segments"""
+
+    def __init__(self, complete, segment_tokens=None, max_workers=None):
+        """
+        Args:
+            complete: Callable(prompt, max_tokens) returning response text
+            segment_tokens: Token budget per segment
+            max_workers: Segments analyzed concurrently
+        """
+        self.complete = complete
+        self.segment_tokens = segment_tokens or int(os.getenv('ANALYSIS_SEGMENT_TOKENS', 30000))
+        self.max_workers = max_workers or int(os.getenv('ANALYSIS_SEGMENT_WORKERS', 4))
+
+    def analyze(self, transcript, meeting_name="Meeting"):
+        """
+        Analyze a long transcript
+
+        Args:
+            transcript: Transcript text, or a StructuredTranscript (split on
+                its segments rather than by re-parsing text)
+            meeting_name: Name of the meeting
+
+        Returns:
+            Analysis dict in the analyze_meeting schema
+        """
+        if isinstance(transcript, StructuredTranscript):
+            turns = transcript.turns()
+        else:
+            turns = split_turns(transcript)
+        segments = pack_segments(turns, self.segment_tokens)
+        print(f"🧩 Analyzing {len(segments)} transcript segments...")
+
+        def analyze_segment(indexed):
+            index, segment = indexed
+            try:
+                return self.map_segment(segment, f"part {index + 1} of {len(segments)}", meeting_name)
+            except Exception as e:
+                print(f"⚠️  Segment {index + 1} analysis failed: {e}")
+                return None
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            partials = list(executor.map(analyze_segment, enumerate(segments)))
+
+        weights = [estimate_tokens(segment) for segment in segments]
+        succeeded = [(p, w) for p, w in zip(partials, weights) if p is not None]
+        if not succeeded:
+            raise Exception("All transcript segments failed to analyze")
+
+        analysis = self.combine([p for p, _ in succeeded], [w for _, w in succeeded], meeting_name)
+        if len(succeeded) < len(segments):
+            analysis['warning'] = f"{len(segments) - len(succeeded)} of {len(segments)} segments could not be analyzed"
+        return analysis
+
+    def map_segment(self, segment, position, meeting_name="Meeting"):
+        """
+        Analyze one segment on its own (the map step)
+
+        Args:
+            segment: Transcript text of the segment
+            position: Where it sits in the meeting, e.g. "part 2 of 5"
+            meeting_name: Name of the meeting
+
+        Returns:
+            Partial analysis dict (SEGMENT_PROMPT schema)
+
+        Raises:
+            ValueError: If the model answered with JSON that isn't an object
+        """
+        prompt = SEGMENT_PROMPT.format(position=position, meeting_name=meeting_name, segment=segment)
+        partial = parse_json_response(self.complete(prompt, 4096))
+        if not isinstance(partial, dict):
+            # Counted as a failed segment by analyze()
+            raise ValueError(f"Segment analysis is a JSON {type(partial).__name__}, not an object")
+        return partial
+
+    def combine(self, partials, weights, meeting_name="Meeting"):
+        """Merge segment results and write the meeting-level sections (the reduce step)"""
+        merged = self.merge(partials, weights)
+        merged.update(self._reduce(merged, partials, meeting_name))
+        return {key: merged[key] for key in SCHEMA_KEYS}
+
+    def merge(self, partials, weights=None):
+        """Combine segment results into the list sections of the schema"""
+        weights = weights or [1] * len(partials)
+
+        def collect(field):
+            # Only the dict entries of a list section
+            return [item for partial in partials for item in section_items(partial, field)]
+
+        breakdown = {'positive_percent': 0, 'neutral_percent': 0, 'negative_percent': 0}
+        total_weight = 0
+        for partial, weight in zip(partials, weights):
+            sentiment = partial.get('sentiment') or {}
+            if not isinstance(sentiment, dict) or not sentiment:
+                continue
+            total_weight += weight
+            for field in breakdown:
+                breakdown[field] += (sentiment.get(field) or 0) * weight
+        if total_weight:
+            breakdown = {field: round(value / total_weight) for field, value in breakdown.items()}
+
+        return {
+            'key_topics': _merge_unique(collect('key_topics'), 'topic'),
+            'issues_identified': _merge_unique(collect('issues_identified'), 'title', _merge_issue),
+            'action_items': _merge_unique(collect('action_items'), 'action'),
+            'notable_quotes': _merge_unique(collect('notable_quotes'), 'quote'),
+            'sentiment_analysis': {'breakdown': breakdown},
+        }
+
+    def _reduce(self, merged, partials, meeting_name):
+        """One short call for the meeting-level prose sections"""
+        summaries = '\n'.join(
+            f"{i + 1}. {partial.get('summary', '')}" for i, partial in enumerate(partials)
+        )
+        issues = '\n'.join(
+            f"- {issue.get('title')} ({issue.get('priority')})" for issue in merged['issues_identified']
+        )
+        prompt = REDUCE_PROMPT.format(
+            meeting_name=meeting_name,
+            summaries=summaries,
+            issues=issues or '(none)',
+            breakdown=json.dumps(merged['sentiment_analysis']['breakdown'])
+        )
+        reduced = parse_json_response(self.complete(prompt, 2048))
+
+        sentiment = dict(merged['sentiment_analysis'])
+        sentiment.update(reduced.get('sentiment_analysis') or {})
+        return {
+            'executive_summary': reduced.get('executive_summary', ''),
+            'sentiment_analysis': sentiment,
+            'recommendations': reduced.get('recommendations', []),
+            'patterns': reduced.get('patterns', []),
+        }
@@ -0,0 +1,230 @@
+"""
+Audio Pre-processing
+Shrinks a meeting recording to compressed mono speech before it is uploaded
+
+Recall.ai recordings are speaker-view .mp4 video, but ASR providers only
+need the voice. Before transcription the recording is decoded with ffmpeg
+(through pydub), keeping only the audio track. It is downmixed to 16 kHz
+mono, leading and trailing silence is trimmed, and the result is encoded
+as Opus (default) or FLAC. An hour of meeting goes from hundreds of MB of
+video to around 10 MB of Opus.
+
+Decoding and encoding are CPU-bound, so they run in a process pool rather
+than on the pipeline's worker threads. Each file's report gives the bytes
+saved and an estimate of the upload time saved at PREPROCESS_UPLOAD_MBPS.
+
+Transcripts of trimmed audio start early by `trimmed_start` seconds; add
+it back to segment times (StructuredTranscript.shift).
+
+Usage:
+    python -m src.analysis.preprocess recordings/bot_123.mp4 [...]
+"""
+import argparse
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+SAMPLE_RATE = 16000
+
+# Container, ffmpeg codec, extension and upload content type per output codec
+CODECS = {
+    'opus': {'format': 'ogg', 'codec': 'libopus', 'extension': '.ogg', 'mimetype': 'audio/ogg'},
+    'flac': {'format': 'flac', 'codec': 'flac', 'extension': '.flac', 'mimetype': 'audio/flac'},
+}
+
+DEFAULT_OPUS_BITRATE = '24k'
+DEFAULT_UPLOAD_MBPS = 20.0
+
+# Silence trimming: loudness below SILENCE_THRESH_DB counts as silence,
+# measured in CHUNK_MS steps; KEEP_SILENCE_MS is left at either end
+SILENCE_THRESH_DB = -50.0
+CHUNK_MS = 10
+KEEP_SILENCE_MS = 500
+
+
+def upload_seconds(size_bytes, upload_mbps):
+    """Time to upload size_bytes at upload_mbps megabits per second"""
+    return size_bytes * 8 / (upload_mbps * 1000 * 1000)
+
+
+def output_path(source, codec):
+    """Path of the processed file next to the recording"""
+    return os.path.splitext(source)[0] + '.speech' + CODECS[codec]['extension']
+
+
+def preprocess_file(source, destination, codec='opus', bitrate=DEFAULT_OPUS_BITRATE,
+                    trim=True, silence_thresh_db=SILENCE_THRESH_DB):
+    """
+    Extract, downmix, trim and encode one recording (runs in a worker process)
+
+    Args:
+        source: Recording path (any container ffmpeg reads, video or audio)
+        destination: Output path
+        codec: 'opus' or 'flac'
+        bitrate: Opus bitrate
+        trim: Trim leading and trailing silence
+        silence_thresh_db: Loudness below which audio counts as silence
+
+    Returns:
+        Dict with source_duration, duration, trimmed_start and trimmed_end
+        (seconds)
+    """
+    from pydub import AudioSegment
+    from pydub.silence import detect_leading_silence
+
+    # -vn skips decoding the video stream; ffmpeg resamples and downmixes while decoding
+    audio = AudioSegment.from_file(source, parameters=['-vn', '-ac', '1', '-ar', str(SAMPLE_RATE)])
+    audio = audio.set_channels(1).set_frame_rate(SAMPLE_RATE)
+    source_ms = len(audio)
+
+    start_ms = end_ms = 0
+    if trim:
+        start_ms = detect_leading_silence(audio, silence_threshold=silence_thresh_db, chunk_size=CHUNK_MS)
+        end_ms = detect_leading_silence(audio.reverse(), silence_threshold=silence_thresh_db, chunk_size=CHUNK_MS)
+        start_ms = max(start_ms - KEEP_SILENCE_MS, 0)
+        end_ms = max(end_ms - KEEP_SILENCE_MS, 0)
+        if start_ms + end_ms >= source_ms:
+            # Silent throughout: keep it whole rather than upload nothing
+            start_ms = end_ms = 0
+        audio = audio[start_ms:source_ms - end_ms]
+
+    spec = CODECS[codec]
+    options = {'format': spec['format'], 'codec': spec['codec']}
+    if codec == 'opus':
+        options['bitrate'] = bitrate
+        # Opus tuned for speech
+        options['parameters'] = ['-application', 'voip']
+    audio.export(destination, **options)
+
+    return {
+        'source_duration': source_ms / 1000,
+        'duration': len(audio) / 1000,
+        'trimmed_start': start_ms / 1000,
+        'trimmed_end': end_ms / 1000,
+    }
+
+
+class AudioPreprocessor:
+    """Runs preprocess_file() for recordings in a pool of worker processes"""
+
+    def __init__(self, workers=2, codec=None, bitrate=None, trim=None, upload_mbps=None):
+        """
+        Args:
+            workers: Worker processes
+            codec: 'opus' or 'flac' (default PREPROCESS_CODEC)
+            bitrate: Opus bitrate (default PREPROCESS_OPUS_BITRATE)
+            trim: Trim leading/trailing silence (default PREPROCESS_TRIM_SILENCE)
+            upload_mbps: Uplink speed used to estimate upload time saved
+        """
+        self.workers = workers
+        self.codec = (codec or os.getenv('PREPROCESS_CODEC', 'opus')).lower()
+        if self.codec not in CODECS:
+            raise ValueError(f"Unknown PREPROCESS_CODEC: {self.codec} (use {' or '.join(CODECS)})")
+        self.bitrate = bitrate or os.getenv('PREPROCESS_OPUS_BITRATE', DEFAULT_OPUS_BITRATE)
+        if trim is None:
+            trim = os.getenv('PREPROCESS_TRIM_SILENCE', 'true').lower() == 'true'
+        self.trim = trim
+        self.upload_mbps = upload_mbps or float(os.getenv('PREPROCESS_UPLOAD_MBPS', DEFAULT_UPLOAD_MBPS))
+        self._executor = None
+        self._lock = threading.Lock()
+
+    @property
+    def mimetype(self):
+        return CODECS[self.codec]['mimetype']
+
+    def _pool(self):
+        with self._lock:
+            if self._executor is None:
+                # spawn: forking the multi-threaded API process is unsafe. The
+                # workers import only this module (see src/api/__main__.py).
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+            return self._executor
+
+    def process(self, source):
+        """
+        Pre-process a recording in the pool and wait for it
+
+        Args:
+            source: Recording path
+
+        Returns:
+            Report dict: path, mimetype, input_bytes, output_bytes,
+            bytes_saved, upload_seconds_saved (estimated), source_duration,
+            duration, trimmed_start, trimmed_end, seconds (processing time)
+        """
+        if not os.path.exists(source):
+            raise FileNotFoundError(f"Recording not found: {source}")
+
+        destination = output_path(source, self.codec)
+        started = time.monotonic()
+        executor = self._pool()
+        try:
+            result = executor.submit(
+                preprocess_file, source, destination, self.codec, self.bitrate, self.trim
+            ).result()
+        except BrokenProcessPool:
+            # A worker died (e.g. killed for memory); the next recording gets a new pool
+            self._discard(executor)
+            raise
+
+        input_bytes = os.path.getsize(source)
+        output_bytes = os.path.getsize(destination)
+        report = dict(
+            result,
+            path=destination,
+            mimetype=self.mimetype,
+            input_bytes=input_bytes,
+            output_bytes=output_bytes,
+            bytes_saved=input_bytes - output_bytes,
+            upload_seconds_saved=round(
+                upload_seconds(input_bytes - output_bytes, self.upload_mbps), 1
+            ),
+            seconds=round(time.monotonic() - started, 2)
+        )
+        print(f"🎚️  Pre-processed {os.path.basename(source)}: "
+              f"{input_bytes / 1e6:.1f} MB → {output_bytes / 1e6:.1f} MB "
+              f"({report['bytes_saved'] / 1e6:.1f} MB saved, ~{report['upload_seconds_saved']:.0f}s less upload "
+              f"at {self.upload_mbps:g} Mbps), trimmed {report['trimmed_start'] + report['trimmed_end']:.1f}s "
+              f"of silence in {report['seconds']:.1f}s")
+        return report
+
+    def _discard(self, executor):
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False)
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Pre-process recordings for transcription')
+    parser.add_argument('recordings', nargs='+', help='Recording files')
+    parser.add_argument('--codec', choices=sorted(CODECS))
+    parser.add_argument('--workers', type=int, default=2, help='Worker processes')
+    parser.add_argument('--upload-mbps', type=float, help='Uplink speed for the upload time estimate')
+    args = parser.parse_args()
+
+    preprocessor = AudioPreprocessor(workers=args.workers, codec=args.codec, upload_mbps=args.upload_mbps)
+    try:
+        # One waiting thread per worker process keeps the pool busy
+        with ThreadPoolExecutor(max_workers=preprocessor.workers) as waiters:
+            reports = list(waiters.map(preprocessor.process, args.recordings))
+    finally:
+        preprocessor.shutdown()
+
+    input_bytes = sum(report['input_bytes'] for report in reports)
+    output_bytes = sum(report['output_bytes'] for report in reports)
+    saved = sum(report['upload_seconds_saved'] for report in reports)
+    print(f"✅ {len(reports)} recordings: {input_bytes / 1e6:.1f} MB → {output_bytes / 1e6:.1f} MB, "
+          f"~{saved:.0f}s less upload at {preprocessor.upload_mbps:g} Mbps")
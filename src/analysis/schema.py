@@ -0,0 +1,156 @@
+"""
+Analysis Schema
+Typed structures for the meeting analysis JSON
+
+The model's answer is parsed into these once; the JSON stored on the
+meeting, the issue list returned by extract_issues and the rows written to
+the Issue table are all produced from the same MeetingAnalysis.
+"""
+import json
+from dataclasses import dataclass, field
+
+CATEGORIES = ('mental_health', 'housing', 'funding', 'academic', 'career', 'other')
+PRIORITIES = ('high', 'medium', 'low')
+SENTIMENTS = ('positive', 'neutral', 'negative')
+
+
+def _choice(value, allowed, default):
+    value = (value or '').strip().lower().replace(' ', '_')
+    return value if value in allowed else default
+
+
+def section_items(data, key):
+    """Dict entries of a list section; anything else the model put there is dropped"""
+    value = data.get(key) or []
+    if not isinstance(value, list):
+        return []
+    return [item for item in value if isinstance(item, dict)]
+
+
+@dataclass
+class IssueItem:
+    title: str
+    description: str = ''
+    category: str = 'other'
+    priority: str = 'medium'
+    sentiment: str = 'neutral'
+    mentioned_by: str = ''
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build a normalized issue from the model's loosely-typed dict"""
+        return cls(
+            title=(data.get('title') or '').strip(),
+            description=data.get('description') or '',
+            category=_choice(data.get('category'), CATEGORIES, 'other'),
+            priority=_choice(data.get('priority'), PRIORITIES, 'medium'),
+            sentiment=_choice(data.get('sentiment'), SENTIMENTS, 'neutral'),
+            mentioned_by=data.get('mentioned_by') or '',
+        )
+
+    def to_dict(self):
+        return {
+            'title': self.title,
+            'description': self.description,
+            'category': self.category,
+            'priority': self.priority,
+            'sentiment': self.sentiment,
+            'mentioned_by': self.mentioned_by,
+        }
+
+
+@dataclass
+class ActionItem:
+    action: str
+    priority: str = 'medium'
+    owner: str = ''
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            action=(data.get('action') or '').strip(),
+            priority=_choice(data.get('priority'), PRIORITIES, 'medium'),
+            owner=data.get('owner') or '',
+        )
+
+    def to_dict(self):
+        return {'action': self.action, 'priority': self.priority, 'owner': self.owner}
+
+
+@dataclass
+class Quote:
+    quote: str
+    speaker: str = ''
+    context: str = ''
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            quote=(data.get('quote') or '').strip(),
+            speaker=data.get('speaker') or '',
+            context=data.get('context') or '',
+        )
+
+    def to_dict(self):
+        return {'quote': self.quote, 'speaker': self.speaker, 'context': self.context}
+
+
+@dataclass
+class MeetingAnalysis:
+    executive_summary: str = ''
+    key_topics: list = field(default_factory=list)
+    issues: list = field(default_factory=list)
+    action_items: list = field(default_factory=list)
+    notable_quotes: list = field(default_factory=list)
+    sentiment_analysis: dict = field(default_factory=dict)
+    recommendations: list = field(default_factory=list)
+    patterns: list = field(default_factory=list)
+    error: str = None
+    warning: str = None
+
+    @classmethod
+    def from_dict(cls, data):
+        """Parse the analyze_meeting JSON schema"""
+        sentiment = data.get('sentiment_analysis') or {}
+        return cls(
+            executive_summary=data.get('executive_summary') or '',
+            key_topics=list(data.get('key_topics') or []),
+            issues=[IssueItem.from_dict(i) for i in section_items(data, 'issues_identified') if i.get('title')],
+            action_items=[ActionItem.from_dict(a) for a in section_items(data, 'action_items') if a.get('action')],
+            notable_quotes=[Quote.from_dict(q) for q in section_items(data, 'notable_quotes') if q.get('quote')],
+            sentiment_analysis=sentiment if isinstance(sentiment, dict) else {},
+            recommendations=list(data.get('recommendations') or []),
+            patterns=list(data.get('patterns') or []),
+            error=data.get('error'),
+            warning=data.get('warning'),
+        )
+
+    @classmethod
+    def failed(cls, error, executive_summary=''):
+        return cls(executive_summary=executive_summary, error=error)
+
+    def to_dict(self):
+        if self.error and not (self.issues or self.key_topics or self.action_items):
+            # Same shape the analyzer has always returned on failure
+            data = {'executive_summary': self.executive_summary} if self.executive_summary else {}
+            data['error'] = self.error
+            return data
+
+        data = {
+            'executive_summary': self.executive_summary,
+            'key_topics': self.key_topics,
+            'issues_identified': [i.to_dict() for i in self.issues],
+            'action_items': [a.to_dict() for a in self.action_items],
+            'notable_quotes': [q.to_dict() for q in self.notable_quotes],
+            'sentiment_analysis': self.sentiment_analysis,
+            'recommendations': self.recommendations,
+            'patterns': self.patterns,
+        }
+        if self.warning:
+            data['warning'] = self.warning
+        if self.error:
+            data['error'] = self.error
+        return data
+
+    def to_json(self):
+        return json.dumps(self.to_dict(), indent=2)
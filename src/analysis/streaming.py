@@ -0,0 +1,87 @@
+"""
+Streaming JSON Sections
+Incremental parser for a JSON object arriving as a token stream
+
+Claude's analysis is one top-level JSON object. As text streams in, the
+parser tracks nesting depth and string state, and hands back each top-level
+member ("executive_summary", "issues_identified", ...) as soon as it closes,
+so callers can persist sections long before the response is finished.
+"""
+import json
+
+
+class SectionStreamParser:
+    """Emit (key, value) for each completed top-level member of a JSON object"""
+
+    def __init__(self):
+        self._started = False
+        self._finished = False
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._member = []
+
+    @property
+    def finished(self):
+        """Whether the closing brace of the top-level object has been seen"""
+        return self._finished
+
+    def feed(self, text):
+        """
+        Consume the next chunk of streamed text
+
+        Returns:
+            List of (key, value) pairs completed by this chunk
+        """
+        sections = []
+        for char in text:
+            if self._finished:
+                break
+
+            if not self._started:
+                # Skip anything before the object (e.g. a ```json fence)
+                if char == '{':
+                    self._started = True
+                    self._depth = 1
+                continue
+
+            if self._in_string:
+                self._member.append(char)
+                if self._escaped:
+                    self._escaped = False
+                elif char == '\\':
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                continue
+
+            if char == '"':
+                self._in_string = True
+            elif char in '{[':
+                self._depth += 1
+            elif char in '}]':
+                self._depth -= 1
+
+            if self._depth == 0 or (self._depth == 1 and char == ','):
+                # End of a top-level member
+                section = self._close_member()
+                if section:
+                    sections.append(section)
+                if self._depth == 0:
+                    self._finished = True
+                continue
+
+            self._member.append(char)
+
+        return sections
+
+    def _close_member(self):
+        text = ''.join(self._member).strip()
+        self._member = []
+        if not text:
+            return None
+        try:
+            member = json.loads('{' + text + '}')
+        except json.JSONDecodeError:
+            return None
+        return next(iter(member.items()))
@@ -0,0 +1,324 @@
+"""
+Structured Transcripts
+Diarized transcript segments with timestamps, speakers and confidence
+
+Segments are stored column-wise: parallel arrays of start, end, speaker id
+and confidence, plus the text of each segment. Speaker labels are interned
+into a small table, so each segment carries an integer rather than a string.
+Segments are kept in start-time order. A time-range lookup is two binary
+searches (O(log n)), and per-speaker iteration walks a precomputed index
+list instead of scanning text.
+
+Serialized with msgpack: the numeric columns go in as packed little-endian
+arrays, so a few-hour meeting is a few hundred KB before compression.
+"""
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+
+FORMAT_VERSION = 1
+NO_SPEAKER = -1
+
+
+class StructuredTranscript:
+    """Columnar transcript: start/end/speaker/confidence arrays plus text"""
+
+    def __init__(self):
+        self.speakers = []
+        self._speaker_ids = {}
+
+        self.starts = array('d')
+        self.ends = array('d')
+        self.speaker_ids = array('i')
+        self.confidences = array('f')
+        self.texts = []
+
+        # Built on first use, dropped on append
+        self._max_ends = None
+        self._by_speaker = None
+
+    def __len__(self):
+        return len(self.texts)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.segment(i)
+
+    def intern(self, label):
+        """Id of a speaker label, adding it to the table if new"""
+        if label is None:
+            return NO_SPEAKER
+        speaker_id = self._speaker_ids.get(label)
+        if speaker_id is None:
+            speaker_id = len(self.speakers)
+            self.speakers.append(label)
+            self._speaker_ids[label] = speaker_id
+        return speaker_id
+
+    def append(self, start, end, text, speaker=None, confidence=1.0):
+        """
+        Add a segment; segments must arrive in start-time order
+
+        Raises:
+            ValueError: If start is earlier than the previous segment's start
+        """
+        if self.starts and start < self.starts[-1]:
+            raise ValueError("Segments must be appended in start-time order")
+        self.starts.append(start)
+        self.ends.append(max(end, start))
+        self.speaker_ids.append(self.intern(speaker))
+        self.confidences.append(confidence if confidence is not None else 1.0)
+        self.texts.append(text)
+        self._max_ends = None
+        self._by_speaker = None
+
+    def segment(self, i):
+        speaker_id = self.speaker_ids[i]
+        return {
+            'start': self.starts[i],
+            'end': self.ends[i],
+            'speaker': self.speakers[speaker_id] if speaker_id != NO_SPEAKER else None,
+            'confidence': round(self.confidences[i], 4),
+            'text': self.texts[i],
+        }
+
+    @property
+    def duration(self):
+        return max(self.ends) if self.ends else 0.0
+
+    def index_range(self, start, end):
+        """
+        Indices of segments overlapping [start, end)
+
+        Segments from diarization can overlap, so ends aren't sorted; a
+        running maximum of ends is, and bounds where overlaps can begin.
+        """
+        if self._max_ends is None:
+            running, max_ends = float('-inf'), array('d')
+            for value in self.ends:
+                running = max(running, value)
+                max_ends.append(running)
+            self._max_ends = max_ends
+
+        lo = bisect_right(self._max_ends, start)
+        hi = bisect_left(self.starts, end)
+        return [i for i in range(lo, hi) if self.ends[i] > start]
+
+    def between(self, start, end):
+        """Segments overlapping [start, end) seconds, as dicts"""
+        return [self.segment(i) for i in self.index_range(start, end)]
+
+    def slice(self, start, end):
+        """A new StructuredTranscript of the segments overlapping [start, end)"""
+        return self._subset(self.index_range(start, end))
+
+    def shift(self, seconds):
+        """
+        Move every segment later by seconds, in place (e.g. to undo silence
+        trimmed from the start of the audio)
+
+        Returns:
+            self
+        """
+        if seconds:
+            self.starts = array('d', (start + seconds for start in self.starts))
+            self.ends = array('d', (end + seconds for end in self.ends))
+            self._max_ends = None
+        return self
+
+    def for_speaker(self, label):
+        """Iterate a speaker's segments in time order"""
+        if self._by_speaker is None:
+            by_speaker = {}
+            for i, speaker_id in enumerate(self.speaker_ids):
+                by_speaker.setdefault(speaker_id, array('i')).append(i)
+            self._by_speaker = by_speaker
+
+        speaker_id = self._speaker_ids.get(label)
+        for i in self._by_speaker.get(speaker_id, ()) if speaker_id is not None else ():
+            yield self.segment(i)
+
+    def speaking_time(self):
+        """Seconds spoken per speaker label"""
+        totals = {}
+        for i, speaker_id in enumerate(self.speaker_ids):
+            if speaker_id != NO_SPEAKER:
+                label = self.speakers[speaker_id]
+                totals[label] = totals.get(label, 0.0) + self.ends[i] - self.starts[i]
+        return totals
+
+    def turns(self):
+        """Text of each segment with its speaker label, in order"""
+        turns = []
+        for text, speaker_id in zip(self.texts, self.speaker_ids):
+            text = text.strip()
+            if text:
+                turns.append(f"{self.speakers[speaker_id]}: {text}" if speaker_id != NO_SPEAKER else text)
+        return turns
+
+    def to_text(self):
+        """
+        Flat transcript text
+
+        Diarized transcripts use the "Speaker N: text" paragraphs the
+        analyzer prompt expects; undiarized ones are joined with spaces.
+        """
+        if not self.speakers:
+            return ' '.join(text.strip() for text in self.texts if text.strip())
+        return '\n\n'.join(self.turns())
+
+    def _subset(self, indices):
+        subset = StructuredTranscript()
+        for i in indices:
+            segment = self.segment(i)
+            subset.append(segment['start'], segment['end'], segment['text'],
+                          segment['speaker'], self.confidences[i])
+        return subset
+
+    # Serialization
+
+    def to_dict(self):
+        """JSON-friendly form (used by the transcript cache)"""
+        return {
+            'version': FORMAT_VERSION,
+            'speakers': list(self.speakers),
+            'start': list(self.starts),
+            'end': list(self.ends),
+            'speaker': list(self.speaker_ids),
+            'confidence': [round(c, 4) for c in self.confidences],
+            'text': list(self.texts),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        transcript = cls()
+        transcript._load(
+            data['speakers'],
+            array('d', data['start']),
+            array('d', data['end']),
+            array('i', data['speaker']),
+            array('f', data['confidence']),
+            list(data['text'])
+        )
+        return transcript
+
+    def to_bytes(self):
+        """msgpack with the numeric columns as packed little-endian arrays"""
+        import msgpack
+
+        return msgpack.packb({
+            'version': FORMAT_VERSION,
+            'speakers': self.speakers,
+            'start': _pack(self.starts),
+            'end': _pack(self.ends),
+            'speaker': _pack(self.speaker_ids),
+            'confidence': _pack(self.confidences),
+            'text': self.texts,
+        }, use_bin_type=True)
+
+    @classmethod
+    def from_bytes(cls, payload):
+        import msgpack
+
+        data = msgpack.unpackb(payload, raw=False)
+        if data.get('version') != FORMAT_VERSION:
+            raise ValueError(f"Unsupported structured transcript version: {data.get('version')}")
+        transcript = cls()
+        transcript._load(
+            data['speakers'],
+            _unpack('d', data['start']),
+            _unpack('d', data['end']),
+            _unpack('i', data['speaker']),
+            _unpack('f', data['confidence']),
+            data['text']
+        )
+        return transcript
+
+    def _load(self, speakers, starts, ends, speaker_ids, confidences, texts):
+        if not len(starts) == len(ends) == len(speaker_ids) == len(confidences) == len(texts):
+            raise ValueError("Structured transcript columns have different lengths")
+        self.speakers = list(speakers)
+        self._speaker_ids = {label: i for i, label in enumerate(self.speakers)}
+        self.starts, self.ends = starts, ends
+        self.speaker_ids, self.confidences = speaker_ids, confidences
+        self.texts = texts
+        self._max_ends = None
+        self._by_speaker = None
+
+    # Builders
+
+    @classmethod
+    def from_deepgram(cls, response):
+        """
+        Build from a Deepgram prerecorded response
+
+        Uses utterances (requested with utterances=True) when present;
+        otherwise the whole transcript becomes one segment.
+        """
+        results = response['results']
+        transcript = cls()
+        utterances = results.get('utterances')
+        if utterances:
+            for utterance in sorted(utterances, key=lambda u: u['start']):
+                transcript.append(
+                    utterance['start'],
+                    utterance['end'],
+                    utterance['transcript'],
+                    speaker=f"Speaker {utterance['speaker']}" if utterance.get('speaker') is not None else None,
+                    confidence=utterance.get('confidence')
+                )
+            return transcript
+
+        alternative = results['channels'][0]['alternatives'][0]
+        words = alternative.get('words') or []
+        end = words[-1]['end'] if words else response.get('metadata', {}).get('duration', 0.0)
+        transcript.append(0.0, end, alternative['transcript'], confidence=alternative.get('confidence'))
+        return transcript
+
+    @classmethod
+    def from_segments(cls, segments):
+        """Build from Whisper-style {'start', 'end', 'text'} segments"""
+        transcript = cls()
+        for segment in sorted(segments, key=lambda s: s['start']):
+            transcript.append(
+                segment['start'],
+                segment['end'],
+                segment['text'].strip(),
+                speaker=segment.get('speaker'),
+                confidence=segment.get('confidence')
+            )
+        return transcript
+
+    @classmethod
+    def from_text(cls, text):
+        """
+        Best-effort structure for a plain "Speaker N: text" transcript
+
+        Timestamps are unknown, so every segment is at 0; speakers and
+        order are kept.
+        """
+        transcript = cls()
+        for paragraph in (p.strip() for p in (text or '').split('\n\n')):
+            if not paragraph:
+                continue
+            label, sep, body = paragraph.partition(': ')
+            if sep and len(label) <= 50 and '\n' not in label:
+                transcript.append(0.0, 0.0, body, speaker=label)
+            else:
+                transcript.append(0.0, 0.0, paragraph)
+        return transcript
+
+
+def _pack(values):
+    if sys.byteorder != 'little':
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _unpack(typecode, payload):
+    values = array(typecode)
+    values.frombytes(payload)
+    if sys.byteorder != 'little':
+        values.byteswap()
+    return values
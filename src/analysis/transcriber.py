@@ -1,12 +1,52 @@
 """
 Audio Transcription Service
-Converts audio files to text using Whisper or Deepgram
+Converts audio files to text using Deepgram, the Whisper API or local Whisper
+
+TRANSCRIBE_BACKEND picks the engine: deepgram, whisper (hosted API), local
+(openai-whisper on this machine, src/analysis/local_whisper.py), or auto.
+Auto uses the first of those with an API key, or local Whisper if it is
+installed.
 """
 import os
 from dotenv import load_dotenv
 
+from src.analysis.chunking import ChunkedTranscriber
+from src.analysis.deepgram_service import get_deepgram_service
+from src.analysis import local_whisper
+from src.analysis.structured import StructuredTranscript
+from src.analysis.transcript_cache import TranscriptCache, HashingReader, cache_key, hash_file
+from src.providers.client import get_client
+
 load_dotenv()
 
+# Whisper API upload limit is 25 MB; leave headroom for multipart overhead
+WHISPER_MAX_UPLOAD_BYTES = 24 * 1024 * 1024
+
+# Target length of each chunk for long recordings
+CHUNK_SECONDS = int(os.getenv('TRANSCRIBE_CHUNK_SECONDS', 600))
+
+WHISPER_OPTIONS = {
+    'model': 'whisper-1',
+}
+
+# Upload content type by file extension (recordings are .mp4; pre-processed audio .ogg or .flac)
+AUDIO_MIMETYPES = {
+    '.mp4': 'audio/mp4',
+    '.m4a': 'audio/mp4',
+    '.ogg': 'audio/ogg',
+    '.opus': 'audio/ogg',
+    '.flac': 'audio/flac',
+    '.mp3': 'audio/mpeg',
+    '.wav': 'audio/wav',
+}
+
+DEEPGRAM_OPTIONS = {
+    'punctuate': True,
+    'model': 'nova-2',
+    'language': 'en-US',
+    'diarize': True,  # Speaker diarization
+}
+
 
 class Transcriber:
     """Transcribe audio files to text"""
@@ -14,6 +54,46 @@ class Transcriber:
     def __init__(self):
         self.openai_api_key = os.getenv('OPENAI_API_KEY')
         self.deepgram_api_key = os.getenv('DEEPGRAM_API_KEY')
+        self.http = get_client()
+
+        self.backend = os.getenv('TRANSCRIBE_BACKEND', 'auto').lower()
+        if self.backend not in ('auto', 'deepgram', 'whisper', 'local'):
+            raise ValueError(f"Unknown TRANSCRIBE_BACKEND: {self.backend}")
+
+        cache_enabled = os.getenv('TRANSCRIPT_CACHE_ENABLED', 'true').lower() == 'true'
+        self.cache = TranscriptCache() if cache_enabled else None
+
+    @property
+    def provider(self):
+        """
+        Engine used for transcription: deepgram, whisper or local
+
+        Raises:
+            Exception: If the selected engine isn't configured
+        """
+        if self.backend == 'deepgram' and not self.deepgram_api_key:
+            raise Exception("TRANSCRIBE_BACKEND=deepgram needs DEEPGRAM_API_KEY in .env")
+        if self.backend == 'whisper' and not self.openai_api_key:
+            raise Exception("TRANSCRIBE_BACKEND=whisper needs OPENAI_API_KEY in .env")
+        if self.backend == 'local' and not local_whisper.is_available():
+            raise Exception("TRANSCRIBE_BACKEND=local needs openai-whisper (pip install openai-whisper)")
+        if self.backend != 'auto':
+            return self.backend
+
+        # Try Deepgram first (faster and cheaper), then OpenAI Whisper
+        if self.deepgram_api_key:
+            return 'deepgram'
+        if self.openai_api_key:
+            return 'whisper'
+        if local_whisper.is_available():
+            return 'local'
+        raise Exception("No transcription API key configured. Add OPENAI_API_KEY or DEEPGRAM_API_KEY to .env, "
+                        "or install openai-whisper to transcribe locally")
+
+    @property
+    def local(self):
+        """Shared LocalWhisper pool (warm models in worker processes)"""
+        return local_whisper.get_local_whisper()
 
     def transcribe(self, audio_file_path):
         """
@@ -28,59 +108,194 @@ class Transcriber:
         if not os.path.exists(audio_file_path):
             raise FileNotFoundError(f"Audio file not found: {audio_file_path}")
 
-        # Try Deepgram first (faster and cheaper)
-        if self.deepgram_api_key:
-            return self._transcribe_with_deepgram(audio_file_path)
+        provider = self.provider
+        if provider == 'deepgram':
+            return self._cached(
+                audio_file_path, 'deepgram', DEEPGRAM_OPTIONS,
+                self._transcribe_with_deepgram
+            )
+        if provider == 'whisper':
+            return self._cached(
+                audio_file_path, 'whisper', WHISPER_OPTIONS,
+                self._transcribe_with_whisper
+            )
+        return self._cached(
+            audio_file_path, 'whisper-local', self.local.options,
+            self._transcribe_with_local_whisper
+        )
 
-        # Fall back to OpenAI Whisper
-        elif self.openai_api_key:
-            return self._transcribe_with_whisper(audio_file_path)
+    def transcribe_structured(self, audio_file_path):
+        """
+        Transcribe an audio file keeping timestamps, speakers and confidence
 
+        Args:
+            audio_file_path: Path to the audio file
+
+        Returns:
+            StructuredTranscript (diarized with Deepgram; Whisper has no speakers)
+        """
+        if not os.path.exists(audio_file_path):
+            raise FileNotFoundError(f"Audio file not found: {audio_file_path}")
+
+        provider = self.provider
+        if provider == 'deepgram':
+            options = dict(DEEPGRAM_OPTIONS, utterances=True)
+            transcribe = self._transcribe_structured_deepgram
+        elif provider == 'whisper':
+            options = dict(WHISPER_OPTIONS, response_format='verbose_json')
+            transcribe = self._transcribe_structured_whisper
+        else:
+            options = self.local.options
+            transcribe = self._transcribe_structured_local
+            provider = 'whisper-local'
+
+        # Cached as its JSON-friendly dict, under a key distinct from plain text
+        data = self._cached(
+            audio_file_path, provider, dict(options, format='structured'),
+            lambda path: transcribe(path).to_dict()
+        )
+        return StructuredTranscript.from_dict(data)
+
+    def _transcribe_structured_deepgram(self, audio_file_path):
+        print("🎙️  Transcribing with Deepgram (structured)...")
+        response = self._deepgram_prerecorded(audio_file_path, dict(DEEPGRAM_OPTIONS, utterances=True))
+        transcript = StructuredTranscript.from_deepgram(response)
+        print(f"✅ Transcription complete: {len(transcript)} segments, {len(transcript.speakers)} speakers")
+        return transcript
+
+    def _transcribe_structured_whisper(self, audio_file_path):
+        print("🎙️  Transcribing with Whisper (structured)...")
+        if self._needs_chunking(audio_file_path):
+            engine = ChunkedTranscriber(self._whisper_segments, chunk_seconds=CHUNK_SECONDS)
+            segments = engine.transcribe(audio_file_path)
         else:
-            raise Exception("No transcription API key configured. Add OPENAI_API_KEY or DEEPGRAM_API_KEY to .env")
+            segments = self._whisper_segments(audio_file_path)
+        transcript = StructuredTranscript.from_segments(segments)
+        print(f"✅ Transcription complete: {len(transcript)} segments")
+        return transcript
+
+    def _transcribe_structured_local(self, audio_file_path):
+        print(f"🎙️  Transcribing with local Whisper ({self.local.model}, structured)...")
+        transcript = StructuredTranscript.from_segments(self.local.transcribe_segments(audio_file_path))
+        print(f"✅ Transcription complete: {len(transcript)} segments")
+        return transcript
+
+    def _transcribe_with_local_whisper(self, audio_file_path):
+        """Transcribe with openai-whisper in the local worker pool"""
+        print(f"🎙️  Transcribing with local Whisper ({self.local.model})...")
+        segments = self.local.transcribe_segments(audio_file_path)
+        transcript = ' '.join(segment['text'] for segment in segments)
+        print(f"✅ Transcription complete: {len(transcript)} characters")
+        return transcript
+
+    def _cached(self, audio_file_path, provider, options, transcribe):
+        """Serve from the transcript cache, or transcribe and store the result"""
+        if self.cache is None:
+            return transcribe(audio_file_path)
+
+        key = cache_key(hash_file(audio_file_path), provider, options.get('model'), options)
+        transcript = self.cache.get(key)
+        if transcript is not None:
+            print(f"⚡ Transcript cache hit ({provider})")
+            return transcript
+
+        transcript = transcribe(audio_file_path)
+        self.cache.put(key, transcript)
+        return transcript
 
     def _transcribe_with_whisper(self, audio_file_path):
         """Transcribe using OpenAI Whisper API"""
+        if self._needs_chunking(audio_file_path):
+            return self._transcribe_with_whisper_chunked(audio_file_path)
+
         from openai import OpenAI
 
-        client = OpenAI(api_key=self.openai_api_key)
+        # Retries are handled by the shared provider client
+        client = OpenAI(api_key=self.openai_api_key, max_retries=0)
 
         print("🎙️  Transcribing with Whisper...")
 
-        with open(audio_file_path, 'rb') as audio_file:
-            transcript = client.audio.transcriptions.create(
-                model="whisper-1",
-                file=audio_file,
-                response_format="text"
-            )
+        def create_transcription():
+            # Re-open per attempt so a retry uploads the file from the start
+            with open(audio_file_path, 'rb') as audio_file:
+                return client.audio.transcriptions.create(
+                    model=WHISPER_OPTIONS['model'],
+                    file=audio_file,
+                    response_format="text"
+                )
+
+        transcript = self.http.call('api.openai.com', create_transcription)
 
         print(f"✅ Transcription complete: {len(transcript)} characters")
         return transcript
 
+    def _needs_chunking(self, audio_file_path):
+        """Whisper rejects uploads over 25 MB; long files are also slow in one piece"""
+        if os.path.getsize(audio_file_path) > WHISPER_MAX_UPLOAD_BYTES:
+            return True
+
+        from pydub.utils import mediainfo
+
+        try:
+            duration = float(mediainfo(audio_file_path).get('duration', 0))
+        except (TypeError, ValueError):
+            return False
+        return duration > CHUNK_SECONDS * 1.5
+
+    def _transcribe_with_whisper_chunked(self, audio_file_path):
+        """Split on silence and transcribe the chunks concurrently"""
+        engine = ChunkedTranscriber(self._whisper_segments, chunk_seconds=CHUNK_SECONDS)
+        segments = engine.transcribe(audio_file_path)
+        transcript = ' '.join(segment['text'] for segment in segments)
+
+        print(f"✅ Transcription complete: {len(transcript)} characters")
+        return transcript
+
+    def _whisper_segments(self, audio_file_path):
+        """Transcribe one file with Whisper, keeping segment timestamps"""
+        from openai import OpenAI
+
+        client = OpenAI(api_key=self.openai_api_key, max_retries=0)
+
+        def create_transcription():
+            with open(audio_file_path, 'rb') as audio_file:
+                return client.audio.transcriptions.create(
+                    model=WHISPER_OPTIONS['model'],
+                    file=audio_file,
+                    response_format="verbose_json"
+                )
+
+        response = self.http.call('api.openai.com', create_transcription)
+        segments = []
+        for segment in getattr(response, 'segments', None) or []:
+            if not isinstance(segment, dict):
+                segment = {'start': segment.start, 'end': segment.end, 'text': segment.text}
+            segments.append({'start': segment['start'], 'end': segment['end'], 'text': segment['text']})
+        return segments
+
+    @property
+    def deepgram(self):
+        """Shared DeepgramService (one event loop and client per process)"""
+        return get_deepgram_service(self.deepgram_api_key)
+
+    def _deepgram_prerecorded(self, audio_file_path, options):
+        """Run a Deepgram prerecorded request for a file on the shared loop"""
+        extension = os.path.splitext(audio_file_path)[1].lower()
+        mimetype = AUDIO_MIMETYPES.get(extension, 'audio/mp4')
+
+        def prerecorded():
+            # Re-open per attempt so a retry uploads the file from the start
+            with open(audio_file_path, 'rb') as audio:
+                source = {'buffer': audio, 'mimetype': mimetype}
+                return self.deepgram.transcribe(source, options)
+
+        return self.http.call('api.deepgram.com', prerecorded)
+
     def _transcribe_with_deepgram(self, audio_file_path):
         """Transcribe using Deepgram API"""
-        from deepgram import Deepgram
-        import asyncio
-
         print("🎙️  Transcribing with Deepgram...")
 
-        dg_client = Deepgram(self.deepgram_api_key)
-
-        with open(audio_file_path, 'rb') as audio:
-            source = {'buffer': audio, 'mimetype': 'audio/mp4'}
-            options = {
-                'punctuate': True,
-                'model': 'nova-2',
-                'language': 'en-US',
-                'diarize': True,  # Speaker diarization
-            }
-
-            # Run async function
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            response = loop.run_until_complete(
-                dg_client.transcription.prerecorded(source, options)
-            )
+        response = self._deepgram_prerecorded(audio_file_path, DEEPGRAM_OPTIONS)
 
         # Extract transcript
         transcript = response['results']['channels'][0]['alternatives'][0]['transcript']
@@ -88,54 +303,88 @@ class Transcriber:
         print(f"✅ Transcription complete: {len(transcript)} characters")
         return transcript
 
+    @property
+    def can_stream(self):
+        """Whether transcribe_stream() is available (Deepgram only)"""
+        try:
+            return self.provider == 'deepgram'
+        except Exception:
+            return False
+
+    def transcribe_stream(self, stream, mimetype='audio/mp4', structured=False):
+        """
+        Transcribe audio read from a file-like stream while it is produced
+
+        Used to overlap the upload to Deepgram with the recording download.
+        The stream is consumed once, so the request is not retried.
+
+        Args:
+            stream: Readable file-like object (e.g. a ChunkPipe)
+            mimetype: Content type of the audio
+            structured: Return a StructuredTranscript instead of text
+
+        Returns:
+            Transcript text, or StructuredTranscript
+        """
+        if not self.can_stream:
+            raise Exception("Streaming transcription requires DEEPGRAM_API_KEY")
+
+        print("🎙️  Transcribing stream with Deepgram...")
+
+        options = dict(DEEPGRAM_OPTIONS, utterances=True) if structured else DEEPGRAM_OPTIONS
+
+        # Hash the audio on the way through so later file-based runs hit the cache
+        reader = HashingReader(stream)
+        source = {'buffer': reader, 'mimetype': mimetype}
+        response = self.http.call_once(
+            'api.deepgram.com',
+            self.deepgram.transcribe,
+            source,
+            options
+        )
+
+        if structured:
+            transcript = StructuredTranscript.from_deepgram(response)
+            value, cache_options = transcript.to_dict(), dict(options, format='structured')
+            print(f"✅ Transcription complete: {len(transcript)} segments, {len(transcript.speakers)} speakers")
+        else:
+            transcript = response['results']['channels'][0]['alternatives'][0]['transcript']
+            value, cache_options = transcript, options
+            print(f"✅ Transcription complete: {len(transcript)} characters")
+
+        if self.cache is not None:
+            key = cache_key(reader.hexdigest(), 'deepgram', options['model'], cache_options)
+            self.cache.put(key, value)
+
+        return transcript
+
     def transcribe_with_speakers(self, audio_file_path):
         """
         Transcribe with speaker identification
         Returns transcript with speaker labels
         """
-        if self.deepgram_api_key:
-            return self._transcribe_with_speakers_deepgram(audio_file_path)
+        if self.provider == 'deepgram':
+            options = dict(DEEPGRAM_OPTIONS, utterances=True)
+            return self._cached(
+                audio_file_path, 'deepgram', options,
+                self._transcribe_with_speakers_deepgram
+            )
         else:
             # Whisper doesn't support speaker diarization by default
             return self.transcribe(audio_file_path)
 
     def _transcribe_with_speakers_deepgram(self, audio_file_path):
         """Transcribe with speaker labels using Deepgram"""
-        from deepgram import Deepgram
-        import asyncio
-
         print("🎙️  Transcribing with speaker identification...")
 
-        dg_client = Deepgram(self.deepgram_api_key)
-
-        with open(audio_file_path, 'rb') as audio:
-            source = {'buffer': audio, 'mimetype': 'audio/mp4'}
-            options = {
-                'punctuate': True,
-                'model': 'nova-2',
-                'language': 'en-US',
-                'diarize': True,
-                'utterances': True
-            }
-
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            response = loop.run_until_complete(
-                dg_client.transcription.prerecorded(source, options)
-            )
+        options = dict(DEEPGRAM_OPTIONS, utterances=True)
+        response = self._deepgram_prerecorded(audio_file_path, options)
 
         # Format with speakers
-        utterances = response['results']['utterances']
-        formatted_transcript = []
-
-        for utterance in utterances:
-            speaker = f"Speaker {utterance['speaker']}"
-            text = utterance['transcript']
-            formatted_transcript.append(f"{speaker}: {text}")
+        structured = StructuredTranscript.from_deepgram(response)
+        transcript = structured.to_text()
 
-        transcript = "\n\n".join(formatted_transcript)
-
-        print(f"✅ Transcription complete with {len(utterances)} utterances")
+        print(f"✅ Transcription complete with {len(structured)} utterances")
         return transcript
 
 
@@ -175,3 +424,7 @@ Speaker 1: Of course. I'll follow up with everyone after next week's council mee
     def transcribe_with_speakers(self, audio_file_path):
         """Returns demo transcript with speakers"""
         return self.transcribe(audio_file_path)
+
+    def transcribe_structured(self, audio_file_path):
+        """Returns the demo transcript as untimed speaker segments"""
+        return StructuredTranscript.from_text(self.transcribe(audio_file_path).strip())
@@ -0,0 +1,153 @@
+"""
+Transcript Cache
+Persistent, content-addressed cache of transcription results
+
+Entries are keyed by a SHA-256 of the audio bytes plus the provider, model
+and options, so a retried meeting or a re-uploaded file returns its earlier
+transcript without another ASR call. Each entry is one gzip file written
+atomically (temp file + rename), which keeps concurrent writers safe. The
+directory is trimmed to a byte budget, least recently used first.
+"""
+import gzip
+import hashlib
+import io
+import json
+import os
+import tempfile
+import threading
+import time
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def hash_file(path):
+    """Streaming SHA-256 of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def cache_key(audio_hash, provider, model, options=None):
+    """Combine the audio hash with everything that changes the transcript"""
+    settings = json.dumps(
+        {'provider': provider, 'model': model, 'options': options or {}},
+        sort_keys=True
+    )
+    return hashlib.sha256(f'{audio_hash}:{settings}'.encode()).hexdigest()
+
+
+class HashingReader(io.RawIOBase):
+    """File-like wrapper that hashes bytes as they are read through it"""
+
+    def __init__(self, stream):
+        super().__init__()
+        self._stream = stream
+        self._digest = hashlib.sha256()
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        data = self._stream.read(len(b))
+        n = len(data)
+        b[:n] = data
+        self._digest.update(data)
+        return n
+
+    def hexdigest(self):
+        return self._digest.hexdigest()
+
+
+class TranscriptCache:
+    """Size-bounded LRU cache of transcripts on local disk"""
+
+    def __init__(self, directory=None, max_bytes=None):
+        self.directory = directory or os.getenv('TRANSCRIPT_CACHE_DIR', 'cache/transcripts')
+        self.max_bytes = max_bytes or int(os.getenv('TRANSCRIPT_CACHE_MAX_MB', 1024)) * 1024 * 1024
+        os.makedirs(self.directory, exist_ok=True)
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    def _path(self, key):
+        return os.path.join(self.directory, f'{key}.json.gz')
+
+    def get(self, key):
+        """
+        Look up a cached transcript
+
+        Returns:
+            The cached value, or None on a miss
+        """
+        path = self._path(key)
+        try:
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                entry = json.load(f)
+            # Bump mtime so eviction treats the entry as recently used
+            os.utime(path)
+        except (FileNotFoundError, EOFError, OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+        return entry['value']
+
+    def put(self, key, value):
+        """Store a transcript (any JSON-serializable value)"""
+        entry = {'value': value, 'created_at': time.time()}
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as raw, gzip.GzipFile(fileobj=raw, mode='wb') as f:
+                f.write(json.dumps(entry).encode('utf-8'))
+            os.replace(tmp_path, self._path(key))
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self._evict()
+
+    def _evict(self):
+        """Delete least recently used entries until under the byte budget"""
+        entries = []
+        total = 0
+        for entry in os.scandir(self.directory):
+            if not entry.name.endswith('.json.gz'):
+                continue
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+            total += stat.st_size
+
+        if total <= self.max_bytes:
+            return
+
+        for _, size, path in sorted(entries):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                # Another writer evicted it first
+                continue
+            total -= size
+            with self._lock:
+                self.evictions += 1
+            if total <= self.max_bytes:
+                break
+
+    def stats(self):
+        """Hit/miss counters"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0,
+            }
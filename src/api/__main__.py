@@ -0,0 +1,10 @@
+"""
+Run the API server: python -m src.api
+
+Started this way, the processes spawned by the preprocess and local Whisper
+pools don't re-import the API: multiprocessing skips a package's __main__
+module when preparing a spawned child.
+"""
+from src.api.app import app
+
+app.run(debug=True, port=5000)
@@ -4,13 +4,28 @@ Main application entry point
 """
 from flask import Flask, request, jsonify
 from flask_cors import CORS
+import multiprocessing
 import os
+import re
 from dotenv import load_dotenv
 
 from src.bot.meeting_bot import MeetingBot
+from src.bot.lifecycle import BotLifecycleManager
 from src.analysis.transcriber import Transcriber
+from src.analysis.aggregation import category_weeks, trending
 from src.analysis.analyzer import MeetingAnalyzer
+from src.analysis.live import live_transcript, parse_recall_transcript
+from src.analysis.structured import StructuredTranscript
 from src.api.database import db, Meeting
+from src.api.engine import configure_engine, install_sqlite_pragmas
+from src.api.events import TERMINAL_STATUSES, format_event, get_event_bus
+from src.api.migrations import upgrade_database
+from src.api.pagination import keyset_page, page_size
+from src.jobs.queue import create_job_queue
+from src.jobs.pipeline import PROCESSING_STATUSES, MeetingPipeline, search_index
+from src.jobs.scheduler import parse_join_at
+from src.providers.client import get_client
+from src.search.index import DEFAULT_LIMIT, MAX_LIMIT
 
 # Load environment variables
 load_dotenv()
@@ -18,22 +33,41 @@ load_dotenv()
 app = Flask(__name__)
 CORS(app)
 
+# Processes spawned by the preprocess and local Whisper pools re-import the
+# __main__ module, which is this one if a script imports it or it is run as
+# a file. Only the main process migrates the database and starts workers.
+MAIN_PROCESS = multiprocessing.current_process().name == 'MainProcess'
+
 # Configuration
 app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'dev-secret-key')
 app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URL', 'sqlite:///delegate-ai.db')
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+configure_engine(app)
 
 # Initialize database
 db.init_app(app)
-
-# Create tables
 with app.app_context():
-    db.create_all()
+    install_sqlite_pragmas(app, db.engine)
+
+# Create or upgrade tables (migrations/versions)
+if MAIN_PROCESS and os.getenv('DB_AUTO_MIGRATE', 'true').lower() == 'true':
+    upgrade_database(app)
 
 # Initialize services
 meeting_bot = MeetingBot()
 transcriber = Transcriber()
 analyzer = MeetingAnalyzer()
+bot_lifecycle = BotLifecycleManager(fetch_status=meeting_bot.get_bot_status)
+
+# Meeting progress events (GET /api/meetings/<id>/events)
+event_bus = get_event_bus()
+SSE_KEEPALIVE_SECONDS = int(os.getenv('SSE_KEEPALIVE_SECONDS', 15))
+
+# Background processing pipeline
+job_queue = create_job_queue()
+pipeline = MeetingPipeline(app, job_queue, meeting_bot, transcriber, analyzer, bot_lifecycle)
+if MAIN_PROCESS and os.getenv('PIPELINE_WORKERS_ENABLED', 'true').lower() == 'true':
+    pipeline.start()
 
 
 @app.route('/')
@@ -55,8 +89,12 @@ def create_meeting():
     {
         "zoom_link": "https://zoom.us/j/123456789",
         "meeting_name": "Optional meeting name",
-        "rep_name": "Your name"
+        "rep_name": "Your name",
+        "join_at": "Optional ISO 8601 start time, e.g. 2026-10-19T15:00:00Z"
     }
+
+    With join_at the meeting is scheduled: the bot is sent just before the
+    start time, as bot capacity allows, without calling /process.
     """
     data = request.json
 
@@ -67,6 +105,13 @@ def create_meeting():
     meeting_name = data.get('meeting_name', 'Unnamed Meeting')
     rep_name = data.get('rep_name', 'Representative')
 
+    join_at = None
+    if data.get('join_at'):
+        try:
+            join_at = parse_join_at(str(data['join_at']))
+        except ValueError:
+            return jsonify({'error': 'join_at must be an ISO 8601 date and time'}), 400
+
     try:
         # Create meeting record
         meeting = Meeting(
@@ -78,6 +123,17 @@ def create_meeting():
         db.session.add(meeting)
         db.session.commit()
 
+        if join_at is not None:
+            dispatch_at = pipeline.schedule(meeting.id, join_at)
+            return jsonify({
+                'success': True,
+                'meeting_id': meeting.id,
+                'status': 'scheduled',
+                'join_at': join_at.isoformat(),
+                'dispatch_at': dispatch_at.isoformat(),
+                'message': 'Meeting scheduled. Bot will join at the start time.'
+            }), 201
+
         # Start async processing (in production, use Celery)
         # For now, we'll process synchronously for demo purposes
         # process_meeting.delay(meeting.id)
@@ -93,27 +149,240 @@ def create_meeting():
         return jsonify({'error': str(e)}), 500
 
 
+# Fields GET /api/meetings/<id> can return, and the ones it returns by default
+MEETING_FIELDS = {
+    'id': lambda m: m.id,
+    'meeting_name': lambda m: m.meeting_name,
+    'zoom_link': lambda m: m.zoom_link,
+    'rep_name': lambda m: m.rep_name,
+    'status': lambda m: m.status,
+    'error_message': lambda m: m.error_message,
+    'bot_status': lambda m: m.bot_status,
+    'transcript': lambda m: m.transcript,
+    'transcript_size': lambda m: m.transcript_size,
+    'segments_size': lambda m: m.segments_size,
+    'analysis': lambda m: m.analysis,
+    'analysis_size': lambda m: m.analysis_size,
+    'duration_seconds': lambda m: m.duration_seconds,
+    'created_at': lambda m: m.created_at.isoformat() if m.created_at else None,
+    'join_at': lambda m: m.join_at.isoformat() if m.join_at else None,
+    'completed_at': lambda m: m.completed_at.isoformat() if m.completed_at else None,
+}
+DEFAULT_MEETING_FIELDS = (
+    'id', 'meeting_name', 'zoom_link', 'status', 'transcript', 'analysis', 'created_at', 'completed_at'
+)
+# Columns behind fields that aren't stored in a column of the same name
+FIELD_COLUMNS = {
+    'transcript': ('transcript_ref', 'transcript_size', 'transcript_inline'),
+    'analysis': ('analysis_ref', 'analysis_size', 'analysis_inline'),
+}
+
+
 @app.route('/api/meetings/<int:meeting_id>', methods=['GET'])
 def get_meeting(meeting_id):
-    """Get meeting details, transcript, and analysis"""
-    meeting = Meeting.query.get_or_404(meeting_id)
+    """
+    Get meeting details, transcript, and analysis
+
+    Query params:
+        fields: Optional comma-separated subset of MEETING_FIELDS, e.g.
+            ?fields=status to poll without loading the transcript
+    """
+    fields = DEFAULT_MEETING_FIELDS
+    if request.args.get('fields'):
+        fields = [f.strip() for f in request.args['fields'].split(',') if f.strip()]
+        unknown = [f for f in fields if f not in MEETING_FIELDS]
+        if unknown:
+            return jsonify({'error': f"Unknown fields: {', '.join(unknown)}"}), 400
+
+    # Only the requested columns are read from the database
+    columns = [
+        getattr(Meeting, column)
+        for field in fields if field != 'id'
+        for column in FIELD_COLUMNS.get(field, (field,))
+    ]
+    meeting = Meeting.query.options(
+        db.load_only(*columns) if columns else db.load_only(Meeting.id)
+    ).filter_by(id=meeting_id).first_or_404()
+
+    return jsonify({field: MEETING_FIELDS[field](meeting) for field in fields})
+
+
+@app.route('/api/meetings/<int:meeting_id>/events', methods=['GET'])
+def meeting_events(meeting_id):
+    """
+    Server-sent events for one meeting
+
+    The first event is a status snapshot. Then, as they happen:
+        status:           {"status", "error_message"?}
+        bot_status:       {"code"} from Recall.ai
+        transcription:    {"state": downloading|transcribing|completed, ...}
+        segments:         {"segments": [...]} received live
+        analysis_section: {"key", "value"} as the analysis streams in
+        analysis:         rolling live analysis so far
+    The stream ends after a completed or failed status.
+    """
+    # Subscribe before reading the snapshot so no event falls in between
+    subscription = event_bus.subscribe(meeting_id)
+    meeting = Meeting.query.options(
+        db.load_only(Meeting.status, Meeting.bot_status, Meeting.error_message)
+    ).filter_by(id=meeting_id).first()
+    if meeting is None:
+        subscription.close()
+        return jsonify({'error': 'Meeting not found'}), 404
+
+    snapshot = {'status': meeting.status, 'bot_status': meeting.bot_status}
+    if meeting.status == 'failed':
+        snapshot['error_message'] = meeting.error_message
+    # The stream can stay open for a whole meeting; don't hold a connection
+    db.session.remove()
+
+    def stream():
+        try:
+            yield f"retry: 3000\n{format_event('status', snapshot)}"
+            if snapshot['status'] in TERMINAL_STATUSES:
+                return
+            while True:
+                message = subscription.get(SSE_KEEPALIVE_SECONDS)
+                if message is None:
+                    yield ": keepalive\n\n"
+                    continue
+                yield format_event(message['event'], message['data'])
+                if message['event'] == 'status' and message['data'].get('status') in TERMINAL_STATUSES:
+                    return
+        finally:
+            subscription.close()
+
+    response = app.response_class(stream(), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+
+@app.route('/api/meetings/<int:meeting_id>/transcript', methods=['GET'])
+def get_transcript(meeting_id):
+    """
+    Read all or part of a meeting's transcript
+
+    A byte range of the UTF-8 text comes from a Range header
+    (bytes=START-END, or bytes=-N for the last N bytes) or from
+    ?offset=&length=. Only the stored frames covering the range are read.
+    Byte offsets can split a multi-byte character at either end.
+    """
+    meeting = Meeting.query.options(
+        db.load_only(Meeting.transcript_ref, Meeting.transcript_size)
+    ).filter_by(id=meeting_id).first_or_404()
+
+    range_header = request.headers.get('Range')
+    if not range_header and 'offset' not in request.args and 'length' not in request.args:
+        return app.response_class(meeting.transcript or '', mimetype='text/plain')
+
+    try:
+        start, length = _parse_byte_range(range_header, request.args, meeting)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    data, total = meeting.read_range('transcript', start, length)
+    if not total:
+        return app.response_class('', mimetype='text/plain')
+    if start >= total or not data:
+        response = app.response_class(status=416)
+        response.headers['Content-Range'] = f'bytes */{total}'
+        return response
+
+    response = app.response_class(data, status=206, mimetype='text/plain')
+    response.headers['Accept-Ranges'] = 'bytes'
+    response.headers['Content-Range'] = f'bytes {start}-{start + len(data) - 1}/{total}'
+    return response
+
+
+@app.route('/api/meetings/<int:meeting_id>/segments', methods=['GET'])
+def get_segments(meeting_id):
+    """
+    Timed transcript segments
+
+    Query params:
+        start, end: Optional time range in seconds (segments overlapping it)
+        speaker: Optional speaker label, e.g. "Speaker 1"
+    """
+    meeting = Meeting.query.options(
+        db.load_only(Meeting.segments_ref, Meeting.transcript_ref, Meeting.transcript_inline)
+    ).filter_by(id=meeting_id).first_or_404()
+
+    segments = meeting.segments
+    if segments is None and not (meeting.transcript_ref or meeting.transcript_inline):
+        # Still in the call: what has been received live so far
+        segments = live_transcript(meeting_id)
+    timed = segments is not None
+    if segments is None:
+        # Older meetings only have text: speakers but no timestamps
+        segments = StructuredTranscript.from_text(meeting.transcript)
+
+    try:
+        start = float(request.args['start']) if 'start' in request.args else None
+        end = float(request.args['end']) if 'end' in request.args else None
+    except ValueError:
+        return jsonify({'error': 'start and end must be numbers'}), 400
+
+    if (start is not None or end is not None) and timed:
+        segments = segments.slice(start if start is not None else float('-inf'),
+                                  end if end is not None else float('inf'))
+
+    speaker = request.args.get('speaker')
+    items = list(segments.for_speaker(speaker)) if speaker else list(segments)
 
     return jsonify({
-        'id': meeting.id,
-        'meeting_name': meeting.meeting_name,
-        'zoom_link': meeting.zoom_link,
-        'status': meeting.status,
-        'transcript': meeting.transcript,
-        'analysis': meeting.analysis,
-        'created_at': meeting.created_at.isoformat() if meeting.created_at else None,
-        'completed_at': meeting.completed_at.isoformat() if meeting.completed_at else None
+        'meeting_id': meeting_id,
+        'timed': timed,
+        'speakers': segments.speakers,
+        'duration': segments.duration,
+        'segments': items
     })
 
 
+def _parse_byte_range(range_header, args, meeting):
+    """(start, length or None) from a Range header or offset/length params"""
+    if range_header:
+        match = re.fullmatch(r'bytes=(\d*)-(\d*)', range_header.strip())
+        if not match or match.groups() == ('', ''):
+            raise ValueError("Unsupported Range header")
+        first, last = match.groups()
+        if not first:
+            # Suffix range: the last N bytes
+            total = meeting.transcript_size if meeting.transcript_ref else len((meeting.transcript or '').encode('utf-8'))
+            suffix = int(last)
+            return max(total - suffix, 0), suffix
+        return int(first), (int(last) - int(first) + 1) if last else None
+
+    try:
+        start = int(args.get('offset', 0))
+        length = int(args['length']) if 'length' in args else None
+    except ValueError:
+        raise ValueError("offset and length must be integers")
+    if start < 0 or (length is not None and length < 0):
+        raise ValueError("offset and length must not be negative")
+    return start, length
+
+
 @app.route('/api/meetings', methods=['GET'])
 def list_meetings():
-    """List all meetings"""
-    meetings = Meeting.query.order_by(Meeting.created_at.desc()).all()
+    """
+    List meetings, newest first
+
+    Query params:
+        limit: Page size (default 50, max 200)
+        cursor: next_cursor from the previous page
+    """
+    try:
+        limit = page_size(request.args.get('limit'))
+        meetings, next_cursor = keyset_page(
+            db.session.query(Meeting.id, Meeting.meeting_name, Meeting.status, Meeting.created_at),
+            Meeting.created_at,
+            Meeting.id,
+            cursor=request.args.get('cursor'),
+            limit=limit
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
 
     return jsonify({
         'meetings': [{
@@ -121,67 +390,270 @@ def list_meetings():
             'meeting_name': m.meeting_name,
             'status': m.status,
             'created_at': m.created_at.isoformat() if m.created_at else None
-        } for m in meetings]
+        } for m in meetings],
+        'next_cursor': next_cursor
     })
 
 
-@app.route('/api/meetings/<int:meeting_id>/process', methods=['POST'])
-def process_meeting(meeting_id):
+@app.route('/api/search', methods=['GET'])
+def search():
     """
-    Manually trigger processing for a meeting
-    This joins the Zoom, records, transcribes, and analyzes
+    Full-text search over transcript segments, issues and summaries
+
+    Query params:
+        q: Search text; "quoted phrases" and trailing * prefixes are supported
+        limit: Number of hits (default 20, max 100)
+        meeting_id: Optional, search one meeting
+        kind: Optional, one of segment, issue, summary
     """
-    meeting = Meeting.query.get_or_404(meeting_id)
+    index = search_index()
+    if index is None:
+        return jsonify({'error': 'Search is not available for this database'}), 501
 
-    if meeting.status == 'completed':
-        return jsonify({'error': 'Meeting already processed'}), 400
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({'error': 'q is required'}), 400
+
+    kind = request.args.get('kind') or None
+    if kind not in (None, 'segment', 'issue', 'summary'):
+        return jsonify({'error': 'kind must be segment, issue or summary'}), 400
 
     try:
-        # Update status
-        meeting.status = 'processing'
-        db.session.commit()
+        limit = min(max(int(request.args.get('limit', DEFAULT_LIMIT)), 1), MAX_LIMIT)
+        meeting_id = int(request.args['meeting_id']) if request.args.get('meeting_id') else None
+    except ValueError:
+        return jsonify({'error': 'limit and meeting_id must be integers'}), 400
 
-        # Step 1: Join meeting and get recording
-        print(f"Joining meeting: {meeting.zoom_link}")
-        audio_file = meeting_bot.join_and_record(
-            meeting.zoom_link,
-            rep_name=meeting.rep_name
-        )
+    try:
+        results = index.search(db.session, query, limit=limit, meeting_id=meeting_id, kind=kind)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
 
-        # Step 2: Transcribe audio
-        print(f"Transcribing audio: {audio_file}")
-        transcript = transcriber.transcribe(audio_file)
-        meeting.transcript = transcript
-        db.session.commit()
+    return jsonify({'query': query, 'results': results})
 
-        # Step 3: Analyze with Claude
-        print("Analyzing meeting with Claude...")
-        analysis = analyzer.analyze_meeting(
-            transcript=transcript,
-            meeting_name=meeting.meeting_name
-        )
-        meeting.analysis = analysis
 
-        # Update status
-        meeting.status = 'completed'
-        meeting.completed_at = db.func.now()
-        db.session.commit()
+@app.route('/api/issues/trending', methods=['GET'])
+def trending_issues():
+    """
+    Most-mentioned issues across meetings, from the weekly rollups
+
+    Query params:
+        weeks: Window size in weeks, compared with the window before it (default 4, max 52)
+        category: Optional category filter
+        limit: Number of issues (default 10, max 50)
+    """
+    try:
+        weeks = min(max(int(request.args.get('weeks', 4)), 1), 52)
+        limit = min(max(int(request.args.get('limit', 10)), 1), 50)
+    except ValueError:
+        return jsonify({'error': 'weeks and limit must be integers'}), 400
+    category = request.args.get('category') or None
+
+    return jsonify({
+        'weeks': weeks,
+        'issues': trending(db.session, weeks=weeks, category=category, limit=limit),
+        'categories': category_weeks(db.session, weeks=weeks, category=category)
+    })
+
+
+@app.route('/api/meetings/<int:meeting_id>/process', methods=['POST'])
+def process_meeting(meeting_id):
+    """
+    Queue a meeting for processing
+    Background workers join the Zoom, record, transcribe, and analyze.
+    Poll GET /api/meetings/<id> (or the job URL) for progress.
+    """
+    meeting = Meeting.query.get_or_404(meeting_id)
+    previous_status = meeting.status
+
+    # Claim the meeting in one conditional UPDATE, so of two concurrent
+    # requests only one queues it
+    claimed = Meeting.query.filter(
+        Meeting.id == meeting.id,
+        db.or_(Meeting.status.is_(None), Meeting.status.notin_(('completed',) + PROCESSING_STATUSES))
+    ).update({Meeting.status: 'queued'}, synchronize_session=False)
+    db.session.commit()
+    if not claimed:
+        db.session.refresh(meeting)
+        if meeting.status == 'completed':
+            return jsonify({'error': 'Meeting already processed'}), 400
+        return jsonify({'error': f'Meeting is already {meeting.status}'}), 409
+
+    try:
+        job_id = pipeline.submit(meeting.id)
+
+        if job_id is None:
+            # Every bot slot is taken; the scheduler sends it when one frees up
+            return jsonify({
+                'success': True,
+                'meeting_id': meeting.id,
+                'status': 'scheduled',
+                'job_id': None,
+                'message': 'The bot will join as soon as the scheduler has a free slot.'
+            }), 202
 
         return jsonify({
             'success': True,
             'meeting_id': meeting.id,
-            'status': 'completed',
-            'transcript': transcript,
-            'analysis': analysis
-        })
+            'status': 'queued',
+            'job_id': job_id,
+            'job_url': f'/api/jobs/{job_id}'
+        }), 202
 
     except Exception as e:
-        meeting.status = 'failed'
-        meeting.error_message = str(e)
+        db.session.rollback()
+        Meeting.query.filter_by(id=meeting.id, status='queued').update(
+            {Meeting.status: previous_status}, synchronize_session=False
+        )
         db.session.commit()
         return jsonify({'error': str(e)}), 500
 
 
+@app.route('/api/scheduler', methods=['GET'])
+def get_scheduler():
+    """Bot scheduler queue depth and bots in use against the limits"""
+    stats = pipeline.scheduler.stats()
+    # Counts are only meaningful in the process running the scheduler
+    stats['running_here'] = pipeline.scheduler.running
+    return jsonify(stats)
+
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Get the status of a pipeline job"""
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+
+    return jsonify(job)
+
+
+@app.route('/api/webhooks/recall', methods=['POST'])
+def recall_webhook():
+    """
+    Receive Recall.ai bot status changes
+
+    Request body:
+    {
+        "event": "bot.status_change",
+        "data": {"bot_id": "...", "status": {"code": "in_call_recording"}}
+    }
+    """
+    webhook_token = os.getenv('RECALL_WEBHOOK_TOKEN')
+    if webhook_token and request.args.get('token') != webhook_token:
+        return jsonify({'error': 'Invalid webhook token'}), 403
+
+    data = request.json or {}
+    if data.get('event') != 'bot.status_change':
+        return jsonify({'success': True, 'ignored': True})
+
+    event = data.get('data') or {}
+    bot_id = event.get('bot_id')
+    code = (event.get('status') or {}).get('code')
+    if not bot_id or not code:
+        return jsonify({'error': 'bot_id and status.code are required'}), 400
+
+    if not pipeline.handle_bot_event(bot_id, code):
+        return jsonify({'error': 'Unknown bot'}), 404
+
+    return jsonify({'success': True})
+
+
+@app.route('/api/webhooks/recall/transcript', methods=['POST'])
+def recall_transcript_webhook():
+    """
+    Receive Recall.ai real-time transcription (live mode)
+
+    Request body:
+    {
+        "data": {
+            "bot_id": "...",
+            "transcript": {
+                "speaker": "Jane Doe",
+                "words": [{"text": "Hello", "start_time": 1.2, "end_time": 1.5}, ...],
+                "is_final": true
+            }
+        }
+    }
+    """
+    webhook_token = os.getenv('RECALL_WEBHOOK_TOKEN')
+    if webhook_token and request.args.get('token') != webhook_token:
+        return jsonify({'error': 'Invalid webhook token'}), 403
+
+    try:
+        bot_id, segment = parse_recall_transcript(request.json or {})
+    except (TypeError, ValueError):
+        return jsonify({'error': 'Malformed transcript event'}), 400
+    if not bot_id:
+        return jsonify({'error': 'bot_id is required'}), 400
+    if segment is None:
+        return jsonify({'success': True, 'ignored': True})
+
+    meeting = Meeting.query.options(db.load_only(Meeting.id)).filter_by(bot_id=bot_id).first()
+    if meeting is None:
+        return jsonify({'error': 'Unknown bot'}), 404
+
+    pipeline.live.append(meeting.id, [segment])
+    return jsonify({'success': True})
+
+
+@app.route('/api/meetings/<int:meeting_id>/live', methods=['POST'])
+def ingest_live_segments(meeting_id):
+    """
+    Append transcript segments to a meeting while it is in progress
+
+    For streamers other than the Recall.ai bot.
+
+    Request body:
+    {
+        "segments": [{"start": 12.5, "end": 15.0, "speaker": "Speaker 1", "text": "..."}],
+        "final": false     // true once the meeting has ended: runs the final analysis
+    }
+    """
+    meeting = Meeting.query.options(db.load_only(Meeting.id, Meeting.status)).filter_by(
+        id=meeting_id
+    ).first_or_404()
+    if meeting.status in ('completed', 'failed'):
+        return jsonify({'error': f'Meeting is already {meeting.status}'}), 409
+
+    data = request.json or {}
+    segments = data.get('segments') or []
+    if not isinstance(segments, list):
+        return jsonify({'error': 'segments must be a list'}), 400
+
+    try:
+        stored = pipeline.live.append(meeting_id, segments)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    job_id = None
+    if data.get('final'):
+        job_id = pipeline.finish_live(meeting_id)
+        if job_id is None:
+            db.session.refresh(meeting)
+            return jsonify({
+                'error': f'Meeting is already {meeting.status}',
+                'stored': stored
+            }), 409
+    return jsonify({'success': True, 'stored': stored, 'job_id': job_id})
+
+
+@app.route('/api/metrics/providers', methods=['GET'])
+def provider_metrics():
+    """Request counts, retries and latency per outbound provider host"""
+    return jsonify({'providers': get_client().metrics()})
+
+
+@app.route('/api/metrics/cache', methods=['GET'])
+def cache_metrics():
+    """Hit/miss counters for the result caches"""
+    return jsonify({
+        'transcripts': transcriber.cache.stats() if transcriber.cache else None,
+        'analysis': analyzer.cache.stats(),
+        'analysis_entries': analyzer.cache.records()
+    })
+
+
 @app.route('/api/transcribe', methods=['POST'])
 def transcribe_direct():
     """
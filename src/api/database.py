@@ -4,12 +4,23 @@ Database models for DelegateAI
 from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime
 
+from src.analysis.structured import StructuredTranscript
+from src.storage.blobs import get_blob_store
+
 db = SQLAlchemy()
 
 
 class Meeting(db.Model):
     """Meeting record"""
     __tablename__ = 'meetings'
+    # Indexes are created by migrations/versions; keep the two in sync
+    __table_args__ = (
+        db.Index('ix_meetings_status_created_at', 'status', 'created_at'),
+        # Keyset pagination of the newest-first meeting list
+        db.Index('ix_meetings_created_at_id', 'created_at', 'id'),
+        # Scheduled meetings reloaded into the bot scheduler on startup
+        db.Index('ix_meetings_status_join_at', 'status', 'join_at'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     zoom_link = db.Column(db.String(500), nullable=False)
@@ -17,12 +28,30 @@ class Meeting(db.Model):
     rep_name = db.Column(db.String(100))
 
     # Processing status
-    status = db.Column(db.String(50), default='pending')  # pending, processing, completed, failed
+    status = db.Column(db.String(50), default='pending')  # pending, scheduled, queued, recording, preprocessing, transcribing, analyzing, completed, failed
     error_message = db.Column(db.Text)
 
-    # Results
-    transcript = db.Column(db.Text)
-    analysis = db.Column(db.Text)  # JSON string with analysis results
+    # Recall.ai bot
+    bot_id = db.Column(db.String(100), index=True)
+    bot_status = db.Column(db.String(50))  # latest Recall.ai status code ('requested' while the bot is created)
+
+    # Message Batches job the analysis was submitted in (bulk backfills)
+    analysis_batch_id = db.Column(db.String(100))
+
+    # Results live in the blob store (src/storage/blobs.py); the row keeps
+    # a ref and the size in bytes. Use the transcript/analysis properties.
+    transcript_ref = db.Column(db.String(64))
+    transcript_size = db.Column(db.Integer)
+    analysis_ref = db.Column(db.String(64))  # JSON string with analysis results
+    analysis_size = db.Column(db.Integer)
+
+    # Timed, diarized segments (StructuredTranscript, msgpack in the blob store)
+    segments_ref = db.Column(db.String(64))
+    segments_size = db.Column(db.Integer)
+
+    # Inline text from before blob storage (deferred: large, rarely read)
+    transcript_inline = db.deferred(db.Column('transcript', db.Text))
+    analysis_inline = db.deferred(db.Column('analysis', db.Text))
 
     # Metadata
     audio_file_path = db.Column(db.String(500))
@@ -30,12 +59,115 @@ class Meeting(db.Model):
 
     # Timestamps
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    join_at = db.Column(db.DateTime)  # when the bot should join (UTC); set for scheduled meetings
     completed_at = db.Column(db.DateTime)
 
+    @property
+    def transcript(self):
+        return self._read_blob('transcript')
+
+    @transcript.setter
+    def transcript(self, text):
+        self._write_blob('transcript', text)
+
+    @property
+    def analysis(self):
+        return self._read_blob('analysis')
+
+    @analysis.setter
+    def analysis(self, text):
+        self._write_blob('analysis', text)
+
+    @property
+    def segments(self):
+        if not self.segments_ref:
+            return None
+        return StructuredTranscript.from_bytes(get_blob_store().get(self.segments_ref))
+
+    @segments.setter
+    def segments(self, transcript):
+        ref, size = get_blob_store().put(transcript.to_bytes()) if transcript is not None else (None, None)
+        self.segments_ref = ref
+        self.segments_size = size
+
+    def _read_blob(self, name):
+        ref = getattr(self, f'{name}_ref')
+        if ref:
+            return get_blob_store().get_text(ref)
+        return getattr(self, f'{name}_inline')
+
+    def _write_blob(self, name, text):
+        # The blob the old ref points at is left in the store; unreferenced
+        # blobs are only removed by `python -m src.storage.maintenance --gc`,
+        # which must be scheduled (e.g. daily from cron)
+        ref, size = get_blob_store().put(text) if text is not None else (None, None)
+        setattr(self, f'{name}_ref', ref)
+        setattr(self, f'{name}_size', size)
+        if getattr(self, f'{name}_inline') is not None:
+            setattr(self, f'{name}_inline', None)
+
+    def read_range(self, name, start, length=None):
+        """
+        Bytes [start, start + length) of the UTF-8 transcript/analysis
+
+        Returns:
+            (bytes, total size in bytes)
+        """
+        ref = getattr(self, f'{name}_ref')
+        if ref:
+            store = get_blob_store()
+            return store.read_range(ref, start, length), getattr(self, f'{name}_size')
+        data = (getattr(self, f'{name}_inline') or '').encode('utf-8')
+        end = len(data) if length is None else start + length
+        return data[start:end], len(data)
+
+    @classmethod
+    def has(cls, name):
+        """SQL condition: the meeting has a transcript/analysis, stored either way"""
+        return db.or_(
+            getattr(cls, f'{name}_ref').isnot(None),
+            getattr(cls, f'{name}_inline').isnot(None)
+        )
+
     def __repr__(self):
         return f'<Meeting {self.id}: {self.meeting_name}>'
 
 
+class LiveSegment(db.Model):
+    """A transcript segment received while the meeting is still running (src/analysis/live.py)"""
+    __tablename__ = 'live_segments'
+    __table_args__ = (
+        db.Index('ix_live_segments_meeting_id_id', 'meeting_id', 'id'),
+        db.Index('ix_live_segments_meeting_id_window_id', 'meeting_id', 'window_id'),
+        db.Index('uq_live_segments_meeting_id_delivery_key', 'meeting_id', 'delivery_key', unique=True),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    meeting_id = db.Column(db.Integer, db.ForeignKey('meetings.id'), nullable=False)
+    start_s = db.Column(db.Float, nullable=False)
+    end_s = db.Column(db.Float, nullable=False)
+    speaker = db.Column(db.String(100))
+    text = db.Column(db.Text, nullable=False)
+    delivery_key = db.Column(db.String(200))  # identifies the utterance, so redeliveries are dropped
+    window_id = db.Column(db.Integer, db.ForeignKey('live_windows.id'))  # None until a window claims it
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+class LiveWindow(db.Model):
+    """Rolling analysis of the live segments that claimed it (LiveSegment.window_id)"""
+    __tablename__ = 'live_windows'
+    __table_args__ = (
+        db.Index('ix_live_windows_meeting_id', 'meeting_id'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    meeting_id = db.Column(db.Integer, db.ForeignKey('meetings.id'), nullable=False)
+    last_segment_id = db.Column(db.Integer, nullable=False)
+    tokens = db.Column(db.Integer, nullable=False)  # estimated size of the window, weights the merge
+    result = db.Column(db.Text)  # partial analysis JSON (mapreduce.SEGMENT_PROMPT schema); None while analyzing
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
 class Constituent(db.Model):
     """Constituent information"""
     __tablename__ = 'constituents'
@@ -55,6 +187,11 @@ class Constituent(db.Model):
 class Issue(db.Model):
     """Identified issues from meetings and surveys"""
     __tablename__ = 'issues'
+    __table_args__ = (
+        db.Index('ix_issues_meeting_id', 'meeting_id'),
+        db.Index('ix_issues_category_created_at', 'category', 'created_at'),
+        db.Index('ix_issues_cluster_id', 'cluster_id'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(200), nullable=False)
@@ -63,14 +200,68 @@ class Issue(db.Model):
     priority = db.Column(db.String(50))  # high, medium, low
 
     # Tracking
-    mention_count = db.Column(db.Integer, default=1)
+    mention_count = db.Column(db.Integer, default=1)  # near-duplicates merged within the meeting
     sentiment = db.Column(db.String(50))  # positive, neutral, negative
 
     # Source
     meeting_id = db.Column(db.Integer, db.ForeignKey('meetings.id'))
 
+    # The same issue across meetings (src/analysis/aggregation.py)
+    cluster_id = db.Column(db.Integer, db.ForeignKey('issue_clusters.id'))
+
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, onupdate=datetime.utcnow)
 
     def __repr__(self):
         return f'<Issue {self.title}>'
+
+
+class IssueCluster(db.Model):
+    """One issue as raised across meetings: near-identical Issue rows share a cluster"""
+    __tablename__ = 'issue_clusters'
+    __table_args__ = (
+        db.Index('ix_issue_clusters_category', 'category'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    title = db.Column(db.String(200), nullable=False)  # first title seen
+    match_key = db.Column(db.String(200), nullable=False)  # normalized title used for matching
+    category = db.Column(db.String(100))
+    priority = db.Column(db.String(50))  # highest priority seen
+
+    mention_count = db.Column(db.Integer, default=0)
+    meeting_count = db.Column(db.Integer, default=0)
+
+    first_seen_at = db.Column(db.DateTime, default=datetime.utcnow)
+    last_seen_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<IssueCluster {self.title}>'
+
+
+class IssueRollup(db.Model):
+    """Mentions of one issue cluster in one week (weeks start on Monday)"""
+    __tablename__ = 'issue_rollups'
+    __table_args__ = (
+        db.Index('ix_issue_rollups_category_week', 'category', 'week_start'),
+    )
+
+    week_start = db.Column(db.Date, primary_key=True)
+    cluster_id = db.Column(db.Integer, db.ForeignKey('issue_clusters.id'), primary_key=True)
+    category = db.Column(db.String(100))
+
+    mention_count = db.Column(db.Integer, default=0, nullable=False)
+    meeting_count = db.Column(db.Integer, default=0, nullable=False)
+    high_priority_count = db.Column(db.Integer, default=0, nullable=False)
+    negative_count = db.Column(db.Integer, default=0, nullable=False)
+
+
+class CategoryRollup(db.Model):
+    """Issue mentions per category per week"""
+    __tablename__ = 'category_rollups'
+
+    week_start = db.Column(db.Date, primary_key=True)
+    category = db.Column(db.String(100), primary_key=True)
+
+    mention_count = db.Column(db.Integer, default=0, nullable=False)
+    meeting_count = db.Column(db.Integer, default=0, nullable=False)
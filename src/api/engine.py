@@ -0,0 +1,103 @@
+"""
+Database Engine Configuration
+Connection settings for SQLite and Postgres, driven by app config
+
+SQLite: every connection is switched to WAL with a busy timeout and
+synchronous=NORMAL. API reads then run alongside pipeline workers that
+are committing status updates, and a brief write overlap waits instead of
+failing with "database is locked".
+
+Postgres (or any server database): a sized QueuePool with overflow,
+pre-ping and recycling. Connections dropped by the server or a proxy are
+replaced instead of surfacing as errors.
+
+Each DB_* setting is read from app.config, falling back to the environment
+and then to the default below.
+"""
+import os
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+DEFAULTS = {
+    'DB_SQLITE_WAL': True,
+    'DB_SQLITE_BUSY_TIMEOUT_MS': 5000,
+    'DB_SQLITE_SYNCHRONOUS': 'NORMAL',
+    'DB_POOL_SIZE': 10,
+    'DB_MAX_OVERFLOW': 20,
+    'DB_POOL_TIMEOUT': 30,
+    'DB_POOL_RECYCLE': 1800,
+    'DB_POOL_PRE_PING': True,
+}
+
+
+def _setting(app, key):
+    default = DEFAULTS[key]
+    value = app.config.get(key, os.getenv(key, default))
+    if isinstance(default, bool):
+        return value if isinstance(value, bool) else str(value).lower() == 'true'
+    return type(default)(value)
+
+
+def database_settings(app):
+    """Resolved DB_* settings, also written back to app.config"""
+    settings = {key: _setting(app, key) for key in DEFAULTS}
+    app.config.update(settings)
+    return settings
+
+
+def is_sqlite(url):
+    return make_url(url).get_backend_name() == 'sqlite'
+
+
+def configure_engine(app):
+    """
+    Set SQLALCHEMY_ENGINE_OPTIONS for the configured database
+
+    Call before db.init_app(app). Options already present in
+    SQLALCHEMY_ENGINE_OPTIONS win over the computed ones.
+    """
+    settings = database_settings(app)
+    url = app.config['SQLALCHEMY_DATABASE_URI']
+
+    if is_sqlite(url):
+        options = {
+            # sqlite3's own lock wait, in seconds
+            'connect_args': {'timeout': settings['DB_SQLITE_BUSY_TIMEOUT_MS'] / 1000},
+        }
+    else:
+        options = {
+            'pool_size': settings['DB_POOL_SIZE'],
+            'max_overflow': settings['DB_MAX_OVERFLOW'],
+            'pool_timeout': settings['DB_POOL_TIMEOUT'],
+            'pool_recycle': settings['DB_POOL_RECYCLE'],
+            'pool_pre_ping': settings['DB_POOL_PRE_PING'],
+        }
+
+    options.update(app.config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = options
+
+
+def install_sqlite_pragmas(app, engine):
+    """
+    Apply the SQLite pragmas to every new connection of engine
+
+    Call after db.init_app(app), before the first query. No-op for
+    non-SQLite engines.
+    """
+    if engine.dialect.name != 'sqlite':
+        return
+
+    settings = database_settings(app)
+    synchronous = settings['DB_SQLITE_SYNCHRONOUS'].upper()
+    if synchronous not in ('OFF', 'NORMAL', 'FULL', 'EXTRA'):
+        raise ValueError(f"Invalid DB_SQLITE_SYNCHRONOUS: {synchronous}")
+
+    @event.listens_for(engine, 'connect')
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        if settings['DB_SQLITE_WAL']:
+            cursor.execute('PRAGMA journal_mode=WAL')
+        cursor.execute(f"PRAGMA busy_timeout={settings['DB_SQLITE_BUSY_TIMEOUT_MS']}")
+        cursor.execute(f"PRAGMA synchronous={synchronous}")
+        cursor.close()
@@ -0,0 +1,198 @@
+"""
+Meeting Events
+Publish/subscribe for meeting progress, streamed to clients as server-sent events
+
+Pipeline workers publish status transitions, Recall.ai bot status codes,
+transcription progress and analysis sections as they happen.
+GET /api/meetings/<id>/events holds one subscription per client and writes
+each event as it arrives. Clients don't poll, and an update costs no
+database read.
+
+Backends (EVENT_BUS_BACKEND):
+    memory: subscribers in this process only (default; fits the in-process
+            SQLite job queue)
+    redis:  events go through Redis pub/sub (REDIS_URL), so the API sees
+            events published by Celery workers in other processes
+"""
+import json
+import os
+import queue
+import threading
+import time
+
+CHANNEL_PREFIX = 'delegate-ai:meeting-events:'
+
+# Events buffered per client; the oldest is dropped if a client falls this far behind
+SUBSCRIBER_QUEUE_SIZE = 256
+
+# Meeting statuses after which a stream ends
+TERMINAL_STATUSES = ('completed', 'failed')
+
+# How long subscribe() waits for the Redis listener to be subscribed
+REDIS_SUBSCRIBE_TIMEOUT = 5.0
+
+
+def format_event(event, data):
+    """One server-sent event"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+class Subscription:
+    """A client's queue of events for one meeting"""
+
+    def __init__(self, bus, meeting_id):
+        self.bus = bus
+        self.meeting_id = meeting_id
+        self.queue = queue.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+
+    def get(self, timeout):
+        """Next {'event', 'data'} message, or None after timeout seconds"""
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def put(self, message):
+        try:
+            self.queue.put_nowait(message)
+        except queue.Full:
+            try:
+                self.queue.get_nowait()
+            except queue.Empty:
+                pass
+            try:
+                self.queue.put_nowait(message)
+            except queue.Full:
+                pass
+
+    def close(self):
+        self.bus.unsubscribe(self)
+
+
+class EventBus:
+    """In-process fan-out of meeting events to subscribers"""
+
+    def __init__(self):
+        self._subscribers = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, meeting_id):
+        subscription = Subscription(self, meeting_id)
+        with self._lock:
+            self._subscribers.setdefault(meeting_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.meeting_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.meeting_id]
+
+    def publish(self, meeting_id, event, data=None):
+        """
+        Send an event to everyone following a meeting
+
+        Never raises: progress events must not fail the pipeline.
+
+        Args:
+            meeting_id: Meeting id
+            event: Event name (status, bot_status, transcription, segments,
+                analysis_section, analysis)
+            data: JSON-serializable dict
+        """
+        self._deliver(meeting_id, {'event': event, 'data': data or {}})
+
+    def _deliver(self, meeting_id, message):
+        with self._lock:
+            subscribers = list(self._subscribers.get(meeting_id, ()))
+        for subscription in subscribers:
+            subscription.put(message)
+
+    def subscriber_count(self):
+        with self._lock:
+            return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+
+class RedisEventBus(EventBus):
+    """
+    Events relayed through Redis pub/sub
+
+    publish() only sends to Redis. A listener thread, started by the first
+    subscribe(), hands every message back to this process's subscribers.
+    subscribe() returns once Redis has confirmed the listener's
+    subscription, so no event published after it returns is missed.
+    """
+
+    def __init__(self, url=None):
+        super().__init__()
+        # Import lazily; redis is only needed for this backend
+        import redis
+
+        self.redis = redis.Redis.from_url(url or os.getenv('REDIS_URL', 'redis://localhost:6379/0'))
+        self._listener = None
+        self._subscribed = threading.Event()
+
+    def publish(self, meeting_id, event, data=None):
+        message = {'event': event, 'data': data or {}}
+        try:
+            self.redis.publish(f'{CHANNEL_PREFIX}{meeting_id}', json.dumps(message))
+        except Exception as e:
+            print(f"⚠️  Could not publish {event} event to Redis: {e}")
+            self._deliver(meeting_id, message)
+
+    def subscribe(self, meeting_id):
+        with self._lock:
+            if self._listener is None:
+                self._listener = threading.Thread(target=self._listen, name='event-bus-redis', daemon=True)
+                self._listener.start()
+        subscription = super().subscribe(meeting_id)
+        if not self._subscribed.wait(REDIS_SUBSCRIBE_TIMEOUT):
+            print("⚠️  Redis event subscription not confirmed yet; early events may be missed")
+        return subscription
+
+    def _listen(self):
+        while True:
+            try:
+                pubsub = self.redis.pubsub()
+                pubsub.psubscribe(f'{CHANNEL_PREFIX}*')
+                for item in pubsub.listen():
+                    if item['type'] == 'psubscribe':
+                        # Redis has processed the PSUBSCRIBE; later publishes reach us
+                        self._subscribed.set()
+                        continue
+                    if item['type'] != 'pmessage':
+                        continue
+                    channel = item['channel']
+                    if isinstance(channel, bytes):
+                        channel = channel.decode('utf-8')
+                    meeting_id = int(channel[len(CHANNEL_PREFIX):])
+                    self._deliver(meeting_id, json.loads(item['data']))
+            except Exception as e:
+                self._subscribed.clear()
+                print(f"⚠️  Lost Redis event subscription ({e}); reconnecting")
+                time.sleep(1)
+
+
+_bus = None
+_bus_lock = threading.Lock()
+
+
+def create_event_bus(backend=None):
+    """Event bus selected by EVENT_BUS_BACKEND (memory or redis)"""
+    backend = (backend or os.getenv('EVENT_BUS_BACKEND', 'memory')).lower()
+    if backend == 'redis':
+        return RedisEventBus()
+    if backend == 'memory':
+        return EventBus()
+    raise ValueError(f"Unknown EVENT_BUS_BACKEND: {backend}")
+
+
+def get_event_bus():
+    """Process-wide event bus"""
+    global _bus
+    with _bus_lock:
+        if _bus is None:
+            _bus = create_event_bus()
+        return _bus
@@ -0,0 +1,156 @@
+"""
+Index Migration Benchmark
+Query plans and timings before and after the index migration
+
+Builds a throwaway SQLite database at the pre-index revision (0002) and
+seeds it with N meetings and N issues. It runs the app's hot queries, then
+applies the remaining migrations and runs them again. For each query it
+prints the EXPLAIN QUERY PLAN output and the median latency.
+
+Usage:
+    python -m src.api.index_benchmark                 # 1,000,000 rows
+    python -m src.api.index_benchmark --rows 100000 --keep bench.db
+"""
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from src.analysis.schema import CATEGORIES, PRIORITIES
+from src.api.migrations import alembic_config
+
+SEED_CHUNK = 50000
+
+# (label, sql, params) -- params are filled in from the seeded data
+QUERIES = (
+    ('status queue', "SELECT id FROM meetings WHERE status = 'pending' ORDER BY created_at LIMIT 50", ()),
+    ('list, first page',
+     "SELECT id, meeting_name, status, created_at FROM meetings "
+     "ORDER BY created_at DESC, id DESC LIMIT 51", ()),
+    ('list, deep page',
+     "SELECT id, meeting_name, status, created_at FROM meetings "
+     "WHERE created_at <= :created_at AND (created_at < :created_at OR (created_at = :created_at AND id < :id)) "
+     "ORDER BY created_at DESC, id DESC LIMIT 51", ('cursor',)),
+    ('issues for a meeting', "SELECT id FROM issues WHERE meeting_id = :meeting_id", ('meeting',)),
+    ('issues by category',
+     "SELECT title, priority FROM issues WHERE category = 'housing' ORDER BY created_at DESC LIMIT 50", ()),
+)
+
+
+def migrate(path, revision):
+    from alembic import command
+    from sqlalchemy import create_engine
+
+    engine = create_engine(f'sqlite:///{path}')
+    with engine.begin() as connection:
+        command.upgrade(alembic_config(connection), revision)
+    engine.dispose()
+
+
+def seed(path, rows):
+    """Insert `rows` meetings and `rows` issues (transcripts left empty)"""
+    conn = sqlite3.connect(path)
+    conn.execute('PRAGMA journal_mode=OFF')
+    conn.execute('PRAGMA synchronous=OFF')
+
+    start = datetime(2024, 1, 1)
+    statuses = ['completed'] * 90 + ['failed'] * 5 + ['pending'] * 3 + ['queued', 'analyzing']
+    rng = random.Random(0)
+
+    for offset in range(0, rows, SEED_CHUNK):
+        meetings = []
+        for i in range(offset + 1, min(offset + SEED_CHUNK, rows) + 1):
+            created = start + timedelta(seconds=i * 60)
+            meetings.append((i, 'https://zoom.us/j/1', f'Meeting {i}', 'Rep', rng.choice(statuses), created, created))
+        conn.executemany(
+            'INSERT INTO meetings (id, zoom_link, meeting_name, rep_name, status, created_at, completed_at) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?)',
+            meetings
+        )
+        conn.executemany(
+            'INSERT INTO issues (title, category, priority, mention_count, sentiment, meeting_id, created_at) '
+            'VALUES (?, ?, ?, 1, ?, ?, ?)',
+            [
+                (f'Issue {m[0]}', rng.choice(CATEGORIES), rng.choice(PRIORITIES), 'neutral',
+                 rng.randint(1, rows), m[5])
+                for m in meetings
+            ]
+        )
+        conn.commit()
+        print(f"   seeded {min(offset + SEED_CHUNK, rows):,} / {rows:,}", end='\r')
+    print()
+    conn.close()
+
+
+def run_queries(path, rows, repeat):
+    conn = sqlite3.connect(path)
+    conn.execute('ANALYZE')
+    cursor_row = conn.execute(
+        'SELECT created_at, id FROM meetings ORDER BY id LIMIT 1 OFFSET ?', (rows // 2,)
+    ).fetchone()
+    params = {
+        'cursor': {'created_at': cursor_row[0], 'id': cursor_row[1]},
+        'meeting': {'meeting_id': rows // 3},
+    }
+
+    results = {}
+    for label, sql, needs in QUERIES:
+        bound = {}
+        for need in needs:
+            bound.update(params[need])
+        plan = [row[-1] for row in conn.execute('EXPLAIN QUERY PLAN ' + sql, bound)]
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            conn.execute(sql, bound).fetchall()
+            timings.append(time.perf_counter() - started)
+        results[label] = (plan, statistics.median(timings))
+    conn.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the index migration on a seeded SQLite database')
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per query (median is reported)')
+    parser.add_argument('--keep', help='Keep the database at this path instead of a temp file')
+    args = parser.parse_args()
+
+    path = args.keep or os.path.join(tempfile.mkdtemp(), 'index-benchmark.db')
+    if os.path.exists(path):
+        os.remove(path)
+
+    print(f"🗄️  Building {path} at revision 0002 (before indexes)")
+    migrate(path, '0002')
+    seed(path, args.rows)
+
+    print("⏱️  Running queries without indexes...")
+    before = run_queries(path, args.rows, args.repeat)
+
+    print("🛠️  Applying migrations to head...")
+    started = time.perf_counter()
+    migrate(path, 'head')
+    print(f"   took {time.perf_counter() - started:.1f}s")
+
+    print("⏱️  Running queries with indexes...")
+    after = run_queries(path, args.rows, args.repeat)
+
+    print()
+    for label, _, _ in QUERIES:
+        plan_before, seconds_before = before[label]
+        plan_after, seconds_after = after[label]
+        speedup = seconds_before / seconds_after if seconds_after else float('inf')
+        print(f"{label}: {seconds_before * 1000:.2f} ms -> {seconds_after * 1000:.2f} ms ({speedup:,.0f}x)")
+        print(f"   before: {'; '.join(plan_before)}")
+        print(f"   after:  {'; '.join(plan_after)}")
+
+    if not args.keep:
+        os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
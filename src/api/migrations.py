@@ -0,0 +1,53 @@
+"""
+Database Migrations
+Applies the Alembic migrations in migrations/ to the app's database
+
+The schema is owned by migrations/versions. The app upgrades to head on
+startup instead of calling db.create_all(). A database created by
+create_all() before migrations existed has no alembic_version table; it is
+stamped at the revision its columns match, then upgraded from there.
+
+Usage:
+    alembic upgrade head                    # from the repository root
+    alembic revision -m "add something"     # new migration
+"""
+import os
+
+from src.api.database import db
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def alembic_config(connection=None):
+    """Alembic Config for this repository, optionally bound to a connection"""
+    from alembic.config import Config
+
+    config = Config(os.path.join(ROOT, 'alembic.ini'))
+    config.set_main_option('script_location', os.path.join(ROOT, 'migrations'))
+    if connection is not None:
+        config.attributes['connection'] = connection
+    return config
+
+
+def legacy_revision(connection):
+    """Revision an unversioned (create_all) database corresponds to, or None"""
+    inspector = db.inspect(connection)
+    tables = inspector.get_table_names()
+    if 'alembic_version' in tables or 'meetings' not in tables:
+        return None
+    columns = {column['name'] for column in inspector.get_columns('meetings')}
+    return '0002' if 'bot_id' in columns else '0001'
+
+
+def upgrade_database(app, revision='head'):
+    """Bring the app's database up to the given revision"""
+    from alembic import command
+
+    with app.app_context():
+        with db.engine.begin() as connection:
+            config = alembic_config(connection)
+            legacy = legacy_revision(connection)
+            if legacy:
+                print(f"🗄️  Stamping existing database at revision {legacy}")
+                command.stamp(config, legacy)
+            command.upgrade(config, revision)
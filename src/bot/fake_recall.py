@@ -0,0 +1,189 @@
+"""
+Fake Recall.ai Server
+Local stand-in for the bot API, for exercising the lifecycle manager
+
+Bots walk through the usual status sequence on a timer, status changes are
+POSTed to the bot's webhook_url, and finished bots serve a dummy recording.
+
+Usage:
+    python -m src.bot.fake_recall --port 8765 --step-seconds 2
+    RECALL_API_BASE=http://localhost:8765/api/v1 RECALL_API_KEY=fake python src/api/app.py
+"""
+import argparse
+import json
+import os
+import re
+import threading
+import uuid
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib import request as urlrequest
+
+STATUS_SEQUENCE = [
+    'joining_call',
+    'in_call_not_recording',
+    'in_call_recording',
+    'call_ended',
+    'done',
+]
+
+
+class FakeRecallServer:
+    """In-memory Recall.ai bot API served over HTTP"""
+
+    def __init__(self, host='127.0.0.1', port=8765, step_seconds=2.0,
+                 recording_bytes=1024 * 1024, drop_webhooks=False):
+        self.step_seconds = step_seconds
+        self.recording_bytes = recording_bytes
+        self.drop_webhooks = drop_webhooks
+        self.bots = {}
+        self._lock = threading.Lock()
+
+        server = self
+
+        class Handler(_FakeRecallHandler):
+            fake = server
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.base_url = f'http://{host}:{self.httpd.server_port}'
+
+    def start(self):
+        """Serve in a background thread"""
+        thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+
+    def create_bot(self, payload):
+        bot_id = str(uuid.uuid4())
+        bot = {
+            'id': bot_id,
+            'meeting_url': payload.get('meeting_url'),
+            'bot_name': payload.get('bot_name'),
+            'webhook_url': payload.get('webhook_url'),
+            'status_changes': [],
+            'video_url': None,
+        }
+        with self._lock:
+            self.bots[bot_id] = bot
+        self._advance(bot_id, 0)
+        return bot
+
+    def _advance(self, bot_id, step):
+        code = STATUS_SEQUENCE[step]
+        with self._lock:
+            bot = self.bots[bot_id]
+            bot['status_changes'].append({
+                'code': code,
+                'created_at': datetime.utcnow().isoformat()
+            })
+            if code == 'done':
+                bot['video_url'] = f'{self.base_url}/recordings/{bot_id}.mp4'
+
+        self._send_webhook(bot, code)
+
+        if step + 1 < len(STATUS_SEQUENCE):
+            timer = threading.Timer(self.step_seconds, self._advance, args=(bot_id, step + 1))
+            timer.daemon = True
+            timer.start()
+
+    def _send_webhook(self, bot, code):
+        if self.drop_webhooks or not bot['webhook_url']:
+            return
+        body = json.dumps({
+            'event': 'bot.status_change',
+            'data': {'bot_id': bot['id'], 'status': {'code': code}}
+        }).encode()
+        req = urlrequest.Request(
+            bot['webhook_url'],
+            data=body,
+            headers={'Content-Type': 'application/json'}
+        )
+        try:
+            urlrequest.urlopen(req, timeout=5).close()
+        except Exception as e:
+            print(f"⚠️  Fake Recall webhook failed: {e}")
+
+    def recording(self, bot_id):
+        """Deterministic dummy recording bytes for a bot"""
+        seed = bot_id.encode()
+        repeats = self.recording_bytes // len(seed) + 1
+        return (seed * repeats)[:self.recording_bytes]
+
+
+class _FakeRecallHandler(BaseHTTPRequestHandler):
+    fake = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, data):
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        if self.path.rstrip('/') != '/api/v1/bot':
+            return self._send_json(404, {'detail': 'Not found'})
+        length = int(self.headers.get('Content-Length') or 0)
+        payload = json.loads(self.rfile.read(length) or b'{}')
+        self._send_json(201, self.fake.create_bot(payload))
+
+    def do_GET(self):
+        match = re.fullmatch(r'/api/v1/bot/([\w-]+)/?', self.path)
+        if match:
+            bot = self.fake.bots.get(match.group(1))
+            if bot is None:
+                return self._send_json(404, {'detail': 'Not found'})
+            return self._send_json(200, bot)
+
+        match = re.fullmatch(r'/recordings/([\w-]+)\.mp4', self.path)
+        if match and match.group(1) in self.fake.bots:
+            return self._send_recording(self.fake.recording(match.group(1)))
+
+        self._send_json(404, {'detail': 'Not found'})
+
+    def _send_recording(self, data):
+        start, end = 0, len(data) - 1
+        range_header = self.headers.get('Range')
+        match = re.fullmatch(r'bytes=(\d+)-(\d*)', range_header or '')
+        if match:
+            start = int(match.group(1))
+            if match.group(2):
+                end = min(int(match.group(2)), end)
+            self.send_response(206)
+            self.send_header('Content-Range', f'bytes {start}-{end}/{len(data)}')
+        else:
+            self.send_response(200)
+
+        self.send_header('Content-Type', 'video/mp4')
+        self.send_header('Accept-Ranges', 'bytes')
+        self.send_header('Content-Length', str(end - start + 1))
+        self.end_headers()
+        self.wfile.write(data[start:end + 1])
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Run a fake Recall.ai API')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=int(os.getenv('FAKE_RECALL_PORT', 8765)))
+    parser.add_argument('--step-seconds', type=float, default=2.0)
+    parser.add_argument('--recording-bytes', type=int, default=1024 * 1024)
+    parser.add_argument('--drop-webhooks', action='store_true',
+                        help='Never send webhooks (exercise the polling fallback)')
+    args = parser.parse_args()
+
+    fake = FakeRecallServer(
+        host=args.host,
+        port=args.port,
+        step_seconds=args.step_seconds,
+        recording_bytes=args.recording_bytes,
+        drop_webhooks=args.drop_webhooks
+    )
+    print(f"🤖 Fake Recall.ai listening on {fake.base_url}/api/v1")
+    fake.httpd.serve_forever()
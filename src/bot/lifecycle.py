@@ -0,0 +1,255 @@
+"""
+Bot Lifecycle Manager
+Supervises many in-flight Recall.ai bots from a single asyncio loop
+
+Status changes arrive as webhooks (POST /api/webhooks/recall). Each bot also
+has a fallback poller whose interval backs off while nothing changes, so a
+missed webhook only delays detection instead of losing it.
+"""
+import asyncio
+import os
+import threading
+import traceback
+from concurrent.futures import Future, ThreadPoolExecutor
+
+# Bot statuses after which Recall.ai won't send further changes
+TERMINAL_STATUSES = ('done', 'fatal')
+
+
+def latest_status_code(status_data):
+    """Pull the most recent status code out of a GET /bot/{id} response"""
+    status_changes = status_data.get('status_changes') or []
+    if not status_changes:
+        return None
+    return status_changes[-1]['code']
+
+
+class _TrackedBot:
+    """Per-bot state owned by the event loop"""
+
+    def __init__(self, bot_id, on_status, on_finished, future):
+        self.bot_id = bot_id
+        self.on_status = on_status
+        self.on_finished = on_finished
+        self.future = future
+        self.status = None
+        self.webhook_seen = False
+        self.changed = asyncio.Event()
+        # Last on_status call; each waits for the one before it
+        self.callbacks = None
+
+
+class BotLifecycleManager:
+    """Track bot status for many concurrent meetings without a thread per bot"""
+
+    def __init__(self, fetch_status, min_poll_interval=5.0, max_poll_interval=120.0,
+                 callback_workers=8, max_poll_failures=None):
+        """
+        Args:
+            fetch_status: Callable(bot_id) returning the Recall.ai bot JSON
+            min_poll_interval: Fallback poll interval right after a change
+            max_poll_interval: Upper bound the poll interval backs off to
+            callback_workers: Threads for status fetches and callbacks
+            max_poll_failures: Consecutive failed status fetches after which
+                supervision gives up and the bot is reported as failed
+        """
+        self.fetch_status = fetch_status
+        self.min_poll_interval = min_poll_interval
+        self.max_poll_interval = max_poll_interval
+        self.max_poll_failures = max_poll_failures or int(os.getenv('BOT_POLL_MAX_FAILURES', 10))
+
+        self._bots = {}
+        self._executor = ThreadPoolExecutor(
+            max_workers=callback_workers,
+            thread_name_prefix='bot-lifecycle'
+        )
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever,
+            name='bot-lifecycle-loop',
+            daemon=True
+        )
+        self._thread.start()
+
+    def track(self, bot_id, on_status=None, on_finished=None):
+        """
+        Start supervising a bot
+
+        Args:
+            bot_id: Recall.ai bot id
+            on_status: Callable(bot_id, code) run on every status change
+            on_finished: Callable(bot_id, status_data, error) run once the
+                bot reaches a terminal status or supervision fails
+
+        Returns:
+            Future resolved with the final bot JSON
+        """
+        future = Future()
+        self._loop.call_soon_threadsafe(
+            self._start_tracking, bot_id, on_status, on_finished, future
+        )
+        return future
+
+    def is_tracking(self, bot_id):
+        """Whether this manager is currently supervising the bot"""
+        return bot_id in self._bots
+
+    def active_count(self):
+        """Number of bots still being supervised"""
+        return len(self._bots)
+
+    def handle_event(self, bot_id, code):
+        """
+        Feed a webhook status change in from any thread
+
+        Returns:
+            True if the bot is tracked by this manager
+        """
+        if bot_id not in self._bots:
+            return False
+        self._loop.call_soon_threadsafe(self._apply_event, bot_id, code)
+        return True
+
+    def shutdown(self):
+        """Stop the event loop and callback threads"""
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+        self._executor.shutdown(wait=False)
+
+    def _start_tracking(self, bot_id, on_status, on_finished, future):
+        if bot_id in self._bots:
+            future.set_exception(ValueError(f"Bot {bot_id} is already tracked"))
+            return
+        bot = _TrackedBot(bot_id, on_status, on_finished, future)
+        self._bots[bot_id] = bot
+        self._loop.create_task(self._supervise(bot))
+
+    def _apply_event(self, bot_id, code):
+        bot = self._bots.get(bot_id)
+        if bot is None:
+            return
+        bot.webhook_seen = True
+        self._record_status(bot, code)
+
+    def _record_status(self, bot, code):
+        """Update bot state; returns True if the status changed"""
+        if code is None or code == bot.status:
+            return False
+        bot.status = code
+        bot.changed.set()
+        if bot.on_status:
+            # In order per bot, so an older status is never persisted last
+            bot.callbacks = self._loop.create_task(
+                self._call_after(bot.callbacks, bot.on_status, bot.bot_id, code)
+            )
+        return True
+
+    async def _call_after(self, previous, callback, *args):
+        if previous is not None:
+            await previous
+        await self._loop.run_in_executor(self._executor, self._safe_call, callback, *args)
+
+    async def _supervise(self, bot):
+        interval = self.min_poll_interval
+        status_data = None
+        error = None
+        failures = 0
+        # Initial poll so we start from the bot's actual state
+        poll_now = True
+
+        try:
+            while bot.status not in TERMINAL_STATUSES:
+                if not poll_now:
+                    bot.changed.clear()
+                    try:
+                        await asyncio.wait_for(bot.changed.wait(), timeout=interval)
+                        # Webhooks are flowing; polling is only a safety net now
+                        interval = self.max_poll_interval
+                        continue
+                    except asyncio.TimeoutError:
+                        pass
+                poll_now = False
+
+                previous = bot.status
+                try:
+                    status_data = await self._poll(bot)
+                except Exception as e:
+                    # The bot is most likely still in the call; keep
+                    # supervising through a provider outage
+                    failures = self._poll_failed(bot, failures, e)
+                    interval = min(interval * 2, self.max_poll_interval)
+                    continue
+                failures = 0
+                if bot.status != previous:
+                    interval = self.min_poll_interval
+                elif not bot.webhook_seen:
+                    interval = min(interval * 2, self.max_poll_interval)
+
+            # Webhooks carry only the code; fetch the full record (video_url etc.)
+            if status_data is None or latest_status_code(status_data) != bot.status:
+                interval = self.min_poll_interval
+                while True:
+                    try:
+                        status_data = await self._fetch(bot.bot_id)
+                        break
+                    except Exception as e:
+                        failures = self._poll_failed(bot, failures, e)
+                        await asyncio.sleep(interval)
+                        interval = min(interval * 2, self.max_poll_interval)
+
+            if bot.status == 'fatal':
+                error = f"Bot {bot.bot_id} ended with fatal status"
+
+        except Exception as e:
+            error = str(e)
+            traceback.print_exc()
+
+        finally:
+            self._bots.pop(bot.bot_id, None)
+
+        if bot.callbacks is not None:
+            await bot.callbacks
+        if bot.on_finished:
+            await self._loop.run_in_executor(
+                self._executor, self._safe_call, bot.on_finished, bot.bot_id, status_data, error
+            )
+
+        if error:
+            bot.future.set_exception(RuntimeError(error))
+        else:
+            bot.future.set_result(status_data)
+
+    def _poll_failed(self, bot, failures, error):
+        """
+        Count a failed status fetch
+
+        Returns:
+            Consecutive failures so far
+
+        Raises:
+            RuntimeError: Once max_poll_failures fetches in a row have failed
+        """
+        failures += 1
+        if failures >= self.max_poll_failures:
+            raise RuntimeError(
+                f"Bot {bot.bot_id} status unavailable after {failures} failed requests: {error}"
+            )
+        print(f"⚠️  Status of bot {bot.bot_id} unavailable ({failures}/{self.max_poll_failures}): {error}")
+        return failures
+
+    async def _fetch(self, bot_id):
+        return await self._loop.run_in_executor(self._executor, self.fetch_status, bot_id)
+
+    async def _poll(self, bot):
+        status_data = await self._fetch(bot.bot_id)
+        code = latest_status_code(status_data)
+        if self._record_status(bot, code):
+            print(f"📊 Bot {bot.bot_id} status: {code}")
+        return status_data
+
+    @staticmethod
+    def _safe_call(callback, *args):
+        try:
+            callback(*args)
+        except Exception:
+            traceback.print_exc()
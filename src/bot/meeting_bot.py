@@ -6,10 +6,12 @@ Note: This uses Recall.ai API which is the easiest way to create Zoom bots.
 Alternative: Use Zoom Meeting SDK directly (more complex)
 """
 import os
-import requests
-import time
 from dotenv import load_dotenv
 
+from src.bot.lifecycle import BotLifecycleManager
+from src.bot.recording import RecordingDownloader
+from src.providers.client import get_client
+
 load_dotenv()
 
 
@@ -18,18 +20,30 @@ class MeetingBot:
 
     def __init__(self):
         self.recall_api_key = os.getenv('RECALL_API_KEY')
-        self.api_base = 'https://api.recall.ai/api/v1'
+        self.api_base = os.getenv('RECALL_API_BASE', 'https://api.recall.ai/api/v1')
+        self.webhook_url = os.getenv('RECALL_WEBHOOK_URL')
+        self.transcript_webhook_url = os.getenv('RECALL_TRANSCRIPT_WEBHOOK_URL')
+        self.http = get_client()
+        self.downloader = RecordingDownloader(self.http)
+
+    def _headers(self):
+        return {
+            'Authorization': f'Token {self.recall_api_key}',
+            'Content-Type': 'application/json'
+        }
 
-    def join_and_record(self, zoom_link, rep_name='Representative'):
+    def create_bot(self, zoom_link, rep_name='Representative', join_at=None):
         """
-        Join a Zoom meeting and record it
+        Send a bot into a Zoom meeting
 
         Args:
             zoom_link: The Zoom meeting URL
             rep_name: Name of the representative (for bot intro)
+            join_at: Optional future UTC datetime for the bot to join at;
+                None joins immediately
 
         Returns:
-            Path to the recorded audio file
+            Recall.ai bot id
         """
         if not self.recall_api_key:
             raise Exception("RECALL_API_KEY not set. Please add it to your .env file.")
@@ -38,17 +52,15 @@ class MeetingBot:
         bot_name = f"DelegateAI ({rep_name})"
         intro_message = f"Hi everyone! I'm DelegateAI, representing {rep_name}. I'm here to listen and take notes on their behalf."
 
-        headers = {
-            'Authorization': f'Token {self.recall_api_key}',
-            'Content-Type': 'application/json'
-        }
-
         payload = {
             'meeting_url': zoom_link,
             'bot_name': bot_name,
-            'join_at': None,  # Join immediately
+            'join_at': join_at.strftime('%Y-%m-%dT%H:%M:%SZ') if join_at else None,
             'real_time_transcription': {
-                'destination_url': None  # We'll download later
+                # Live mode: final utterances are posted to /api/webhooks/recall/transcript
+                # as they are spoken. Without it the recording is transcribed afterwards.
+                'destination_url': self.transcript_webhook_url or None,
+                'partial_results': False
             },
             'automatic_leave': {
                 'waiting_room_timeout': 600,  # Leave after 10 min in waiting room
@@ -59,72 +71,77 @@ class MeetingBot:
                 'provider': 'deepgram'
             }
         }
+        if self.webhook_url:
+            # Status changes are pushed to the lifecycle manager
+            payload['webhook_url'] = self.webhook_url
 
-        # Create bot
-        response = requests.post(
+        # Not retried: a timed-out or 5xx create may still have made a bot,
+        # and a retry would send a second one into the meeting
+        response = self.http.post_once(
             f'{self.api_base}/bot',
-            headers=headers,
+            headers=self._headers(),
             json=payload
         )
 
         if response.status_code != 201:
             raise Exception(f"Failed to create bot: {response.text}")
 
-        bot_data = response.json()
-        bot_id = bot_data['id']
+        bot_id = response.json()['id']
 
         print(f"✅ Bot created: {bot_id}")
         print(f"⏳ Bot is joining the meeting...")
+        return bot_id
 
-        # Poll for bot status
-        while True:
-            status_response = requests.get(
-                f'{self.api_base}/bot/{bot_id}',
-                headers=headers
-            )
-
-            if status_response.status_code != 200:
-                raise Exception(f"Failed to get bot status: {status_response.text}")
+    def join_and_record(self, zoom_link, rep_name='Representative', lifecycle=None):
+        """
+        Join a Zoom meeting and block until the recording is downloaded
 
-            status_data = status_response.json()
-            status = status_data['status_changes'][-1]['code']
+        The pipeline uses create_bot() and a shared BotLifecycleManager
+        instead, so no thread waits on a live meeting.
 
-            print(f"📊 Bot status: {status}")
+        Args:
+            zoom_link: The Zoom meeting URL
+            rep_name: Name of the representative (for bot intro)
+            lifecycle: Optional BotLifecycleManager to supervise the bot
 
-            if status == 'in_call_not_recording':
-                print("🎥 Bot joined! Starting recording...")
+        Returns:
+            Path to the recorded audio file
+        """
+        bot_id = self.create_bot(zoom_link, rep_name=rep_name)
 
-            elif status == 'in_call_recording':
-                print("⏺️  Bot is recording the meeting...")
-                # In production, you'd wait for the meeting to end
-                # For demo, we'll just note that it's recording
-                break
+        owns_lifecycle = lifecycle is None
+        if owns_lifecycle:
+            lifecycle = BotLifecycleManager(fetch_status=self.get_bot_status)
 
-            elif status in ['fatal', 'done']:
-                print("✅ Recording complete!")
-                break
+        try:
+            status_data = lifecycle.track(bot_id).result()
+        finally:
+            if owns_lifecycle:
+                lifecycle.shutdown()
 
-            time.sleep(5)  # Check every 5 seconds
+        print("✅ Recording complete!")
 
-        # Download the recording
-        # Note: This is available after the meeting ends
         video_url = status_data.get('video_url')
-        if video_url:
-            audio_file = self._download_recording(video_url, bot_id)
-            return audio_file
-        else:
-            # Meeting is still ongoing
-            return f"recordings/bot_{bot_id}_pending.mp4"
-
-    def _download_recording(self, video_url, bot_id):
-        """Download the recording from Recall.ai"""
+        if not video_url:
+            raise Exception(f"Bot {bot_id} finished without a recording")
+        return self.download_recording(video_url, bot_id)
+
+    def download_recording(self, video_url, bot_id, tee=None):
+        """
+        Download the recording from Recall.ai
+
+        Args:
+            video_url: Recording URL from the bot status
+            bot_id: Recall.ai bot id
+            tee: Optional ChunkPipe to stream the bytes into as they arrive
+
+        Returns:
+            Path to the downloaded file
+        """
         os.makedirs('recordings', exist_ok=True)
         audio_file = f'recordings/bot_{bot_id}.mp4'
 
-        response = requests.get(video_url, stream=True)
-        with open(audio_file, 'wb') as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                f.write(chunk)
+        self.downloader.download(video_url, audio_file, tee=tee)
 
         print(f"💾 Recording saved: {audio_file}")
         return audio_file
@@ -138,7 +155,7 @@ class MeetingBot:
             'Authorization': f'Token {self.recall_api_key}'
         }
 
-        response = requests.get(
+        response = self.http.get(
             f'{self.api_base}/bot/{bot_id}',
             headers=headers
         )
@@ -0,0 +1,150 @@
+"""
+Recording Download
+Streams bot recordings to disk in large chunks, resuming with HTTP Range
+
+The byte stream can also be teed into a ChunkPipe that a transcription
+request reads from, so the upload to the ASR provider overlaps with the
+download instead of waiting for the file to land on disk first.
+"""
+import io
+import os
+import queue
+
+import requests
+
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+
+
+class ChunkPipe(io.RawIOBase):
+    """
+    Bounded in-memory pipe: one thread writes chunks, another reads them
+
+    Readers see the bytes as a normal blocking file object, so it can be
+    passed anywhere an upload body is accepted.
+    """
+
+    def __init__(self, max_chunks=16):
+        super().__init__()
+        self._chunks = queue.Queue(maxsize=max_chunks)
+        self._buffer = b''
+        self._eof = False
+        self._error = None
+
+    def readable(self):
+        return True
+
+    def write_chunk(self, chunk):
+        """Producer side: append bytes (blocks while the reader is behind)"""
+        self._chunks.put(bytes(chunk))
+
+    def finish(self, error=None):
+        """Producer side: signal end of stream, optionally with a failure"""
+        self._error = error
+        self._chunks.put(None)
+
+    def readinto(self, b):
+        while not self._buffer and not self._eof:
+            chunk = self._chunks.get()
+            if chunk is None:
+                self._eof = True
+            else:
+                self._buffer = chunk
+
+        if self._eof and not self._buffer:
+            if self._error is not None:
+                raise IOError(f"Recording download failed: {self._error}")
+            return 0
+
+        n = min(len(b), len(self._buffer))
+        b[:n] = self._buffer[:n]
+        self._buffer = self._buffer[n:]
+        return n
+
+
+class RecordingDownloader:
+    """Resumable, large-chunk downloader for recordings"""
+
+    def __init__(self, http, chunk_size=None, max_resumes=5):
+        """
+        Args:
+            http: ProviderClient used for the requests
+            chunk_size: Bytes per read/write (default RECORDING_CHUNK_SIZE or 1 MiB)
+            max_resumes: How many interrupted transfers to resume before giving up
+        """
+        self.http = http
+        self.chunk_size = chunk_size or int(os.getenv('RECORDING_CHUNK_SIZE', DEFAULT_CHUNK_SIZE))
+        self.max_resumes = max_resumes
+
+    def download(self, url, path, tee=None):
+        """
+        Download url to path, resuming from a leftover `<path>.part` file
+
+        Args:
+            url: Recording URL
+            path: Destination file path
+            tee: Optional ChunkPipe that receives every byte in order
+
+        Returns:
+            The destination path
+        """
+        part_path = f'{path}.part'
+        offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+        teed = 0
+        resumes = 0
+
+        try:
+            if tee is not None and offset:
+                # Bytes from an earlier attempt still have to reach the reader
+                teed = self._replay(part_path, tee)
+
+            while True:
+                headers = {'Range': f'bytes={offset}-'} if offset else {}
+                response = self.http.get(url, stream=True, headers=headers, timeout=(10, 300))
+
+                if offset and response.status_code == 416:
+                    # Range starts at the end: the part file is already complete
+                    response.close()
+                    break
+                response.raise_for_status()
+                if offset and response.status_code != 206:
+                    # Server ignored the Range header; start over
+                    offset = 0
+
+                try:
+                    with open(part_path, 'ab' if offset else 'wb', buffering=self.chunk_size) as f:
+                        for chunk in response.iter_content(chunk_size=self.chunk_size):
+                            f.write(chunk)
+                            if tee is not None and offset + len(chunk) > teed:
+                                tee.write_chunk(chunk[max(0, teed - offset):])
+                                teed = offset + len(chunk)
+                            offset += len(chunk)
+                    break
+                except (requests.ConnectionError, requests.exceptions.ChunkedEncodingError) as e:
+                    resumes += 1
+                    if resumes > self.max_resumes:
+                        raise
+                    offset = os.path.getsize(part_path)
+                    print(f"⚠️  Download interrupted ({e}); resuming at byte {offset}")
+                finally:
+                    response.close()
+
+            os.replace(part_path, path)
+
+        except Exception as e:
+            if tee is not None:
+                tee.finish(error=e)
+            raise
+
+        if tee is not None:
+            tee.finish()
+        return path
+
+    def _replay(self, part_path, tee):
+        sent = 0
+        with open(part_path, 'rb') as f:
+            while True:
+                chunk = f.read(self.chunk_size)
+                if not chunk:
+                    return sent
+                tee.write_chunk(chunk)
+                sent += len(chunk)
@@ -0,0 +1,28 @@
+"""
+Celery Worker Entry Point
+Used when JOB_QUEUE_BACKEND=celery
+
+Run one worker per stage so each gets its own concurrency limit:
+
+    celery -A src.jobs.celery_app worker -Q delegate_ai.record -c 8
+    celery -A src.jobs.celery_app worker -Q delegate_ai.preprocess -c 2
+    celery -A src.jobs.celery_app worker -Q delegate_ai.transcribe -c 4
+    celery -A src.jobs.celery_app worker -Q delegate_ai.analyze -c 4
+"""
+import os
+
+# Bots are dispatched by the scheduler in the API process
+os.environ['SCHEDULER_ENABLED'] = 'false'
+
+from src.api.app import job_queue, pipeline
+
+if not hasattr(job_queue, 'celery'):
+    raise RuntimeError("Set JOB_QUEUE_BACKEND=celery to run Celery workers")
+
+celery = job_queue.celery
+
+
+@celery.task(name='delegate_ai.run_stage')
+def run_stage(stage, meeting_id, payload):
+    """Run one pipeline stage for a meeting"""
+    pipeline.run_stage(stage, meeting_id, payload)
@@ -0,0 +1,790 @@
+"""
+Meeting Processing Pipeline
+Runs record → preprocess → transcribe → analyze as separate queued stages
+
+Each stage has its own worker pool and concurrency limit so a backlog of
+long recordings can't starve analysis (or the other way round). Workers
+drive the Meeting.status transitions; the API only enqueues.
+
+The record stage only sends the bot in. The BotLifecycleManager watches it
+from then on and queues transcription once the recording is available, so
+no worker thread is held for the length of a meeting.
+
+The preprocess stage (PREPROCESS_AUDIO) downloads the recording and shrinks
+it to compressed mono speech (src/analysis/preprocess.py) before it is
+uploaded for transcription. With it off, the download streams straight to
+Deepgram instead (STREAM_TRANSCRIPTION).
+
+Bots are sent through the BotScheduler (src/jobs/scheduler.py). It holds
+meetings with a future join_at, and meetings submitted while every bot slot
+is taken, until they can be dispatched within the capacity limits.
+"""
+import json
+import os
+import threading
+import traceback
+from datetime import datetime
+
+from src.analysis.aggregation import get_issue_aggregator
+from src.analysis.live import LiveAnalyzer, has_live_segments
+from src.analysis.preprocess import AudioPreprocessor
+from src.analysis.structured import StructuredTranscript
+from src.api.database import db, Meeting
+from src.api.events import get_event_bus
+from src.bot.lifecycle import TERMINAL_STATUSES
+from src.bot.recording import ChunkPipe
+from src.jobs.scheduler import BotScheduler, hold_scheduler_lock, to_timestamp
+from src.search.index import get_search_index
+
+STAGES = ('record', 'preprocess', 'transcribe', 'analyze')
+
+# Statuses during which a meeting's bot holds a scheduler slot
+BOT_ACTIVE_STATUSES = ('queued', 'recording')
+
+# Meeting.bot_status from just before the create-bot request until its bot
+# id is committed. A record stage that finds it left over can't tell
+# whether Recall.ai made the bot, so it doesn't send another one.
+BOT_REQUESTED = 'requested'
+
+# Meeting.status while each stage is running
+STAGE_STATUS = {
+    'record': 'recording',
+    'preprocess': 'preprocessing',
+    'transcribe': 'transcribing',
+    'analyze': 'analyzing',
+}
+
+# Statuses of a meeting that is waiting for or going through the stages
+PROCESSING_STATUSES = ('scheduled', 'queued') + tuple(STAGE_STATUS.values())
+
+# Read size used to drain a recording stream nobody is consuming any more
+DRAIN_CHUNK_SIZE = 1024 * 1024
+
+DEFAULT_CONCURRENCY = {
+    'record': 8,
+    'preprocess': 2,
+    'transcribe': 4,
+    'analyze': 4,
+}
+
+
+def search_index():
+    """Search backend for the app's database, or None if search is off or unsupported"""
+    if os.getenv('SEARCH_ENABLED', 'true').lower() != 'true':
+        return None
+    return get_search_index(db.engine)
+
+
+def save_transcript(meeting, transcript):
+    """
+    Store transcript text, plus its segments if it is a StructuredTranscript,
+    and re-index it for search (no commit)
+    """
+    if isinstance(transcript, StructuredTranscript):
+        meeting.segments = transcript
+        meeting.transcript = transcript.to_text()
+    else:
+        meeting.transcript = transcript
+        transcript = StructuredTranscript.from_text(transcript)
+
+    index = search_index()
+    if index is not None:
+        index.index_transcript(db.session, meeting.id, transcript)
+
+
+def save_analysis(meeting, analysis):
+    """Store a finished analysis, its Issue rows and its search rows (no commit)"""
+    meeting.analysis = analysis.to_json()
+    save_issues(meeting, analysis.issues)
+
+    index = search_index()
+    if index is not None:
+        index.index_analysis(db.session, meeting.id, analysis)
+
+
+def save_issues(meeting, issues):
+    """
+    Replace the meeting's Issue rows with those from an analysis, clustering
+    them across meetings and updating the weekly rollups (no commit)
+    """
+    get_issue_aggregator().replace(db.session, meeting, issues)
+
+
+class MeetingPipeline:
+    """Staged job pipeline for processing meetings"""
+
+    def __init__(self, app, queue, meeting_bot, transcriber, analyzer, lifecycle,
+                 concurrency=None):
+        self.app = app
+        self.queue = queue
+        self.meeting_bot = meeting_bot
+        self.lifecycle = lifecycle
+        self.transcriber = transcriber
+        self.analyzer = analyzer
+
+        self.concurrency = dict(DEFAULT_CONCURRENCY)
+        for stage in STAGES:
+            env_value = os.getenv(f'PIPELINE_{stage.upper()}_WORKERS')
+            if env_value:
+                self.concurrency[stage] = int(env_value)
+        self.concurrency.update(concurrency or {})
+
+        # Upload compressed mono speech instead of the video recording;
+        # the stage's workers each wait on one process of the pool
+        self.preprocess_audio = os.getenv('PREPROCESS_AUDIO', 'true').lower() == 'true'
+        self.preprocessor = AudioPreprocessor(workers=self.concurrency['preprocess'])
+
+        # Overlap the recording download with the upload to the ASR provider
+        self.stream_transcription = os.getenv('STREAM_TRANSCRIPTION', 'true').lower() == 'true'
+
+        # Keep timestamps and speakers (Meeting.segments) alongside the text
+        self.structured_transcripts = os.getenv('STRUCTURED_TRANSCRIPTS', 'true').lower() == 'true'
+
+        # Checkpoint analysis sections to Meeting.analysis as they stream in
+        self.stream_analysis = os.getenv('STREAM_ANALYSIS', 'true').lower() == 'true'
+
+        # Rolling analysis of transcripts streamed in during the call
+        self.live = LiveAnalyzer(app, analyzer)
+
+        # Just-in-time bot dispatch within the global and per-rep bot limits
+        self.scheduler = BotScheduler(
+            dispatch=self._dispatch_scheduled,
+            on_expired=self._expire_scheduled,
+            reconcile=self._active_bots,
+            pending=self._scheduled_meetings
+        )
+        self.scheduler_enabled = os.getenv('SCHEDULER_ENABLED', 'true').lower() == 'true'
+        # Set when another process holds the scheduler lock; meetings are
+        # then left 'scheduled' for that process to dispatch
+        self.scheduler_elsewhere = False
+        self._scheduler_lock = None
+
+        self._handlers = {
+            'record': self._record,
+            'preprocess': self._preprocess,
+            'transcribe': self._transcribe,
+            'analyze': self._analyze,
+        }
+        self._pools = []
+
+    def submit(self, meeting_id):
+        """
+        Queue a meeting for processing
+
+        Returns:
+            Job id of the first stage to run, or None if the meeting needs a
+            bot and is waiting for a free slot (status 'scheduled')
+        """
+        meeting = db.session.get(Meeting, meeting_id)
+        if meeting is None:
+            raise LookupError(f"Meeting {meeting_id} not found")
+        if meeting.bot_status == BOT_REQUESTED:
+            # Asked for explicitly after a worker died mid-request; a bot
+            # from that request may still exist
+            meeting.bot_status = None
+        # A retry after a failure picks up where the last run got to
+        if meeting.transcript_size or meeting.transcript_inline:
+            self._set_status(meeting_id, 'queued')
+            return self.queue.enqueue('analyze', meeting_id)
+        if has_live_segments(meeting_id):
+            self._set_status(meeting_id, 'queued')
+            return self.queue.enqueue('analyze', meeting_id, {'live': True})
+        if self.scheduler_elsewhere or not self.scheduler.acquire(meeting_id, meeting.rep_name):
+            self.schedule(meeting_id, datetime.utcnow())
+            return None
+        return self._enqueue_record(meeting_id)
+
+    def schedule(self, meeting_id, join_at):
+        """
+        Hold a meeting until its bot should be sent (commits)
+
+        Args:
+            meeting_id: Meeting id
+            join_at: When the bot should be in the call (naive UTC)
+
+        Returns:
+            When the bot is due to be dispatched (naive UTC)
+        """
+        meeting = db.session.get(Meeting, meeting_id)
+        if meeting is None:
+            raise LookupError(f"Meeting {meeting_id} not found")
+        meeting.join_at = join_at
+        meeting.status = 'scheduled'
+        db.session.commit()
+        self._publish_status(meeting)
+        if self.scheduler_elsewhere:
+            dispatch_at = self.scheduler.dispatch_time(meeting_id, to_timestamp(join_at))
+        else:
+            dispatch_at = self.scheduler.schedule(meeting_id, meeting.rep_name, to_timestamp(join_at))
+        return datetime.utcfromtimestamp(dispatch_at)
+
+    def _enqueue_record(self, meeting_id):
+        self._set_status(meeting_id, 'queued')
+        try:
+            return self.queue.enqueue('record', meeting_id)
+        except Exception:
+            self.scheduler.release(meeting_id)
+            raise
+
+    def _dispatch_scheduled(self, meeting_id):
+        """Scheduler callback: the meeting's bot slot is taken, queue the record stage"""
+        with self.app.app_context():
+            try:
+                # Claimed in one conditional UPDATE, so a meeting is sent once
+                # even if it was cancelled or submitted some other way meanwhile
+                claimed = Meeting.query.filter_by(id=meeting_id, status='scheduled').update(
+                    {Meeting.status: 'queued'}, synchronize_session=False
+                )
+                db.session.commit()
+                if not claimed:
+                    self.scheduler.release(meeting_id)
+                    return
+                self._publish_status(db.session.get(Meeting, meeting_id))
+                try:
+                    self.queue.enqueue('record', meeting_id)
+                except Exception:
+                    # Back to 'scheduled'; the next reconcile pass retries it
+                    Meeting.query.filter_by(id=meeting_id, status='queued').update(
+                        {Meeting.status: 'scheduled'}, synchronize_session=False
+                    )
+                    db.session.commit()
+                    raise
+            finally:
+                db.session.remove()
+
+    def _expire_scheduled(self, meeting_id):
+        """Scheduler callback: no slot freed up in time for the meeting"""
+        with self.app.app_context():
+            meeting = db.session.get(Meeting, meeting_id)
+            if meeting and meeting.status == 'scheduled':
+                meeting.status = 'failed'
+                meeting.error_message = (
+                    f"No bot capacity within {self.scheduler.max_delay // 60} minutes of the start time"
+                )
+                db.session.commit()
+                self._publish_status(meeting)
+            db.session.remove()
+
+    def _active_bots(self, meeting_ids):
+        """Scheduler callback: which of these meetings still have a bot in the call"""
+        with self.app.app_context():
+            rows = db.session.query(Meeting.id).filter(
+                Meeting.id.in_(meeting_ids),
+                Meeting.status.in_(BOT_ACTIVE_STATUSES)
+            ).all()
+            db.session.remove()
+        return [row[0] for row in rows]
+
+    def _scheduled_meetings(self):
+        """Scheduler callback: meetings waiting for a bot, as (id, rep, join_at epoch)"""
+        with self.app.app_context():
+            rows = db.session.query(Meeting.id, Meeting.rep_name, Meeting.join_at).filter(
+                Meeting.status == 'scheduled'
+            ).all()
+            db.session.remove()
+        return [
+            (meeting_id, rep_name, to_timestamp(join_at or datetime.utcnow()))
+            for meeting_id, rep_name, join_at in rows
+        ]
+
+    def resume_schedule(self):
+        """Reload scheduled meetings and count bots in flight (after a restart)"""
+        with self.app.app_context():
+            active = db.session.query(Meeting.id, Meeting.rep_name).filter(
+                Meeting.status.in_(BOT_ACTIVE_STATUSES)
+            ).all()
+            db.session.remove()
+        for meeting_id, rep_name in active:
+            self.scheduler.mark_active(meeting_id, rep_name)
+        for meeting_id, rep_name, join_at in self._scheduled_meetings():
+            self.scheduler.schedule(meeting_id, rep_name, join_at)
+
+    def finish_live(self, meeting_id):
+        """
+        Queue the final analysis of a meeting transcribed live
+
+        Claimed in one conditional UPDATE, like _finish_recording: a repeated
+        final post, or one racing the bot-finished path, queues nothing.
+        Meetings with a bot in the call finish through the bot instead.
+
+        Returns:
+            Job id, or None if the meeting is finished or already processing
+        """
+        claimed = Meeting.query.filter(
+            Meeting.id == meeting_id,
+            db.or_(Meeting.status.is_(None), Meeting.status.notin_(('completed', 'failed') + PROCESSING_STATUSES))
+        ).update({Meeting.status: 'queued'}, synchronize_session=False)
+        db.session.commit()
+        if not claimed:
+            return None
+        self._publish_status(db.session.get(Meeting, meeting_id))
+        try:
+            return self.queue.enqueue('analyze', meeting_id, {'live': True})
+        except Exception:
+            # Released so the streamer's retried final post can claim it again
+            Meeting.query.filter_by(id=meeting_id, status='queued').update(
+                {Meeting.status: 'pending'}, synchronize_session=False
+            )
+            db.session.commit()
+            raise
+
+    def start(self):
+        """Start the bot scheduler, and in-process worker pools (SQLite queue backend only)"""
+        if self.scheduler_enabled and not self.scheduler.running:
+            # The bot caps are counted in memory: one scheduler process only
+            with self.app.app_context():
+                self._scheduler_lock = hold_scheduler_lock(db.engine)
+            self.scheduler_elsewhere = self._scheduler_lock is None
+            if self.scheduler_elsewhere:
+                print("📅 Bot scheduler is running in another process")
+            else:
+                self.resume_schedule()
+                self.scheduler.start()
+        if not self.queue.runs_in_process or self._pools:
+            return
+        self.queue.requeue_expired()
+        self.resume_bots()
+        for stage in STAGES:
+            pool = StageWorkerPool(self, stage, self.concurrency[stage])
+            pool.start()
+            self._pools.append(pool)
+
+    def stop(self):
+        """Signal the scheduler and worker pools to exit once their current jobs finish"""
+        self.scheduler.stop()
+        if self._scheduler_lock not in (None, True):
+            self._scheduler_lock.close()
+        self._scheduler_lock = None
+        for pool in self._pools:
+            pool.stop()
+        self._pools = []
+        self.preprocessor.shutdown()
+
+    def run_stage(self, stage, meeting_id, payload):
+        """
+        Execute one stage for a meeting inside an app context
+
+        Failures mark the meeting as failed and are re-raised so the queue
+        backend can record them.
+        """
+        with self.app.app_context():
+            try:
+                self._set_status(meeting_id, STAGE_STATUS[stage])
+                self._handlers[stage](meeting_id, payload)
+            except Exception as e:
+                db.session.rollback()
+                if stage == 'record':
+                    self.scheduler.release(meeting_id)
+                meeting = db.session.get(Meeting, meeting_id)
+                if meeting:
+                    meeting.status = 'failed'
+                    meeting.error_message = str(e)
+                    db.session.commit()
+                    self._publish_status(meeting)
+                raise
+            finally:
+                db.session.remove()
+
+    def _set_status(self, meeting_id, status):
+        meeting = db.session.get(Meeting, meeting_id)
+        if meeting is None:
+            raise LookupError(f"Meeting {meeting_id} not found")
+        meeting.status = status
+        db.session.commit()
+        self._publish_status(meeting)
+
+    def _publish_status(self, meeting):
+        data = {'status': meeting.status}
+        if meeting.status == 'failed':
+            data['error_message'] = meeting.error_message
+        get_event_bus().publish(meeting.id, 'status', data)
+
+    def resume_bots(self):
+        """Re-attach lifecycle tracking to bots left in flight by a restart"""
+        with self.app.app_context():
+            meetings = Meeting.query.filter(
+                Meeting.status == 'recording',
+                Meeting.bot_id.isnot(None)
+            ).all()
+            for meeting in meetings:
+                self._track_bot(meeting.id, meeting.bot_id)
+            db.session.remove()
+
+    def handle_bot_event(self, bot_id, code):
+        """
+        Apply a Recall.ai status webhook
+
+        Bots tracked in this process are handed to the lifecycle manager.
+        Otherwise (e.g. the record stage ran in a Celery worker) the status
+        is persisted here and a terminal status advances the pipeline.
+
+        Returns:
+            False if no meeting is associated with the bot
+        """
+        if self.lifecycle.handle_event(bot_id, code):
+            return True
+
+        with self.app.app_context():
+            meeting = Meeting.query.filter_by(bot_id=bot_id).first()
+            meeting_id = meeting.id if meeting else None
+            db.session.remove()
+
+        if meeting_id is None:
+            return False
+
+        self._on_bot_status(meeting_id, bot_id, code)
+        if code in TERMINAL_STATUSES:
+            status_data = self.meeting_bot.get_bot_status(bot_id)
+            error = f"Bot {bot_id} ended with fatal status" if code == 'fatal' else None
+            self._on_bot_finished(meeting_id, bot_id, status_data, error)
+        return True
+
+    def _track_bot(self, meeting_id, bot_id):
+        self.lifecycle.track(
+            bot_id,
+            on_status=lambda bot_id, code: self._on_bot_status(meeting_id, bot_id, code),
+            on_finished=lambda bot_id, status_data, error: self._on_bot_finished(
+                meeting_id, bot_id, status_data, error
+            )
+        )
+
+    def _on_bot_status(self, meeting_id, bot_id, code):
+        """Persist a bot status change to the meeting row"""
+        with self.app.app_context():
+            # A late, retried webhook must not overwrite the bot's final status
+            changed = Meeting.query.filter(
+                Meeting.id == meeting_id,
+                db.or_(Meeting.bot_status.is_(None), Meeting.bot_status.notin_(TERMINAL_STATUSES + (code,)))
+            ).update({Meeting.bot_status: code}, synchronize_session=False)
+            db.session.commit()
+            db.session.remove()
+        if changed:
+            get_event_bus().publish(meeting_id, 'bot_status', {'code': code})
+
+    def _finish_recording(self, meeting_id, status, error=None):
+        """
+        Move a meeting out of 'recording' in one conditional UPDATE
+
+        The lifecycle manager, a Celery worker's poller and duplicate
+        terminal webhooks can all report the same finished bot; only the
+        first caller gets True and advances the pipeline.
+        """
+        values = {Meeting.status: status}
+        if error:
+            values[Meeting.error_message] = error
+        with self.app.app_context():
+            claimed = Meeting.query.filter_by(id=meeting_id, status='recording').update(
+                values, synchronize_session=False
+            )
+            db.session.commit()
+            if claimed:
+                self._publish_status(db.session.get(Meeting, meeting_id))
+            db.session.remove()
+        return bool(claimed)
+
+    def _on_bot_finished(self, meeting_id, bot_id, status_data, error):
+        """
+        Queue transcription once the recording exists, or fail the meeting
+
+        Meetings transcribed live skip the download and transcription and go
+        straight to the final analysis.
+        """
+        self.scheduler.release(meeting_id)
+        with self.app.app_context():
+            live = has_live_segments(meeting_id)
+            db.session.remove()
+        if live and not error:
+            if self._finish_recording(meeting_id, 'queued'):
+                self.queue.enqueue('analyze', meeting_id, {'live': True})
+            return
+
+        video_url = (status_data or {}).get('video_url')
+        if not error and not video_url:
+            error = f"Bot {bot_id} finished without a recording"
+
+        if error:
+            self._finish_recording(meeting_id, 'failed', error)
+            return
+
+        if self._finish_recording(meeting_id, 'queued'):
+            stage = 'preprocess' if self.preprocess_audio else 'transcribe'
+            self.queue.enqueue(stage, meeting_id, {'video_url': video_url, 'bot_id': bot_id})
+
+    def _record(self, meeting_id, payload):
+        """
+        Send the bot in; the lifecycle manager takes over from here
+
+        Idempotent: the job is re-run if its worker dies (an expired lease,
+        or Celery's acks_late), and a meeting gets at most one bot per run.
+        """
+        meeting = db.session.get(Meeting, meeting_id)
+
+        if meeting.bot_status == BOT_REQUESTED:
+            # An earlier run died during the create-bot request
+            raise Exception(
+                "The bot may already have been sent before the worker stopped; "
+                "not sending another. Process the meeting again to send a new bot."
+            )
+        if meeting.bot_id and meeting.bot_status not in TERMINAL_STATUSES:
+            # An earlier run created the bot; supervise it instead
+            print(f"Bot {meeting.bot_id} already sent; resuming tracking")
+            if not self.lifecycle.is_tracking(meeting.bot_id):
+                self._track_bot(meeting_id, meeting.bot_id)
+            return
+
+        # Dispatched ahead of the start time: Recall.ai holds the bot until join_at
+        join_at = meeting.join_at if meeting.join_at and meeting.join_at > datetime.utcnow() else None
+
+        # Committed before the request, so a re-run knows it was attempted
+        meeting.bot_id = None
+        meeting.bot_status = BOT_REQUESTED
+        db.session.commit()
+
+        print(f"Joining meeting: {meeting.zoom_link}")
+        try:
+            bot_id = self.meeting_bot.create_bot(
+                meeting.zoom_link,
+                rep_name=meeting.rep_name,
+                join_at=join_at
+            )
+        except Exception:
+            # The meeting fails with this error; processing it again may
+            # send a new bot
+            db.session.rollback()
+            meeting.bot_status = None
+            db.session.commit()
+            raise
+
+        meeting.bot_id = bot_id
+        meeting.bot_status = None
+        db.session.commit()
+        self._track_bot(meeting_id, bot_id)
+
+    def _preprocess(self, meeting_id, payload):
+        """Download the recording and reduce it to compressed mono speech"""
+        meeting = db.session.get(Meeting, meeting_id)
+
+        events = get_event_bus()
+        if payload.get('video_url'):
+            events.publish(meeting_id, 'transcription', {'state': 'downloading'})
+            meeting.audio_file_path = self.meeting_bot.download_recording(
+                payload['video_url'],
+                payload['bot_id']
+            )
+            db.session.commit()
+
+        events.publish(meeting_id, 'transcription', {'state': 'preprocessing'})
+        report = self.preprocessor.process(meeting.audio_file_path)
+        meeting.audio_file_path = report['path']
+        meeting.duration_seconds = int(round(report['source_duration']))
+        db.session.commit()
+
+        events.publish(meeting_id, 'transcription', {
+            'state': 'preprocessed',
+            'input_bytes': report['input_bytes'],
+            'output_bytes': report['output_bytes'],
+            'bytes_saved': report['bytes_saved'],
+            'upload_seconds_saved': report['upload_seconds_saved'],
+            'trimmed_seconds': report['trimmed_start'] + report['trimmed_end'],
+        })
+        # Transcript times are shifted back by the silence trimmed from the start
+        self.queue.enqueue('transcribe', meeting_id, {'offset': report['trimmed_start']})
+
+    def _transcribe(self, meeting_id, payload):
+        """Download the recording (unless pre-processed) and transcribe it"""
+        meeting = db.session.get(Meeting, meeting_id)
+
+        events = get_event_bus()
+
+        if payload.get('video_url') and self.stream_transcription and self.transcriber.can_stream:
+            events.publish(meeting_id, 'transcription', {'state': 'transcribing', 'streaming': True})
+            audio_file, transcript = self._download_and_transcribe(
+                payload['video_url'],
+                payload['bot_id']
+            )
+            meeting.audio_file_path = audio_file
+            save_transcript(meeting, transcript)
+            db.session.commit()
+            self._publish_transcribed(meeting_id, transcript)
+            self.queue.enqueue('analyze', meeting_id)
+            return
+
+        if payload.get('video_url'):
+            events.publish(meeting_id, 'transcription', {'state': 'downloading'})
+            meeting.audio_file_path = self.meeting_bot.download_recording(
+                payload['video_url'],
+                payload['bot_id']
+            )
+            db.session.commit()
+
+        audio_file = meeting.audio_file_path
+        print(f"Transcribing audio: {audio_file}")
+        events.publish(meeting_id, 'transcription', {'state': 'transcribing', 'streaming': False})
+        if self.structured_transcripts:
+            transcript = self.transcriber.transcribe_structured(audio_file)
+            transcript.shift(payload.get('offset') or 0.0)
+        else:
+            transcript = self.transcriber.transcribe(audio_file)
+        save_transcript(meeting, transcript)
+        db.session.commit()
+        self._publish_transcribed(meeting_id, transcript)
+        self.queue.enqueue('analyze', meeting_id)
+
+    @staticmethod
+    def _publish_transcribed(meeting_id, transcript):
+        if isinstance(transcript, StructuredTranscript):
+            data = {'segments': len(transcript), 'duration': transcript.duration,
+                    'characters': len(transcript.to_text())}
+        else:
+            data = {'characters': len(transcript or '')}
+        get_event_bus().publish(meeting_id, 'transcription', dict(data, state='completed'))
+
+    def _download_and_transcribe(self, video_url, bot_id):
+        """Stream the download straight into transcription while saving it"""
+        pipe = ChunkPipe()
+        result = {}
+
+        def download():
+            try:
+                result['audio_file'] = self.meeting_bot.download_recording(video_url, bot_id, tee=pipe)
+            except Exception as e:
+                result['error'] = e
+
+        downloader = threading.Thread(target=download, name=f'download-{bot_id}', daemon=True)
+        downloader.start()
+        try:
+            print(f"Transcribing recording stream for bot {bot_id}")
+            transcript = self.transcriber.transcribe_stream(pipe, structured=self.structured_transcripts)
+        finally:
+            # Unblock the downloader if transcription stopped reading early
+            while downloader.is_alive():
+                try:
+                    if not pipe.read(DRAIN_CHUNK_SIZE):
+                        break
+                except IOError:
+                    break
+            downloader.join()
+
+        if 'error' in result:
+            raise result['error']
+        return result['audio_file'], transcript
+
+    def _analyze(self, meeting_id, payload):
+        """Analyze the transcript with Claude and record the issues it found"""
+        meeting = db.session.get(Meeting, meeting_id)
+        if meeting.analysis_batch_id:
+            # A batch result arriving later must not overwrite this analysis
+            meeting.analysis_batch_id = None
+            db.session.commit()
+
+        if payload.get('live'):
+            result = self.live.finish(meeting)
+            if result is None and (meeting.analysis_size or meeting.analysis_inline):
+                # A duplicate job: an earlier one saved the analysis and
+                # discarded the segments
+                print(f"Meeting {meeting_id} has no unconsumed live segments; already analyzed")
+                meeting.status = 'completed'
+                db.session.commit()
+                self._publish_status(meeting)
+                return
+            if result is None:
+                raise Exception(f"Meeting {meeting_id} has no live transcript")
+            transcript, analysis = result
+            save_transcript(meeting, transcript)
+            save_analysis(meeting, analysis)
+            self.live.discard(meeting_id)
+            self._complete(meeting)
+            return
+
+        # Structured segments let long meetings be split on real speaker turns
+        transcript = meeting.segments or meeting.transcript
+
+        print("Analyzing meeting with Claude...")
+        if self.stream_analysis:
+            analysis = self.analyzer.analyze_stream(
+                transcript=transcript,
+                meeting_name=meeting.meeting_name,
+                on_section=lambda key, value, sections: self._on_section(meeting, key, value, sections),
+                completed=self._partial_analysis(meeting)
+            )
+        else:
+            analysis = self.analyzer.analyze(
+                transcript=transcript,
+                meeting_name=meeting.meeting_name
+            )
+        save_analysis(meeting, analysis)
+        self._complete(meeting)
+
+    def _complete(self, meeting):
+        meeting.status = 'completed'
+        meeting.completed_at = datetime.utcnow()
+        db.session.commit()
+        self._publish_status(meeting)
+
+    def _on_section(self, meeting, key, value, sections):
+        """Checkpoint a streamed analysis section and tell subscribers it landed"""
+        self._checkpoint_analysis(meeting, sections)
+        get_event_bus().publish(meeting.id, 'analysis_section', {'key': key, 'value': value})
+
+    def _checkpoint_analysis(self, meeting, sections):
+        """Persist the sections streamed so far, marked as partial"""
+        meeting.analysis = json.dumps(dict(sections, _partial=True), indent=2)
+        db.session.commit()
+
+    def _partial_analysis(self, meeting):
+        """Sections checkpointed by an earlier run that didn't finish"""
+        if not meeting.analysis:
+            return None
+        try:
+            sections = json.loads(meeting.analysis)
+        except ValueError:
+            return None
+        if not isinstance(sections, dict) or not sections.pop('_partial', False):
+            return None
+        if sections.pop('_live', False):
+            # Rolling live analysis, not sections of this prompt's answer
+            return None
+        return sections
+
+
+class StageWorkerPool:
+    """Fixed-size pool of threads draining one stage of a SQLite job queue"""
+
+    # How long an idle worker waits before re-checking the queue
+    POLL_INTERVAL = 2.0
+
+    def __init__(self, pipeline, stage, size):
+        self.pipeline = pipeline
+        self.queue = pipeline.queue
+        self.stage = stage
+        self.size = size
+        self._stopping = threading.Event()
+        self._threads = []
+
+    def start(self):
+        for i in range(self.size):
+            thread = threading.Thread(
+                target=self._work,
+                name=f'pipeline-{self.stage}-{i}',
+                daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self):
+        self._stopping.set()
+
+    def _work(self):
+        while not self._stopping.is_set():
+            job = self.queue.claim(self.stage)
+            if job is None:
+                self.queue.wait(self.stage, self.POLL_INTERVAL)
+                continue
+
+            try:
+                self.pipeline.run_stage(self.stage, job['meeting_id'], job['payload'])
+                self.queue.complete(job['id'])
+            except Exception as e:
+                print(f"❌ {self.stage} job {job['id']} failed: {e}")
+                traceback.print_exc()
+                self.queue.fail(job['id'], str(e))
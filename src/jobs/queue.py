@@ -0,0 +1,259 @@
+"""
+Job Queues
+Pluggable queue backends for the meeting processing pipeline
+
+The default backend is a table in a local SQLite file that in-process worker
+threads claim jobs from. Set JOB_QUEUE_BACKEND=celery to hand jobs to Celery
+(backed by Redis) instead, with one Celery queue per pipeline stage.
+
+A claimed SQLite job records the claiming process and a heartbeat that
+process renews while it is alive. Jobs whose heartbeat is older than
+JOB_LEASE_SECONDS were left by a process that died, and are queued again;
+jobs other live processes are running are left alone.
+"""
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+class SQLiteJobQueue:
+    """Job queue stored in a SQLite table and drained by in-process workers"""
+
+    # Workers in this process claim jobs themselves
+    runs_in_process = True
+
+    def __init__(self, path=None, lease_seconds=None):
+        self.path = path or os.getenv('JOB_QUEUE_PATH', 'delegate-ai-jobs.db')
+        self.lease_seconds = lease_seconds or float(os.getenv('JOB_LEASE_SECONDS', 60))
+        # Recorded on the jobs this process claims
+        self.owner = f'{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}'
+        self._local = threading.local()
+        self._wakeups = {}
+        self._wakeups_lock = threading.Lock()
+        self._heartbeat = None
+        self._heartbeat_lock = threading.Lock()
+
+        conn = self._connect()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                stage TEXT NOT NULL,
+                meeting_id INTEGER NOT NULL,
+                payload TEXT,
+                status TEXT NOT NULL DEFAULT 'queued',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                error TEXT,
+                owner TEXT,
+                heartbeat_at REAL,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )
+        """)
+        # Job files created before leases were added
+        columns = {row['name'] for row in conn.execute("PRAGMA table_info(jobs)")}
+        for column, kind in (('owner', 'TEXT'), ('heartbeat_at', 'REAL')):
+            if column not in columns:
+                conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {kind}")
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS ix_jobs_stage_status "
+            "ON jobs (stage, status, created_at)"
+        )
+        conn.commit()
+
+    def _connect(self):
+        """One connection per thread; sqlite3 connections aren't shareable"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            self._local.conn = conn
+        return conn
+
+    def _wakeup(self, stage):
+        with self._wakeups_lock:
+            return self._wakeups.setdefault(stage, threading.Event())
+
+    def enqueue(self, stage, meeting_id, payload=None):
+        """
+        Add a job for a pipeline stage
+
+        Args:
+            stage: Stage name (record, transcribe, analyze)
+            meeting_id: Meeting the job belongs to
+            payload: Optional JSON-serializable stage input
+
+        Returns:
+            The new job id
+        """
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        self._connect().execute(
+            "INSERT INTO jobs (id, stage, meeting_id, payload, status, created_at, updated_at) "
+            "VALUES (?, ?, ?, ?, 'queued', ?, ?)",
+            (job_id, stage, meeting_id, json.dumps(payload or {}), now, now)
+        )
+        self._wakeup(stage).set()
+        return job_id
+
+    def claim(self, stage):
+        """
+        Atomically take the oldest queued job for a stage
+
+        Returns:
+            Job dict, or None if the stage has nothing queued
+        """
+        self._start_heartbeat()
+        conn = self._connect()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute(
+                "SELECT * FROM jobs WHERE stage = ? AND status = 'queued' "
+                "ORDER BY created_at LIMIT 1",
+                (stage,)
+            ).fetchone()
+            if row is None:
+                conn.execute('COMMIT')
+                return None
+            now = time.time()
+            conn.execute(
+                "UPDATE jobs SET status = 'running', attempts = attempts + 1, owner = ?, "
+                "heartbeat_at = ?, updated_at = ? WHERE id = ?",
+                (self.owner, now, now, row['id'])
+            )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+        job = dict(row)
+        job['payload'] = json.loads(job['payload'] or '{}')
+        job['status'] = 'running'
+        return job
+
+    def wait(self, stage, timeout):
+        """Block until a job may be available for the stage or timeout passes"""
+        event = self._wakeup(stage)
+        event.wait(timeout)
+        event.clear()
+
+    def complete(self, job_id):
+        """Mark a job as finished"""
+        self._set_status(job_id, 'completed')
+
+    def fail(self, job_id, error):
+        """Mark a job as failed with an error message"""
+        self._set_status(job_id, 'failed', error)
+
+    def _set_status(self, job_id, status, error=None):
+        # Only while this process still holds the job; if its lease expired
+        # and another process claimed it, that process reports the outcome
+        self._connect().execute(
+            "UPDATE jobs SET status = ?, error = ?, updated_at = ? "
+            "WHERE id = ? AND status = 'running' AND owner = ?",
+            (status, error, time.time(), job_id, self.owner)
+        )
+
+    def _start_heartbeat(self):
+        with self._heartbeat_lock:
+            if self._heartbeat is None:
+                self._heartbeat = threading.Thread(target=self._beat, name='job-heartbeat', daemon=True)
+                self._heartbeat.start()
+
+    def _beat(self):
+        """Renew this process's leases, and requeue jobs whose owner died"""
+        while True:
+            time.sleep(self.lease_seconds / 3)
+            try:
+                self._connect().execute(
+                    "UPDATE jobs SET heartbeat_at = ? WHERE status = 'running' AND owner = ?",
+                    (time.time(), self.owner)
+                )
+                self.requeue_expired()
+            except sqlite3.Error as e:
+                print(f"⚠️  Job heartbeat failed: {e}")
+
+    def requeue_expired(self):
+        """
+        Put jobs back in the queue whose owner stopped renewing their lease
+
+        Returns:
+            Number of jobs requeued
+        """
+        cursor = self._connect().execute(
+            "UPDATE jobs SET status = 'queued', owner = NULL, updated_at = ? "
+            "WHERE status = 'running' AND (heartbeat_at IS NULL OR heartbeat_at < ?)",
+            (time.time(), time.time() - self.lease_seconds)
+        )
+        if cursor.rowcount:
+            print(f"♻️  Requeued {cursor.rowcount} jobs left running by a stopped process")
+            with self._wakeups_lock:
+                for event in self._wakeups.values():
+                    event.set()
+        return cursor.rowcount
+
+    def get(self, job_id):
+        """Look up a job by id"""
+        row = self._connect().execute(
+            "SELECT id, stage, meeting_id, status, attempts, error, owner, created_at, updated_at "
+            "FROM jobs WHERE id = ?",
+            (job_id,)
+        ).fetchone()
+        return dict(row) if row else None
+
+
+class CeleryJobQueue:
+    """Job queue that dispatches each stage to its own Celery queue"""
+
+    # Jobs are executed by separate `celery worker` processes
+    runs_in_process = False
+
+    def __init__(self, broker_url=None):
+        from celery import Celery
+
+        broker_url = broker_url or os.getenv('REDIS_URL', 'redis://localhost:6379/0')
+        self.celery = Celery('delegate_ai', broker=broker_url, backend=broker_url)
+        self.celery.conf.task_acks_late = True
+        self.celery.conf.worker_prefetch_multiplier = 1
+
+    def enqueue(self, stage, meeting_id, payload=None):
+        """Send a stage job to the `delegate_ai.<stage>` Celery queue"""
+        result = self.celery.send_task(
+            'delegate_ai.run_stage',
+            args=[stage, meeting_id, payload or {}],
+            queue=f'delegate_ai.{stage}'
+        )
+        return result.id
+
+    def get(self, job_id):
+        """Look up a job by Celery task id"""
+        result = self.celery.AsyncResult(job_id)
+        status = {
+            'PENDING': 'queued',
+            'STARTED': 'running',
+            'RETRY': 'queued',
+            'SUCCESS': 'completed',
+            'FAILURE': 'failed',
+        }.get(result.state, result.state.lower())
+        return {
+            'id': job_id,
+            'status': status,
+            'error': str(result.result) if result.failed() else None
+        }
+
+
+def create_job_queue():
+    """Build the queue backend selected by JOB_QUEUE_BACKEND (sqlite or celery)"""
+    backend = os.getenv('JOB_QUEUE_BACKEND', 'sqlite').lower()
+    if backend == 'celery':
+        return CeleryJobQueue()
+    if backend == 'sqlite':
+        return SQLiteJobQueue()
+    raise ValueError(f"Unknown JOB_QUEUE_BACKEND: {backend}")
@@ -0,0 +1,450 @@
+"""
+Bot Scheduler
+Sends meeting bots just in time, within global and per-rep capacity
+
+Meetings submitted with a join_at time wait in a time-ordered heap keyed by
+their dispatch time: join_at minus a lead time for the bot to get into the
+call. Meetings that start on the hour would otherwise all be dispatched in
+the same second. Each one is moved earlier by a stable per-meeting offset
+within SCHEDULER_SPREAD_SECONDS, and a token bucket caps dispatches per
+minute.
+
+A due meeting is dispatched only while fewer than SCHEDULER_MAX_BOTS bots
+are active, and fewer than SCHEDULER_MAX_BOTS_PER_REP for its rep.
+Otherwise it stays at the head of the heap until a bot is released. One
+still waiting SCHEDULER_MAX_DELAY_MINUTES after its join time is expired.
+
+The meetings table is the durable copy (status 'scheduled', join_at); the
+heap is rebuilt from it on startup. The clock is injectable: FakeClock and
+tick() drive the scheduler deterministically.
+
+The caps are counted in memory, so the scheduler runs in exactly one
+process: the one holding hold_scheduler_lock() (a Postgres advisory lock,
+or a file lock for SQLite). Other API processes leave submitted meetings
+'scheduled' in the database, and the scheduler picks them up on its next
+reconcile pass.
+
+Usage:
+    python -m src.jobs.scheduler --simulate 300    # 300 meetings on the hour
+"""
+import argparse
+import heapq
+import itertools
+import os
+import threading
+import time
+from datetime import datetime, timezone
+
+DEFAULTS = {
+    'SCHEDULER_MAX_BOTS': 20,
+    'SCHEDULER_MAX_BOTS_PER_REP': 2,
+    'SCHEDULER_LEAD_SECONDS': 60,
+    'SCHEDULER_SPREAD_SECONDS': 120,
+    'SCHEDULER_DISPATCH_PER_MINUTE': 30,
+    'SCHEDULER_DISPATCH_BURST': 5,
+    'SCHEDULER_MAX_DELAY_MINUTES': 15,
+}
+
+# How often the run loop re-checks when nothing wakes it
+POLL_INTERVAL = 5.0
+# How often active bots are reconciled against the database
+RECONCILE_INTERVAL = 60.0
+
+# Postgres advisory lock key held by the process running the scheduler
+ADVISORY_LOCK_KEY = 0x64656c65  # 'dele'
+
+
+def _setting(name, value=None):
+    return value if value is not None else type(DEFAULTS[name])(os.getenv(name, DEFAULTS[name]))
+
+
+def to_timestamp(moment):
+    """Epoch seconds of a naive-UTC (as stored) or aware datetime"""
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.timestamp()
+
+
+def parse_join_at(value):
+    """
+    Naive-UTC datetime from an ISO 8601 string; offsets are converted to UTC
+
+    Raises:
+        ValueError: If the string isn't ISO 8601
+    """
+    moment = datetime.fromisoformat(value.strip().replace('Z', '+00:00'))
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment
+
+
+def hold_scheduler_lock(engine):
+    """
+    Try to become the one process that runs the scheduler
+
+    The lock is held until the returned handle (a connection or open file)
+    is closed or the process exits.
+
+    Args:
+        engine: SQLAlchemy engine of the meetings database
+
+    Returns:
+        Lock handle, or None if another process holds it
+    """
+    if engine.dialect.name == 'postgresql':
+        from sqlalchemy import text
+
+        connection = engine.connect()
+        if connection.execute(text('SELECT pg_try_advisory_lock(:key)'), {'key': ADVISORY_LOCK_KEY}).scalar():
+            return connection
+        connection.close()
+        return None
+
+    # SQLite is only shared by processes on one host
+    try:
+        import fcntl
+    except ImportError:
+        return True  # no flock (Windows): assume a single process
+    handle = open(os.getenv('SCHEDULER_LOCK_PATH', 'delegate-ai-scheduler.lock'), 'a')
+    try:
+        fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        handle.close()
+        return None
+    return handle
+
+
+def spread_offset(meeting_id, spread_seconds):
+    """Stable 0..spread_seconds offset for a meeting (Knuth multiplicative hash)"""
+    return (meeting_id * 2654435761 % 2 ** 32) / 2 ** 32 * spread_seconds
+
+
+class SystemClock:
+    def now(self):
+        return time.time()
+
+
+class FakeClock:
+    """Clock that only moves when told to"""
+
+    def __init__(self, start=0.0):
+        self.current = start
+
+    def now(self):
+        return self.current
+
+    def advance(self, seconds):
+        self.current += seconds
+        return self.current
+
+
+class _Entry:
+    def __init__(self, meeting_id, rep, join_at, dispatch_at, seq):
+        self.meeting_id = meeting_id
+        self.rep = rep
+        self.join_at = join_at
+        self.dispatch_at = dispatch_at
+        self.seq = seq
+
+
+class BotScheduler:
+    """Time-ordered, capacity-aware bot dispatch"""
+
+    def __init__(self, dispatch, clock=None, on_expired=None, reconcile=None, pending=None,
+                 max_bots=None, max_bots_per_rep=None, lead_seconds=None, spread_seconds=None,
+                 dispatch_per_minute=None, dispatch_burst=None, max_delay_minutes=None):
+        """
+        Args:
+            dispatch: Callable(meeting_id) that sends the bot; capacity is
+                already taken when it's called, and released if it raises
+            clock: Object with now() -> epoch seconds (default: system time)
+            on_expired: Callable(meeting_id) for meetings that waited past
+                their join time plus the maximum delay
+            reconcile: Callable(meeting_ids) -> ids whose bots are still
+                active; run periodically to release bots finished elsewhere
+            pending: Callable() -> [(meeting_id, rep, join_at)] of meetings
+                waiting in the database; run with reconcile to pick up
+                meetings other processes scheduled
+        """
+        self.dispatch = dispatch
+        self.clock = clock or SystemClock()
+        self.on_expired = on_expired
+        self.reconcile = reconcile
+        self.pending = pending
+
+        self.max_bots = _setting('SCHEDULER_MAX_BOTS', max_bots)
+        self.max_bots_per_rep = _setting('SCHEDULER_MAX_BOTS_PER_REP', max_bots_per_rep)
+        self.lead_seconds = _setting('SCHEDULER_LEAD_SECONDS', lead_seconds)
+        self.spread_seconds = _setting('SCHEDULER_SPREAD_SECONDS', spread_seconds)
+        self.dispatch_per_minute = _setting('SCHEDULER_DISPATCH_PER_MINUTE', dispatch_per_minute)
+        self.dispatch_burst = _setting('SCHEDULER_DISPATCH_BURST', dispatch_burst)
+        self.max_delay = _setting('SCHEDULER_MAX_DELAY_MINUTES', max_delay_minutes) * 60
+
+        self._heap = []
+        self._entries = {}
+        self._active = {}
+        self._per_rep = {}
+        self._seq = itertools.count()
+
+        self._tokens = float(self.dispatch_burst)
+        self._refilled_at = self.clock.now()
+
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._stopping = False
+        self._thread = None
+        self._reconciled_at = 0.0
+
+    # Queue
+
+    def schedule(self, meeting_id, rep, join_at):
+        """
+        Queue a meeting's bot (rescheduling it if already queued)
+
+        Args:
+            meeting_id: Meeting id
+            rep: Representative the per-rep cap applies to
+            join_at: When the bot should be in the call (epoch seconds)
+
+        Returns:
+            Epoch seconds the bot is due to be dispatched
+        """
+        dispatch_at = self.dispatch_time(meeting_id, join_at)
+        with self._lock:
+            entry = _Entry(meeting_id, rep or '', join_at, dispatch_at, next(self._seq))
+            self._entries[meeting_id] = entry
+            heapq.heappush(self._heap, (dispatch_at, entry.seq, meeting_id))
+            self._wakeup.notify()
+        return dispatch_at
+
+    def dispatch_time(self, meeting_id, join_at):
+        """Epoch seconds a meeting joining at join_at is due to be dispatched"""
+        return join_at - self.lead_seconds - spread_offset(meeting_id, self.spread_seconds)
+
+    def cancel(self, meeting_id):
+        """Drop a queued meeting; returns False if it wasn't queued"""
+        with self._lock:
+            # Its heap item is skipped when popped
+            return self._entries.pop(meeting_id, None) is not None
+
+    # Capacity
+
+    def acquire(self, meeting_id, rep):
+        """Take a bot slot now, bypassing the queue; False if at capacity"""
+        with self._lock:
+            if meeting_id in self._active:
+                return True
+            if not self._has_capacity(rep or ''):
+                return False
+            self._take(meeting_id, rep or '')
+            return True
+
+    def mark_active(self, meeting_id, rep):
+        """Count a bot already in flight (after a restart)"""
+        with self._lock:
+            if meeting_id not in self._active:
+                self._take(meeting_id, rep or '')
+
+    def release(self, meeting_id):
+        """Free a meeting's bot slot once its bot has left"""
+        with self._lock:
+            rep = self._active.pop(meeting_id, None)
+            if rep is None:
+                return False
+            self._per_rep[rep] -= 1
+            if not self._per_rep[rep]:
+                del self._per_rep[rep]
+            self._wakeup.notify()
+            return True
+
+    def _has_capacity(self, rep):
+        return (len(self._active) < self.max_bots
+                and self._per_rep.get(rep, 0) < self.max_bots_per_rep)
+
+    def _take(self, meeting_id, rep):
+        self._active[meeting_id] = rep
+        self._per_rep[rep] = self._per_rep.get(rep, 0) + 1
+
+    def _refill(self, now):
+        elapsed = max(now - self._refilled_at, 0.0)
+        self._tokens = min(self.dispatch_burst, self._tokens + elapsed * self.dispatch_per_minute / 60)
+        self._refilled_at = now
+
+    # Dispatch
+
+    def tick(self):
+        """
+        Dispatch every due meeting that fits, and expire stale ones
+
+        Returns:
+            Meeting ids dispatched, in order
+        """
+        now = self.clock.now()
+        ready, expired, blocked = [], [], []
+        with self._lock:
+            self._refill(now)
+            while self._heap and self._heap[0][0] <= now:
+                item = heapq.heappop(self._heap)
+                entry = self._entries.get(item[2])
+                if entry is None or entry.seq != item[1]:
+                    continue  # cancelled or rescheduled
+                if now > entry.join_at + self.max_delay:
+                    del self._entries[entry.meeting_id]
+                    expired.append(entry.meeting_id)
+                elif self._tokens >= 1 and self._has_capacity(entry.rep):
+                    self._tokens -= 1
+                    del self._entries[entry.meeting_id]
+                    self._take(entry.meeting_id, entry.rep)
+                    ready.append(entry.meeting_id)
+                else:
+                    blocked.append(item)
+            # Blocked meetings keep their place at the head of the queue
+            for item in blocked:
+                heapq.heappush(self._heap, item)
+
+        for meeting_id in expired:
+            if self.on_expired:
+                self._safe_call(self.on_expired, meeting_id)
+        dispatched = []
+        for meeting_id in ready:
+            if self._safe_call(self.dispatch, meeting_id):
+                dispatched.append(meeting_id)
+            else:
+                self.release(meeting_id)
+        return dispatched
+
+    @staticmethod
+    def _safe_call(callback, meeting_id):
+        try:
+            callback(meeting_id)
+            return True
+        except Exception as e:
+            print(f"⚠️  Scheduler callback failed for meeting {meeting_id}: {e}")
+            return False
+
+    def seconds_until_due(self):
+        """Seconds until the next queued meeting is due (0 if one is waiting), or None"""
+        with self._lock:
+            if not self._heap:
+                return None
+            return max(self._heap[0][0] - self.clock.now(), 0.0)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'queued': len(self._entries),
+                'active': len(self._active),
+                'active_per_rep': dict(self._per_rep),
+                'max_bots': self.max_bots,
+                'max_bots_per_rep': self.max_bots_per_rep,
+            }
+
+    # Run loop
+
+    @property
+    def running(self):
+        return self._thread is not None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name='bot-scheduler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        with self._lock:
+            self._stopping = True
+            self._wakeup.notify()
+        self._thread = None
+
+    def _run(self):
+        while True:
+            try:
+                self.tick()
+                self._maybe_reconcile()
+            except Exception as e:
+                print(f"❌ Scheduler error: {e}")
+
+            due = self.seconds_until_due()
+            timeout = POLL_INTERVAL if due is None or due == 0 else min(due, POLL_INTERVAL)
+            with self._lock:
+                if self._stopping:
+                    return
+                # Woken early by schedule() and release()
+                self._wakeup.wait(timeout)
+                if self._stopping:
+                    return
+
+    def _maybe_reconcile(self):
+        now = time.monotonic()
+        if now - self._reconciled_at < RECONCILE_INTERVAL:
+            return
+        self._reconciled_at = now
+
+        if self.pending:
+            for meeting_id, rep, join_at in self.pending():
+                with self._lock:
+                    known = meeting_id in self._entries or meeting_id in self._active
+                if not known:
+                    self.schedule(meeting_id, rep, join_at)
+
+        with self._lock:
+            active = list(self._active)
+        if not self.reconcile or not active:
+            return
+        still_active = set(self.reconcile(active))
+        for meeting_id in active:
+            if meeting_id not in still_active:
+                self.release(meeting_id)
+
+
+def simulate(meetings, reps, meeting_minutes=30):
+    """
+    Dispatch `meetings` meetings that all start on the hour, on a FakeClock
+
+    Prints when bots were sent relative to the hour, and how late the
+    last one was.
+    """
+    clock = FakeClock(start=0.0)
+    join_at = 3600.0
+    sent = {}
+    scheduler = BotScheduler(dispatch=lambda meeting_id: sent.__setitem__(meeting_id, clock.now()), clock=clock)
+    for meeting_id in range(1, meetings + 1):
+        scheduler.schedule(meeting_id, f'rep-{meeting_id % reps}', join_at)
+
+    finished_at = {}
+    while clock.now() < join_at + scheduler.max_delay + 60:
+        for meeting_id in scheduler.tick():
+            finished_at[meeting_id] = clock.now() + scheduler.lead_seconds + meeting_minutes * 60
+        for meeting_id, end in list(finished_at.items()):
+            if end <= clock.now():
+                scheduler.release(meeting_id)
+                del finished_at[meeting_id]
+        clock.advance(1.0)
+
+    offsets = sorted(at - join_at for at in sent.values())
+    buckets = {}
+    for offset in offsets:
+        buckets[int(offset // 30) * 30] = buckets.get(int(offset // 30) * 30, 0) + 1
+    print(f"📅 {meetings} meetings at the top of the hour, {reps} reps; "
+          f"caps {scheduler.max_bots} total / {scheduler.max_bots_per_rep} per rep, "
+          f"{scheduler.dispatch_per_minute}/min")
+    for start in sorted(buckets):
+        print(f"   {start:+5d}s .. {start + 30:+5d}s  {'█' * buckets[start]} {buckets[start]}")
+    print(f"✅ Dispatched {len(sent)}, still waiting or expired {meetings - len(sent)}")
+    if offsets:
+        print(f"   First bot {offsets[0]:+.0f}s, last {offsets[-1]:+.0f}s from the start time")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Bot scheduler')
+    parser.add_argument('--simulate', type=int, metavar='MEETINGS',
+                        help='Simulate this many meetings starting on the hour')
+    parser.add_argument('--reps', type=int, default=10)
+    args = parser.parse_args()
+
+    if args.simulate:
+        simulate(args.simulate, args.reps)
+    else:
+        parser.print_help()
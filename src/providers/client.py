@@ -0,0 +1,251 @@
+"""
+Provider Client
+Shared outbound client for Recall.ai, Deepgram, OpenAI and Anthropic calls
+
+One pooled requests.Session is reused for every plain HTTP call, so
+connections (and TLS sessions) stay open between requests. Every call, plain
+HTTP or through a vendor SDK, goes through the same per-host limits:
+- a concurrency cap (semaphore)
+- a token-bucket rate limit
+- jittered exponential retries on 429 / 5xx / connection errors
+- timing metrics
+"""
+import os
+import random
+import threading
+import time
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from dotenv import load_dotenv
+
+load_dotenv()
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Default (connect, read) timeout in seconds for plain HTTP calls
+DEFAULT_TIMEOUT = (10, 60)
+
+
+class TokenBucket:
+    """Thread-safe token bucket; acquire() blocks until a token is free"""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class HostMetrics:
+    """Request counters and timings for one host"""
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.retries = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.status_counts = {}
+
+    def to_dict(self):
+        return {
+            'requests': self.requests,
+            'errors': self.errors,
+            'retries': self.retries,
+            'avg_ms': round(self.total_seconds / self.requests * 1000, 1) if self.requests else 0,
+            'max_ms': round(self.max_seconds * 1000, 1),
+            'status_counts': dict(self.status_counts),
+        }
+
+
+class _HostLimits:
+    def __init__(self, max_concurrency, rate_per_second, burst):
+        self.semaphore = threading.BoundedSemaphore(max_concurrency)
+        self.bucket = TokenBucket(rate_per_second, burst)
+
+
+class ProviderClient:
+    """Pooled, rate-limited, retrying client shared by all provider calls"""
+
+    def __init__(self, pool_size=None, max_retries=None, backoff_base=0.5, backoff_max=30.0):
+        self.pool_size = pool_size or int(os.getenv('PROVIDER_POOL_SIZE', 32))
+        self.max_retries = max_retries if max_retries is not None else int(os.getenv('PROVIDER_MAX_RETRIES', 4))
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self.default_concurrency = int(os.getenv('PROVIDER_MAX_CONCURRENCY', 16))
+        self.default_rate = float(os.getenv('PROVIDER_RATE_LIMIT', 10))
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        self._hosts = {}
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def configure_host(self, host, max_concurrency=None, rate_per_second=None, burst=None):
+        """
+        Set limits for one host (call before its first request)
+
+        Args:
+            host: Hostname, e.g. 'api.recall.ai'
+            max_concurrency: Max simultaneous in-flight requests
+            rate_per_second: Sustained request rate
+            burst: Bucket capacity (defaults to 2x the rate)
+        """
+        rate = rate_per_second or self.default_rate
+        with self._lock:
+            self._hosts[host] = _HostLimits(
+                max_concurrency or self.default_concurrency,
+                rate,
+                burst or max(1, rate * 2)
+            )
+
+    def _limits(self, host):
+        with self._lock:
+            if host not in self._hosts:
+                self._hosts[host] = _HostLimits(
+                    self.default_concurrency,
+                    self.default_rate,
+                    max(1, self.default_rate * 2)
+                )
+            return self._hosts[host]
+
+    def _host_metrics(self, host):
+        with self._lock:
+            return self._metrics.setdefault(host, HostMetrics())
+
+    def metrics(self):
+        """Snapshot of per-host request metrics"""
+        with self._lock:
+            return {host: m.to_dict() for host, m in self._metrics.items()}
+
+    def request(self, method, url, max_retries=None, **kwargs):
+        """
+        Send an HTTP request through the pooled session
+
+        Retries 429/5xx responses and connection errors. The final response
+        is returned as-is (callers still check status codes).
+        """
+        kwargs.setdefault('timeout', DEFAULT_TIMEOUT)
+        host = urlparse(url).hostname
+        return self._run(host, lambda: self.session.request(method, url, **kwargs), max_retries=max_retries)
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def post_once(self, url, **kwargs):
+        """Like post(), but never retried (for requests that create something)"""
+        return self.request('POST', url, max_retries=0, **kwargs)
+
+    def call(self, host, fn, *args, **kwargs):
+        """
+        Run a vendor SDK call under the same limits, retries and metrics
+
+        Disable the SDK's own retries (max_retries=0) so they don't stack.
+
+        Args:
+            host: Host the SDK talks to (used for limits and metrics)
+            fn: SDK callable
+        """
+        return self._run(host, lambda: fn(*args, **kwargs))
+
+    def call_once(self, host, fn, *args, **kwargs):
+        """Like call(), but never retried (for calls consuming a one-shot stream)"""
+        return self._run(host, lambda: fn(*args, **kwargs), max_retries=0)
+
+    def _run(self, host, send, max_retries=None):
+        limits = self._limits(host)
+        metrics = self._host_metrics(host)
+        if max_retries is None:
+            max_retries = self.max_retries
+
+        attempt = 0
+        while True:
+            limits.bucket.acquire()
+            started = time.monotonic()
+            response, error = None, None
+            with limits.semaphore:
+                try:
+                    response = send()
+                except Exception as e:
+                    error = e
+            elapsed = time.monotonic() - started
+
+            status = getattr(response, 'status_code', None) or getattr(error, 'status_code', None)
+            with self._lock:
+                metrics.requests += 1
+                metrics.total_seconds += elapsed
+                metrics.max_seconds = max(metrics.max_seconds, elapsed)
+                if status:
+                    metrics.status_counts[status] = metrics.status_counts.get(status, 0) + 1
+                if error is not None or (status and status >= 400):
+                    metrics.errors += 1
+
+            retryable = status in RETRY_STATUSES or (error is not None and _is_connection_error(error))
+            if not retryable or attempt >= max_retries:
+                if error is not None:
+                    raise error
+                return response
+
+            attempt += 1
+            with self._lock:
+                metrics.retries += 1
+            delay = self._backoff(attempt, response if response is not None else getattr(error, 'response', None))
+            if isinstance(response, requests.Response):
+                # An unread stream=True body holds its pooled connection until closed
+                response.close()
+            time.sleep(delay)
+
+    def _backoff(self, attempt, response):
+        """Full-jitter exponential backoff, honouring Retry-After when given"""
+        retry_after = None
+        headers = getattr(response, 'headers', None) or {}
+        try:
+            retry_after = float(headers.get('retry-after'))
+        except (TypeError, ValueError):
+            pass
+        if retry_after is not None:
+            return min(retry_after, self.backoff_max)
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+
+def _is_connection_error(error):
+    if isinstance(error, (requests.ConnectionError, requests.Timeout)):
+        return True
+    # SDK clients (openai, anthropic, aiohttp) use their own exception types
+    name = type(error).__name__
+    return name.endswith(('ConnectionError', 'TimeoutError', 'Timeout'))
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """Process-wide shared ProviderClient"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = ProviderClient()
+        return _client
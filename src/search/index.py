@@ -0,0 +1,306 @@
+"""
+Meeting Search
+Full-text search over transcript segments, issues and summaries
+
+Every transcript segment is its own row, carrying its speaker and time
+offsets, so a hit points at the moment something was said rather than at
+a whole meeting. Each identified issue, and each meeting's executive
+summary, is also a row.
+
+Backends:
+    SQLite:   an FTS5 table ranked with bm25(), snippets from snippet()
+    Postgres: a table with a stored tsvector and a GIN index, ranked with
+              ts_rank_cd(), snippets from ts_headline()
+
+Rows are replaced per meeting as transcripts and analyses land. Row ids
+are derived from the meeting id, so one meeting's rows form a contiguous
+id range and can be deleted without scanning the index.
+
+The tables are created by migration 0006.
+"""
+import argparse
+import json
+import os
+import re
+
+from sqlalchemy import text
+
+TABLE = 'search_segments'
+
+# Row id layout: meeting id | block (transcript or analysis) | sequence
+SEQUENCE_BITS = 19
+BLOCK_BITS = 1
+TRANSCRIPT_BLOCK = 0
+ANALYSIS_BLOCK = 1
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+
+SNIPPET_OPEN = '<mark>'
+SNIPPET_CLOSE = '</mark>'
+
+
+def row_id(meeting_id, block, sequence):
+    return (meeting_id << (SEQUENCE_BITS + BLOCK_BITS)) | (block << SEQUENCE_BITS) | sequence
+
+
+def block_range(meeting_id, block):
+    """Inclusive (first, last) row ids of one meeting's block"""
+    first = row_id(meeting_id, block, 0)
+    return first, first + (1 << SEQUENCE_BITS) - 1
+
+
+def transcript_rows(transcript):
+    """(speaker, start, end, text) for each segment of a StructuredTranscript"""
+    return [
+        (segment['speaker'], segment['start'], segment['end'], segment['text'])
+        for segment in transcript if segment['text'].strip()
+    ][:1 << SEQUENCE_BITS]
+
+
+def analysis_rows(analysis):
+    """(kind, text) rows for a MeetingAnalysis: the summary, then each issue"""
+    rows = []
+    if analysis.executive_summary:
+        rows.append(('summary', analysis.executive_summary))
+    for issue in analysis.issues:
+        rows.append(('issue', f"{issue.title}. {issue.description}".strip()))
+    return rows[:1 << SEQUENCE_BITS]
+
+
+class SearchIndex:
+    """Backend-independent indexing; subclasses supply the SQL"""
+
+    def index_transcript(self, session, meeting_id, transcript):
+        """
+        Replace a meeting's transcript rows (no commit)
+
+        Args:
+            session: SQLAlchemy session
+            meeting_id: Meeting id
+            transcript: StructuredTranscript
+        """
+        self._delete_block(session, meeting_id, TRANSCRIPT_BLOCK)
+        rows = [
+            {
+                'id': row_id(meeting_id, TRANSCRIPT_BLOCK, i),
+                'meeting_id': meeting_id,
+                'kind': 'segment',
+                'speaker': speaker,
+                'start_s': start,
+                'end_s': end,
+                'body': body,
+            }
+            for i, (speaker, start, end, body) in enumerate(transcript_rows(transcript))
+        ]
+        self._insert(session, rows)
+
+    def index_analysis(self, session, meeting_id, analysis):
+        """Replace a meeting's summary and issue rows (no commit)"""
+        self._delete_block(session, meeting_id, ANALYSIS_BLOCK)
+        rows = [
+            {
+                'id': row_id(meeting_id, ANALYSIS_BLOCK, i),
+                'meeting_id': meeting_id,
+                'kind': kind,
+                'speaker': None,
+                'start_s': None,
+                'end_s': None,
+                'body': body,
+            }
+            for i, (kind, body) in enumerate(analysis_rows(analysis))
+        ]
+        self._insert(session, rows)
+
+    def remove_meeting(self, session, meeting_id):
+        self._delete_block(session, meeting_id, TRANSCRIPT_BLOCK)
+        self._delete_block(session, meeting_id, ANALYSIS_BLOCK)
+
+    def _delete_block(self, session, meeting_id, block):
+        first, last = block_range(meeting_id, block)
+        session.execute(
+            text(f'DELETE FROM {TABLE} WHERE {self.id_column} BETWEEN :first AND :last'),
+            {'first': first, 'last': last}
+        )
+
+    def _insert(self, session, rows):
+        if rows:
+            session.execute(text(self.insert_sql), rows)
+
+    def search(self, session, query, limit=DEFAULT_LIMIT, meeting_id=None, kind=None):
+        """
+        Ranked hits for a free-text query
+
+        Returns:
+            List of dicts: meeting_id, meeting_name, kind, speaker, start,
+            end, snippet, score (higher is better)
+        """
+        params = {'limit': limit, 'meeting_id': meeting_id, 'kind': kind}
+        params.update(self._query_params(query, meeting_id))
+        rows = session.execute(text(self.search_sql), params).mappings().all()
+        return [
+            {
+                'meeting_id': row['meeting_id'],
+                'meeting_name': row['meeting_name'],
+                'kind': row['kind'],
+                'speaker': row['speaker'],
+                'start': row['start_s'],
+                'end': row['end_s'],
+                'snippet': row['snippet'],
+                'score': round(float(row['score']), 6),
+            }
+            for row in rows
+        ]
+
+
+class SQLiteSearchIndex(SearchIndex):
+    """FTS5 index; the row id is the FTS rowid"""
+
+    id_column = 'rowid'
+
+    insert_sql = (
+        f'INSERT INTO {TABLE} (rowid, body, meeting_id, kind, speaker, start_s, end_s) '
+        'VALUES (:id, :body, :meeting_id, :kind, :speaker, :start_s, :end_s)'
+    )
+
+    # bm25() is lower-is-better, so it is negated into the score
+    search_sql = f'''
+        SELECT s.meeting_id, m.meeting_name, s.kind, s.speaker, s.start_s, s.end_s,
+               snippet({TABLE}, 0, '{SNIPPET_OPEN}', '{SNIPPET_CLOSE}', '…', 16) AS snippet,
+               -bm25({TABLE}) AS score
+        FROM {TABLE} s
+        JOIN meetings m ON m.id = s.meeting_id
+        WHERE {TABLE} MATCH :match
+          AND (:meeting_id IS NULL OR s.rowid BETWEEN :first AND :last)
+          AND (:kind IS NULL OR s.kind = :kind)
+        ORDER BY bm25({TABLE})
+        LIMIT :limit
+    '''
+
+    def _query_params(self, query, meeting_id):
+        params = {'match': fts5_query(query), 'first': None, 'last': None}
+        if meeting_id:
+            # Restrict to one meeting through its row id range
+            params['first'] = row_id(meeting_id, 0, 0)
+            params['last'] = row_id(meeting_id + 1, 0, 0) - 1
+        return params
+
+
+class PostgresSearchIndex(SearchIndex):
+    """tsvector column (generated from body) with a GIN index"""
+
+    id_column = 'id'
+
+    insert_sql = (
+        f'INSERT INTO {TABLE} (id, body, meeting_id, kind, speaker, start_s, end_s) '
+        'VALUES (:id, :body, :meeting_id, :kind, :speaker, :start_s, :end_s)'
+    )
+
+    # Rank first, then build headlines only for the rows returned
+    search_sql = f'''
+        SELECT top.meeting_id, m.meeting_name, top.kind, top.speaker, top.start_s, top.end_s,
+               ts_headline('english', top.body, top.q,
+                           'StartSel={SNIPPET_OPEN},StopSel={SNIPPET_CLOSE},MaxFragments=1,MinWords=8,MaxWords=24') AS snippet,
+               top.score
+        FROM (
+            SELECT s.meeting_id, s.kind, s.speaker, s.start_s, s.end_s, s.body, q,
+                   ts_rank_cd(s.tsv, q) AS score
+            FROM {TABLE} s, websearch_to_tsquery('english', :query) q
+            WHERE s.tsv @@ q
+              AND (CAST(:meeting_id AS INTEGER) IS NULL OR s.meeting_id = :meeting_id)
+              AND (CAST(:kind AS TEXT) IS NULL OR s.kind = :kind)
+            ORDER BY score DESC
+            LIMIT :limit
+        ) top
+        JOIN meetings m ON m.id = top.meeting_id
+        ORDER BY top.score DESC
+    '''
+
+    def _query_params(self, query, meeting_id):
+        return {'query': query}
+
+
+def fts5_query(query):
+    """
+    Turn free text into a safe FTS5 query
+
+    Words become quoted terms (all must match); a trailing * keeps prefix
+    matching, and "quoted phrases" are kept as phrases. FTS5 operators and
+    punctuation in the input are not interpreted.
+    """
+    parts = []
+    for phrase, word in re.findall(r'"([^"]+)"|(\S+)', query):
+        if phrase:
+            terms = re.findall(r'\w+', phrase)
+            if terms:
+                parts.append('"' + ' '.join(terms) + '"')
+            continue
+        prefix = word.endswith('*')
+        for term in re.findall(r'\w+', word):
+            parts.append(f'"{term}"' + ('*' if prefix else ''))
+    if not parts:
+        raise ValueError("Query has no searchable terms")
+    return ' '.join(parts)
+
+
+_indexes = {}
+
+
+def get_search_index(engine):
+    """Search backend for an engine's dialect, or None if unsupported"""
+    dialect = engine.dialect.name
+    if dialect not in _indexes:
+        if dialect == 'sqlite':
+            _indexes[dialect] = SQLiteSearchIndex()
+        elif dialect == 'postgresql':
+            _indexes[dialect] = PostgresSearchIndex()
+        else:
+            _indexes[dialect] = None
+    return _indexes[dialect]
+
+
+def rebuild(app):
+    """Re-index every meeting (after enabling search on an existing database)"""
+    from src.analysis.schema import MeetingAnalysis
+    from src.analysis.structured import StructuredTranscript
+    from src.api.database import db, Meeting
+
+    with app.app_context():
+        index = get_search_index(db.engine)
+        if index is None:
+            raise Exception(f"Search is not supported on {db.engine.dialect.name}")
+
+        ids = [row[0] for row in db.session.query(Meeting.id).order_by(Meeting.id)]
+        for count, meeting_id in enumerate(ids, start=1):
+            meeting = db.session.get(Meeting, meeting_id)
+            transcript = meeting.segments or (
+                StructuredTranscript.from_text(meeting.transcript) if meeting.transcript else None
+            )
+            if transcript is not None:
+                index.index_transcript(db.session, meeting_id, transcript)
+            if meeting.analysis:
+                try:
+                    analysis = MeetingAnalysis.from_dict(json.loads(meeting.analysis))
+                    index.index_analysis(db.session, meeting_id, analysis)
+                except ValueError:
+                    pass
+            db.session.commit()
+            db.session.expunge_all()
+            if count % 100 == 0:
+                print(f"🔎 Indexed {count} / {len(ids)} meetings")
+        db.session.remove()
+    print(f"✅ Search index rebuilt for {len(ids)} meetings")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Maintain the meeting search index')
+    parser.add_argument('--rebuild', action='store_true', help='Re-index every meeting')
+    args = parser.parse_args()
+
+    os.environ['PIPELINE_WORKERS_ENABLED'] = 'false'
+    from src.api.app import app
+
+    if args.rebuild:
+        rebuild(app)
+    else:
+        parser.print_help()
@@ -0,0 +1,372 @@
+"""
+Blob Storage
+Content-addressed storage for transcripts and analyses
+
+Large text is kept out of the meetings table. A blob's reference is the
+SHA-256 of its content, so writing the same text twice stores it once.
+
+Blobs are stored compressed in independent frames: the content is cut into
+fixed-size frames, each zlib-compressed on its own, behind a small header
+with the compressed offset of every frame. A byte range of the original
+content is served by reading and inflating only the frames it overlaps,
+so the first page of a long transcript never loads the whole blob.
+
+Backends:
+    local: files under BLOB_STORE_DIR (default)
+    s3:    an S3-compatible bucket (AWS, or MinIO locally via S3_ENDPOINT_URL)
+"""
+import hashlib
+import os
+import struct
+import tempfile
+import threading
+import zlib
+from collections import OrderedDict
+
+MAGIC = b'DAIB'
+VERSION = 1
+# magic, version, frame size, content size, frame count
+HEADER = struct.Struct('>4sBIQI')
+OFFSET = struct.Struct('>Q')
+
+DEFAULT_FRAME_SIZE = 64 * 1024
+
+
+def blob_ref(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def encode_frames(data, frame_size=DEFAULT_FRAME_SIZE, level=6):
+    """Compress data into the framed blob format"""
+    frames = [
+        zlib.compress(data[start:start + frame_size], level)
+        for start in range(0, len(data), frame_size)
+    ]
+    offsets, position = [], 0
+    for frame in frames:
+        position += len(frame)
+        offsets.append(position)
+    header = HEADER.pack(MAGIC, VERSION, frame_size, len(data), len(frames))
+    table = b''.join(OFFSET.pack(offset) for offset in offsets)
+    return header + table + b''.join(frames)
+
+
+class BlobIndex:
+    """Parsed header of a framed blob"""
+
+    def __init__(self, frame_size, size, ends):
+        self.frame_size = frame_size
+        self.size = size
+        self.ends = ends  # compressed end offset of each frame, relative to the data section
+
+    @property
+    def data_start(self):
+        return HEADER.size + OFFSET.size * len(self.ends)
+
+    def frame_span(self, index):
+        """(start, end) byte positions of a compressed frame within the blob"""
+        start = self.ends[index - 1] if index else 0
+        return self.data_start + start, self.data_start + self.ends[index]
+
+    @staticmethod
+    def parse_header(raw):
+        """(frame size, content size, frame count) from the fixed-size header"""
+        magic, version, frame_size, size, count = HEADER.unpack(raw[:HEADER.size])
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("Not a framed blob")
+        return frame_size, size, count
+
+    @classmethod
+    def parse(cls, raw, table=None):
+        """
+        Args:
+            raw: The blob, or at least its header
+            table: The offset table, if raw doesn't include it
+        """
+        frame_size, size, count = cls.parse_header(raw)
+        if table is None:
+            table = raw[HEADER.size:HEADER.size + OFFSET.size * count]
+        ends = [OFFSET.unpack_from(table, i * OFFSET.size)[0] for i in range(count)]
+        return cls(frame_size, size, ends)
+
+
+class BlobStore:
+    """
+    Framed, content-addressed blob store
+
+    Subclasses provide the raw object operations: _write, _read (optionally
+    a byte range), _touch, _delete and _keys (ref, mtime pairs).
+    """
+
+    def __init__(self, frame_size=None, index_cache_size=256):
+        self.frame_size = frame_size or int(os.getenv('BLOB_FRAME_KB', 64)) * 1024
+        self._indexes = OrderedDict()
+        self._index_cache_size = index_cache_size
+        self._lock = threading.Lock()
+
+    def put(self, data):
+        """
+        Store bytes (or text, as UTF-8)
+
+        Returns:
+            (ref, uncompressed size)
+        """
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        ref = blob_ref(data)
+        # An existing copy may be old enough for GC to take it before the
+        # new reference commits; refresh its mtime so the grace period
+        # starts over
+        if not self._touch(ref):
+            self._write(ref, encode_frames(data, self.frame_size))
+        return ref, len(data)
+
+    def get(self, ref):
+        """Whole blob content as bytes"""
+        raw = self._read(ref)
+        index = BlobIndex.parse(raw)
+        return b''.join(
+            zlib.decompress(raw[start:end])
+            for start, end in (index.frame_span(i) for i in range(len(index.ends)))
+        )
+
+    def get_text(self, ref):
+        return self.get(ref).decode('utf-8')
+
+    def size(self, ref):
+        return self.index(ref).size
+
+    def read_range(self, ref, start, length=None):
+        """
+        Bytes [start, start + length) of the blob's content
+
+        Only the frames overlapping the range are fetched and inflated.
+        """
+        index = self.index(ref)
+        end = index.size if length is None else min(index.size, start + length)
+        if start >= end:
+            return b''
+
+        first = start // index.frame_size
+        last = (end - 1) // index.frame_size
+        span_start = index.frame_span(first)[0]
+        span_end = index.frame_span(last)[1]
+        raw = self._read(ref, span_start, span_end)
+
+        content = b''.join(
+            zlib.decompress(raw[frame_start - span_start:frame_end - span_start])
+            for frame_start, frame_end in (index.frame_span(i) for i in range(first, last + 1))
+        )
+        offset = start - first * index.frame_size
+        return content[offset:offset + (end - start)]
+
+    def index(self, ref):
+        """Frame index of a blob (cached; blobs are immutable)"""
+        with self._lock:
+            cached = self._indexes.get(ref)
+            if cached is not None:
+                self._indexes.move_to_end(ref)
+                return cached
+
+        head = self._read(ref, 0, HEADER.size)
+        _, _, count = BlobIndex.parse_header(head)
+        table = self._read(ref, HEADER.size, HEADER.size + OFFSET.size * count) if count else b''
+        index = BlobIndex.parse(head, table)
+
+        with self._lock:
+            self._indexes[ref] = index
+            while len(self._indexes) > self._index_cache_size:
+                self._indexes.popitem(last=False)
+        return index
+
+    def exists(self, ref):
+        return self._exists(ref)
+
+    def delete(self, ref):
+        with self._lock:
+            self._indexes.pop(ref, None)
+        self._delete(ref)
+
+    def refs(self):
+        """(ref, last modified timestamp) for every stored blob"""
+        return self._keys()
+
+    def _write(self, ref, payload):
+        raise NotImplementedError
+
+    def _read(self, ref, start=None, end=None):
+        raise NotImplementedError
+
+    def _exists(self, ref):
+        raise NotImplementedError
+
+    def _touch(self, ref):
+        """Set the blob's last modified time to now; False if it doesn't exist"""
+        raise NotImplementedError
+
+    def _delete(self, ref):
+        raise NotImplementedError
+
+    def _keys(self):
+        raise NotImplementedError
+
+
+class LocalBlobStore(BlobStore):
+    """Blobs as files under a directory, fanned out by ref prefix"""
+
+    def __init__(self, directory=None, **kwargs):
+        super().__init__(**kwargs)
+        self.directory = directory or os.getenv('BLOB_STORE_DIR', 'blobs')
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _path(self, ref):
+        return os.path.join(self.directory, ref[:2], ref[2:4], ref)
+
+    def _write(self, ref, payload):
+        path = self._path(ref)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(payload)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def _read(self, ref, start=None, end=None):
+        try:
+            with open(self._path(ref), 'rb') as f:
+                if start is None:
+                    return f.read()
+                f.seek(start)
+                return f.read(end - start)
+        except FileNotFoundError:
+            raise KeyError(ref)
+
+    def _exists(self, ref):
+        return os.path.exists(self._path(ref))
+
+    def _touch(self, ref):
+        try:
+            os.utime(self._path(ref))
+            return True
+        except FileNotFoundError:
+            return False
+
+    def _delete(self, ref):
+        try:
+            os.remove(self._path(ref))
+        except FileNotFoundError:
+            pass
+
+    def _keys(self):
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if not name.endswith('.tmp'):
+                    yield name, os.path.getmtime(os.path.join(root, name))
+
+
+class S3BlobStore(BlobStore):
+    """Blobs as objects in an S3-compatible bucket (MinIO works via S3_ENDPOINT_URL)"""
+
+    def __init__(self, bucket=None, prefix=None, endpoint_url=None, **kwargs):
+        super().__init__(**kwargs)
+        self.bucket = bucket or os.getenv('S3_BUCKET')
+        if not self.bucket:
+            raise Exception("S3_BUCKET not set")
+        self.prefix = prefix if prefix is not None else os.getenv('S3_PREFIX', 'blobs/')
+        self.endpoint_url = endpoint_url or os.getenv('S3_ENDPOINT_URL') or None
+        self._client = None
+
+    @property
+    def client(self):
+        if self._client is None:
+            # Import lazily; boto3 is only needed for the s3 backend
+            import boto3
+            self._client = boto3.client('s3', endpoint_url=self.endpoint_url)
+        return self._client
+
+    def _key(self, ref):
+        return f'{self.prefix}{ref}'
+
+    def _write(self, ref, payload):
+        self.client.put_object(
+            Bucket=self.bucket,
+            Key=self._key(ref),
+            Body=payload,
+            ContentType='application/octet-stream'
+        )
+
+    def _read(self, ref, start=None, end=None):
+        params = {'Bucket': self.bucket, 'Key': self._key(ref)}
+        if start is not None:
+            params['Range'] = f'bytes={start}-{end - 1}'
+        try:
+            return self.client.get_object(**params)['Body'].read()
+        except self.client.exceptions.NoSuchKey:
+            raise KeyError(ref)
+
+    def _exists(self, ref):
+        from botocore.exceptions import ClientError
+
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self._key(ref))
+            return True
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') in ('404', 'NoSuchKey', 'NotFound'):
+                return False
+            raise
+
+    def _touch(self, ref):
+        from botocore.exceptions import ClientError
+
+        # S3 has no touch; copying an object onto itself (with new metadata,
+        # which S3 requires for an in-place copy) updates LastModified
+        key = self._key(ref)
+        try:
+            self.client.copy_object(
+                Bucket=self.bucket,
+                Key=key,
+                CopySource={'Bucket': self.bucket, 'Key': key},
+                MetadataDirective='REPLACE',
+                ContentType='application/octet-stream'
+            )
+            return True
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') in ('404', 'NoSuchKey', 'NotFound'):
+                return False
+            raise
+
+    def _delete(self, ref):
+        self.client.delete_object(Bucket=self.bucket, Key=self._key(ref))
+
+    def _keys(self):
+        paginator = self.client.get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=self.prefix):
+            for item in page.get('Contents', []):
+                yield item['Key'][len(self.prefix):], item['LastModified'].timestamp()
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def create_blob_store(backend=None):
+    """Blob store selected by BLOB_STORE_BACKEND (local or s3)"""
+    backend = (backend or os.getenv('BLOB_STORE_BACKEND', 'local')).lower()
+    if backend == 's3':
+        return S3BlobStore()
+    if backend == 'local':
+        return LocalBlobStore()
+    raise ValueError(f"Unknown BLOB_STORE_BACKEND: {backend}")
+
+
+def get_blob_store():
+    """Process-wide blob store"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = create_blob_store()
+        return _store
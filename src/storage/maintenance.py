@@ -0,0 +1,117 @@
+"""
+Blob Store Maintenance
+Moves inline text into the blob store and removes unreferenced blobs
+
+Replacing a transcript or analysis leaves its old blob in the store, and
+nothing else deletes it: run --gc on a schedule (e.g. daily from cron) or
+the store only grows.
+
+Usage:
+    python -m src.storage.maintenance --migrate-inline
+    python -m src.storage.maintenance --gc --grace-hours 24
+"""
+import argparse
+import os
+import time
+
+from src.api.database import db, Meeting
+from src.storage.blobs import get_blob_store
+
+DEFAULT_BATCH_SIZE = 200
+
+
+def migrate_inline(app, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Move transcripts/analyses still stored inline into the blob store
+
+    Returns:
+        Number of meetings moved
+    """
+    moved = 0
+    with app.app_context():
+        while True:
+            meetings = Meeting.query.filter(db.or_(
+                Meeting.transcript_inline.isnot(None),
+                Meeting.analysis_inline.isnot(None)
+            )).options(
+                db.undefer(Meeting.transcript_inline),
+                db.undefer(Meeting.analysis_inline)
+            ).order_by(Meeting.id).limit(batch_size).all()
+            if not meetings:
+                break
+
+            for meeting in meetings:
+                # Assigning through the properties writes the blob and clears the inline copy
+                if meeting.transcript_inline is not None:
+                    meeting.transcript = meeting.transcript_inline
+                if meeting.analysis_inline is not None:
+                    meeting.analysis = meeting.analysis_inline
+            db.session.commit()
+            moved += len(meetings)
+            print(f"📦 Moved {moved} meetings to the blob store")
+        db.session.remove()
+    return moved
+
+
+def blob_ref_columns():
+    """Every *_ref column of every table; each holds a blob store ref"""
+    return [
+        column
+        for table in db.metadata.sorted_tables
+        for column in table.columns
+        if column.name.endswith('_ref')
+    ]
+
+
+def collect_garbage(app, grace_seconds=24 * 3600, dry_run=False):
+    """
+    Delete blobs no meeting references
+
+    Blobs newer than grace_seconds are kept: a row that is about to point
+    at them may not be committed yet. Superseded analysis checkpoints are
+    the usual garbage.
+
+    Returns:
+        Number of blobs deleted (or that would be, with dry_run)
+    """
+    with app.app_context():
+        # Derived from the schema so a new blob column is protected without
+        # a change here
+        referenced = set()
+        for column in blob_ref_columns():
+            referenced.update(db.session.execute(
+                db.select(column).where(column.isnot(None)).distinct()
+            ).scalars())
+        db.session.remove()
+
+    store = get_blob_store()
+    cutoff = time.time() - grace_seconds
+    deleted = 0
+    for ref, modified in store.refs():
+        if ref in referenced or modified > cutoff:
+            continue
+        if not dry_run:
+            store.delete(ref)
+        deleted += 1
+    print(f"🧹 {'Would delete' if dry_run else 'Deleted'} {deleted} unreferenced blobs")
+    return deleted
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Blob store maintenance')
+    parser.add_argument('--migrate-inline', action='store_true',
+                        help='Move inline transcripts/analyses into the blob store')
+    parser.add_argument('--gc', action='store_true', help='Delete unreferenced blobs')
+    parser.add_argument('--grace-hours', type=float, default=24)
+    parser.add_argument('--dry-run', action='store_true')
+    args = parser.parse_args()
+
+    os.environ['PIPELINE_WORKERS_ENABLED'] = 'false'
+    from src.api.app import app
+
+    if args.migrate_inline:
+        migrate_inline(app)
+    if args.gc:
+        collect_garbage(app, grace_seconds=args.grace_hours * 3600, dry_run=args.dry_run)
+    if not (args.migrate_inline or args.gc):
+        parser.print_help()